@@ -86,12 +86,21 @@ def upload_file(
 
 def download_bytes(
     gcs_path: str,
+    generation: int | None = None,
 ) -> bytes:
-    """Baixa o objeto inteiro como bytes."""
+    """Baixa o objeto inteiro como bytes (de uma `generation` específica, se dada)."""
     bucket_name, blob_name = _split_gs_uri(gcs_path)
-    blob = _blob(blob_name, bucket_name)
+    blob = _client().bucket(bucket_name).blob(blob_name, generation=generation)
     return blob.download_as_bytes()
 
+def object_generation(gcs_path: str) -> int:
+    """Generation atual do objeto (muda a cada upload, inclusive com overwrite)."""
+    bucket_name, blob_name = _split_gs_uri(gcs_path)
+    blob = _client().bucket(bucket_name).get_blob(blob_name)
+    if blob is None:
+        raise FileNotFoundError(f"{gcs_path} não existe")
+    return blob.generation
+
 def generate_signed_url(
     gcs_path: str,
     expires: int = DEFAULT_EXPIRATION,
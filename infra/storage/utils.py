@@ -1,14 +1,16 @@
+from io import BytesIO
 from typing import ByteString
 import os, mimetypes
 from infra.storage import gcs_client
 
-def _upload_to_gcs(local_path: str, dest_prefix: str = "tts") -> str:
+def _upload_to_gcs(local_path: str, dest_prefix: str = "tts", overwrite: bool = False) -> str:
     """
     Faz o upload de um arquivo para o Google Cloud Storage (GCS) e retorna o URI do GCS.
 
     Args:
         local_path (str): O caminho local do arquivo a ser enviado.
         dest_prefix (str): O prefixo de destino no GCS. Padrão é "tts".
+        overwrite (bool): Sobrescreve o objeto se já existir (nomes por conteúdo).
 
     Returns:
         str: O URI do GCS do arquivo enviado.
@@ -20,11 +22,39 @@ def _upload_to_gcs(local_path: str, dest_prefix: str = "tts") -> str:
     ctype, _ = mimetypes.guess_type(filename)
     ctype = ctype or "application/octet-stream"
 
-    gs_uri = gcs_client.upload_file(local_path, dest_path, content_type=ctype)
+    gs_uri = gcs_client.upload_file(local_path, dest_path, overwrite=overwrite, content_type=ctype)
     os.remove(local_path)
     return gs_uri
 
 
+def _upload_bytes_to_gcs(
+    data: bytes,
+    dest_path: str,
+    content_type: str | None = None,
+    overwrite: bool = False,
+) -> str:
+    """
+    Faz o upload de bytes em memória para o GCS, sem passar pelo disco.
+
+    Args:
+        data (bytes): Conteúdo do arquivo.
+        dest_path (str): Caminho de destino no bucket (ex.: "tts_outputs/abc.wav").
+        content_type (str): Content-Type; se omitido, é inferido pela extensão.
+        overwrite (bool): Sobrescreve o objeto se já existir.
+
+    Returns:
+        str: O URI do GCS do arquivo enviado.
+    """
+    if content_type is None:
+        content_type, _ = mimetypes.guess_type(dest_path)
+    return gcs_client.upload_file(
+        BytesIO(data),
+        dest_path,
+        overwrite=overwrite,
+        content_type=content_type or "application/octet-stream",
+    )
+
+
 def _download_from_gcs(gs_uri: str) -> ByteString:
     """
     Baixa um objeto no Google Cloud Storage e devolve os bytes.
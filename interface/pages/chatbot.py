@@ -1,11 +1,7 @@
-import os
 import streamlit as st
 from utils.audio import (
-    transcribe_audio,
-    tts_audio,
-    chat_completion,
-    verify_speaker,
-    upload_audio_to_gcs,
+    conversation_turn,
+    create_chat_session,
 )
 
 st.set_page_config(page_title="Chatbot de Voz", page_icon=":microphone:")
@@ -95,27 +91,47 @@ audio_file = st.audio_input(
 # Processa nova mensagem de voz (se houver)
 # -----------------------------------------------------------------------------
 if audio_file is not None:
-    with st.spinner("📤 Enviando áudio…"):
-        gs_uri, tmp_path = upload_audio_to_gcs(audio_file, dest_prefix="audio")
+    # Configurações de voz
+    voice_settings = {
+        "stability": 0.25,
+        "similarity_boost": 0.9,
+        "use_speaker_boost": True,
+        "style": 0.4,
+        "speed": 1,
+    }
 
     try:
-        # Identificação do locutor usando threshold configurável
-        with st.spinner("🔎 Identificando usuário…"):
-            speaker_info = verify_speaker(
-                uploaded_file=audio_file,
-                gs_uri=gs_uri,
+        # Uma chamada por turno: identificação, transcrição, resposta e voz.
+        # O histórico fica na sessão do servidor.
+        with st.spinner("🤖 Ouvindo e pensando…"):
+            turn_kwargs = dict(
                 threshold=st.session_state["threshold"],
+                provider="elevenlabs",
+                voice_id="ttLrPNfZdNBtVDeOUJsm",
+                voice_settings=voice_settings,
+            )
+            if "chat_session_id" not in st.session_state:
+                st.session_state.chat_session_id = create_chat_session(st.session_state.messages)
+            turn = conversation_turn(
+                audio_file.getvalue(), st.session_state.chat_session_id, **turn_kwargs
             )
+            if turn is None:
+                # Sessão expirou no servidor: recria a partir do histórico local
+                st.session_state.chat_session_id = create_chat_session(st.session_state.messages)
+                turn = conversation_turn(
+                    audio_file.getvalue(), st.session_state.chat_session_id, **turn_kwargs
+                )
+            if turn is None:
+                raise ValueError("Não foi possível abrir uma sessão de conversa")
 
-        # Transcrição
-        with st.spinner("🔎 Transcrevendo…"):
-            user_text = transcribe_audio(uploaded_file=None, gs_uri=gs_uri)
+        user_text = turn["user_text"]
+        speaker_name = turn["speaker"].get("speaker_name")
 
         # Mostra o que o usuário disse
         with st.chat_message("user"):
-            if speaker_info and speaker_info.get("found_in_bq"):
+            if speaker_name:
                 st.markdown(
-                    f"*Usuário identificado: **{speaker_info['speaker_name']}***",
+                    f"*Usuário identificado: **{speaker_name}***",
                     unsafe_allow_html=False,
                 )
             else:
@@ -126,59 +142,18 @@ if audio_file is not None:
             st.write(user_text)
 
         # Atualiza histórico (UI)
-        if speaker_info and speaker_info.get("found_in_bq"):
+        if speaker_name:
             st.session_state.messages.append(
-                {
-                    "role": "user",
-                    "content": user_text,
-                    "speaker_name": speaker_info["speaker_name"],
-                }
-            )
-            formatted_user_content = (
-                f"A mensagem está sendo enviada pelo {speaker_info['speaker_name']}. "
-                f"Instruções: {speaker_info.get('instructions', '')}. "
-                f"Mensagem: {user_text}"
+                {"role": "user", "content": user_text, "speaker_name": speaker_name}
             )
         else:
             st.session_state.messages.append(
                 {"role": "user", "content": user_text, "identified": False}
             )
-            formatted_user_content = (
-                "A mensagem está sendo enviada por um usuário não identificado. "
-                "Instruções: Responda de forma amigável e genérica. "
-                f"Mensagem: {user_text}"
-            )
-
-        # Prepara todo o histórico para o LLM (sem truncar)
-        history_for_llm = [
-            {"role": m["role"], "content": m["content"]}
-            for m in st.session_state.messages
-        ]
-        # Substitui o conteúdo da última mensagem do usuário por versão personalizada
-        history_for_llm[-1]["content"] = formatted_user_content
-
-        # Chama o LLM
-        with st.spinner("🤖 Pensando…"):
-            assistant_reply = chat_completion(history_for_llm)
-
-        # Configurações de voz
-        voice_settings = {
-            "stability": 0.25,
-            "similarity_boost": 0.9,
-            "use_speaker_boost": True,
-            "style": 0.4,
-            "speed": 1,
-        }
 
         # Guarda e mostra a resposta
-        with st.spinner("🎙️ Gerando voz…"):
-            audio_bytes, mime = tts_audio(
-                assistant_reply,
-                provider="elevenlabs",
-                voice_id="ttLrPNfZdNBtVDeOUJsm",
-                voice_settings=voice_settings,
-            )
-
+        assistant_reply = turn["assistant_text"]
+        audio_bytes, mime = turn["audio_bytes"], turn.get("content_type") or "audio/mpeg"
         st.session_state.messages.append(
             {
                 "role": "assistant",
@@ -191,11 +166,10 @@ if audio_file is not None:
         # Exibe no chat
         with st.chat_message("assistant"):
             st.write(assistant_reply)
-            st.audio(audio_bytes, format=mime)
+            if audio_bytes is not None:
+                st.audio(audio_bytes, format=mime)
 
     finally:
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
         # ------------------------------------------------------------------
         # Prepara a próxima gravação: incrementa a chave e faz rerun
         # ------------------------------------------------------------------
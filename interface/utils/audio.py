@@ -1,8 +1,8 @@
+import base64
 import tempfile
-from infra.storage.utils import _upload_to_gcs, _download_from_gcs
+from infra.storage.utils import _upload_to_gcs
 from infra.bq.bq_client import query
 import requests
-import mimetypes
 import soundfile as sf
 import os
 
@@ -108,6 +108,87 @@ def chat_completion(history):
         
     return assistant_text
 
+def create_chat_session(messages):
+    """
+    Cria uma sessão de conversa no servidor a partir do histórico atual.
+
+    Args:
+        messages (list): Histórico no formato {"role", "content"}; a primeira
+            mensagem de sistema vira o prompt da sessão.
+
+    Returns:
+        str: ID da sessão
+    """
+    system = [m["content"] for m in messages if m["role"] == "system"]
+    history = [
+        {"role": m["role"], "content": m["content"]}
+        for m in messages
+        if m["role"] in ("user", "assistant")
+    ]
+    response = requests.post(
+        f"{API_URL}/assistant/sessions",
+        json={"system_prompt": system[0] if system else None, "messages": history},
+    )
+    response.raise_for_status()
+    return response.json()["session_id"]
+
+def session_reply(session_id, content):
+    """
+    Envia só a nova mensagem do usuário para a sessão e devolve a resposta.
+
+    Returns:
+        str | None: Texto do assistente, ou None se a sessão expirou no servidor
+    """
+    response = requests.post(
+        f"{API_URL}/assistant/sessions/{session_id}/messages",
+        json={"content": content},
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    assistant_text = response.json().get("assistant_text", "")
+    if not assistant_text:
+        raise ValueError("Resposta do assistente está vazia")
+    return assistant_text
+
+def conversation_turn(audio_bytes, session_id, threshold=0.45, provider=None, voice_id=None, voice_settings=None):
+    """
+    Turno completo numa única chamada: identificação do locutor, transcrição,
+    resposta do assistente (gravada na sessão) e voz.
+
+    Args:
+        audio_bytes (bytes): Áudio gravado pelo usuário (enviado direto, sem GCS)
+        session_id (str): Sessão criada com create_chat_session
+        threshold (float): Threshold de verificação do locutor
+        provider (str): "pretrained" ou "elevenlabs" (usa DEFAULT_TTS_PROVIDER se None)
+
+    Returns:
+        dict | None: Resposta de /conversation/turn com o áudio já decodificado
+            em "audio_bytes", ou None se a sessão expirou no servidor
+    """
+    response = requests.post(
+        f"{API_URL}/conversation/turn",
+        json={
+            "audio_b64": base64.b64encode(audio_bytes).decode("ascii"),
+            "session_id": session_id,
+            "threshold": threshold,
+            "tts_provider": provider or DEFAULT_TTS_PROVIDER,
+            "voice_id": voice_id or DEFAULT_VOICE_ID,
+            "voice_settings": voice_settings or DEFAULT_VOICE_SETTINGS,
+        },
+        timeout=180,
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    result = response.json()
+    if not result.get("assistant_text"):
+        raise ValueError("Resposta do assistente está vazia")
+    result["audio_bytes"] = base64.b64decode(result["audio_b64"]) if result.get("audio_b64") else None
+    return result
+
 def tts_audio(text, provider=None, voice_id=None, voice_settings=None):
     """
     Gera áudio a partir de texto usando TTS.
@@ -131,35 +212,34 @@ def tts_audio(text, provider=None, voice_id=None, voice_settings=None):
     
     # Define endpoint e payload baseado no provider
     if provider == "pretrained":
-        endpoint = f"{API_URL}/tts/pretrained"
-        payload = {"text": text}
+        # O áudio volta no corpo da resposta: sem ida e volta ao GCS
+        response = requests.post(
+            f"{API_URL}/tts/pretrained",
+            json={"text": text, "response_mode": "bytes"},
+        )
+        response.raise_for_status()
+        if not response.content:
+            raise ValueError("A API não retornou áudio")
+        mime = response.headers.get("content-type", "audio/wav").split(";")[0]
+        return response.content, mime
     elif provider == "elevenlabs":
-        endpoint = f"{API_URL}/tts/elevenlabs"
-        payload = {
-            "text": text,
-            "voice_id": voice_id,
-            "model_id": "21m00Tcm4TlvDq8ikWAM",
-            "voice_settings": voice_settings or {}
-        }
+        # Áudio repassado pela API conforme a ElevenLabs gera; GCS fica em segundo plano
+        response = requests.post(
+            f"{API_URL}/tts/elevenlabs",
+            json={
+                "text": text,
+                "voice_id": voice_id,
+                "voice_settings": voice_settings or {},
+                "response_mode": "stream",
+            },
+        )
+        response.raise_for_status()
+        if not response.content:
+            raise ValueError("A API não retornou áudio")
+        mime = response.headers.get("content-type", "audio/mpeg").split(";")[0]
+        return response.content, mime
     else:
         raise ValueError(f"Provider '{provider}' não suportado. Use 'pretrained' ou 'elevenlabs'")
-        
-    response = requests.post(endpoint, json=payload)
-    response.raise_for_status()
-    
-    result = response.json()
-    audio_path = result.get("audio_path")
-    
-    if not audio_path:
-        raise ValueError("Caminho do áudio não foi retornado pela API")
-        
-    audio_bytes = _download_from_gcs(audio_path)
-    
-    # Determina mime type pelo nome do arquivo
-    mime, _ = mimetypes.guess_type(audio_path)
-    mime = mime or "audio/wav"
-    
-    return audio_bytes, mime
 
 def verify_speaker(uploaded_file=None, gs_uri=None, threshold=0.45):
     """
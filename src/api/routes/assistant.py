@@ -1,28 +1,130 @@
-from fastapi import APIRouter
-from api.schemas.assistant import AssistantRequest, AssistantResponse, AssistantRequestMessages
-from services.assistant.assistant import Assistant
+import base64
+import logging
+import time
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from api.schemas.assistant import (
+    AssistantRequest,
+    AssistantResponse,
+    AssistantRequestMessages,
+    SessionCreateRequest,
+    SessionCreateResponse,
+    SessionMessageRequest,
+    SessionMessageResponse,
+    SessionResponse,
+)
+from services.assistant.runtime import get_assistant, get_session_store
+from services.tts.runtime import get_tts_runtime
+from utils.audio_io import content_type, encode_audio
+from utils.sse import SSE_HEADERS, sse_event
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Carrega o assistente na inicialização
-assistant = Assistant()
+# Carrega o assistente na inicialização (compartilhado com /conversation/turn)
+assistant = get_assistant()
+sessions = get_session_store()
 
 @router.post("/reply", response_model=AssistantResponse)
-def get_assistant_reply(request: AssistantRequest):
+async def get_assistant_reply(request: AssistantRequest):
     """
     Gera uma resposta do assistente com base no texto do usuário.
     """
-    reply_text = assistant.reply(request.user_text)
+    reply_text = await assistant.areply(request.user_text, cacheable=request.cacheable)
     return AssistantResponse(assistant_text=reply_text)
 
 @router.post("/reply_api", response_model=AssistantResponse)
-def get_assistant_reply_api(request: AssistantRequestMessages):
+async def get_assistant_reply_api(request: AssistantRequestMessages):
     """
     Gera uma resposta do assistente com base no texto do usuário.
     """
-    reply_text = assistant.reply_api(request.messages)
+    reply_text = await assistant.areply_api(request.messages, request.conversation_id, request.cacheable)
     return AssistantResponse(assistant_text=reply_text)
 
+@router.post("/reply_stream")
+async def get_assistant_reply_stream(request: AssistantRequestMessages):
+    """
+    Resposta do assistente via Server-Sent Events: um evento `data` com
+    `{"delta": ...}` por trecho gerado e, no fim, `event: end` com o texto
+    completo (ou `event: error`).
+    """
+    async def _events():
+        parts = []
+        try:
+            async for delta in assistant.areply_stream(request.messages, request.conversation_id, request.cacheable):
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+        except Exception as e:
+            logger.error(f"Falha no streaming do LLM: {e}")
+            yield sse_event({"detail": str(e)}, event="error")
+            return
+        yield sse_event({"assistant_text": "".join(parts).strip()}, event="end")
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/reply_and_speak")
+async def reply_and_speak(request: AssistantRequestMessages):
+    """
+    Resposta do assistente já em áudio, via Server-Sent Events. O texto do LLM
+    é cortado em frases conforme é gerado e cada frase vai para o TTS enquanto
+    o LLM continua; os áudios saem em ordem como eventos `segment`
+    (`{"index", "text", "audio" (base64), "content_type", ...}`) e, no fim,
+    `event: end` com o texto completo (ou `event: error`).
+    """
+    tts = get_tts_runtime()
+    parts = []
+
+    async def _deltas():
+        async for delta in assistant.areply_stream(request.messages, request.conversation_id, request.cacheable):
+            parts.append(delta)
+            yield delta
+
+    async def _events():
+        start = time.perf_counter()
+        first_audio_s = None
+        try:
+            async for segment in tts.synthesizer.astream_text(_deltas()):
+                audio_bytes = await run_in_threadpool(
+                    encode_audio, segment.waveform, segment.sample_rate, tts.audio_format, tts.bitrate_kbps
+                )
+                if first_audio_s is None:
+                    first_audio_s = time.perf_counter() - start
+                yield sse_event({
+                    "index": segment.index,
+                    "text": segment.text,
+                    "sample_rate": segment.sample_rate,
+                    "synth_s": round(segment.synth_s, 3),
+                    "content_type": content_type(tts.audio_format),
+                    "audio": base64.b64encode(audio_bytes).decode("ascii"),
+                }, event="segment")
+        except Exception as e:
+            logger.error(f"Falha no reply_and_speak: {e}")
+            yield sse_event({"detail": str(e)}, event="error")
+            return
+        yield sse_event({
+            "assistant_text": "".join(parts).strip(),
+            "first_audio_s": round(first_audio_s, 3) if first_audio_s is not None else None,
+            "total_s": round(time.perf_counter() - start, 3),
+        }, event="end")
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.get("/cache/stats")
+def assistant_cache_stats():
+    """
+    Métricas do cache de respostas do LLM (hit rate e latência economizada).
+    """
+    return assistant.cache_stats()
+
+@router.get("/llm/stats")
+def assistant_llm_stats():
+    """
+    Estado dos circuit breakers e quantas respostas cada provider serviu.
+    """
+    return assistant.llm_stats()
+
 @router.get("/welcome", response_model=AssistantResponse)
 def assistant_welcome():
     """
@@ -36,3 +138,97 @@ def assistant_goodbye():
     Retorna a mensagem de despedida do assistente.
     """
     return AssistantResponse(assistant_text=assistant.goodbye())
+
+# --------------------------------------------------------------------------- #
+# Sessões: o histórico fica no servidor e o cliente envia só a mensagem nova  #
+# --------------------------------------------------------------------------- #
+@router.post("/sessions", response_model=SessionCreateResponse)
+def create_session(request: SessionCreateRequest):
+    """
+    Cria uma conversa no servidor.
+    """
+    system_prompt = request.system_prompt if request.system_prompt is not None else assistant.prompt_base
+    messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    messages += [{"role": m["role"], "content": m["content"]} for m in request.messages or []]
+    session = sessions.create(messages, request.metadata)
+    return SessionCreateResponse(session_id=session.session_id)
+
+@router.post("/sessions/{session_id}/messages", response_model=SessionMessageResponse)
+async def post_session_message(session_id: str, request: SessionMessageRequest):
+    """
+    Adiciona a mensagem do usuário à sessão e responde. Com `stream`, a
+    resposta vem via SSE como em /reply_stream. O lock da sessão cobre o turno
+    inteiro (histórico, LLM e gravação): mensagens concorrentes na mesma
+    sessão são atendidas em ordem, sem intercalar.
+    """
+    user_message = {"role": "user", "content": request.content}
+
+    if request.stream:
+        # Checagem sem lock só para responder 404 antes de abrir o stream;
+        # o turno (e o lock) começa dentro do gerador, que sempre o libera
+        if await run_in_threadpool(sessions.get, session_id) is None:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada ou expirada")
+
+        async def _events():
+            async with sessions.turn(session_id) as history:
+                if history is None:
+                    yield sse_event({"detail": "Sessão expirada"}, event="error")
+                    return
+                parts = []
+                try:
+                    async for delta in assistant.areply_stream(history + [user_message], session_id):
+                        parts.append(delta)
+                        yield sse_event({"delta": delta})
+                except Exception as e:
+                    logger.error(f"Falha no streaming do LLM: {e}")
+                    yield sse_event({"detail": str(e)}, event="error")
+                    return
+                reply_text = "".join(parts).strip()
+                session = await sessions.record_turn(session_id, user_message, reply_text)
+            if session is None:
+                yield sse_event({"detail": "Sessão expirada"}, event="error")
+                return
+            yield sse_event(
+                {"assistant_text": reply_text, "turns": len(session.messages)}, event="end"
+            )
+
+        return StreamingResponse(_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    async with sessions.turn(session_id) as history:
+        if history is None:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada ou expirada")
+        reply_text = await assistant.areply_api(history + [user_message], session_id)
+        if not reply_text:
+            raise HTTPException(status_code=502, detail="O LLM não retornou resposta")
+        session = await sessions.record_turn(session_id, user_message, reply_text)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada ou expirada")
+
+    return SessionMessageResponse(
+        session_id=session_id, assistant_text=reply_text, turns=len(session.messages)
+    )
+
+@router.get("/sessions/{session_id}", response_model=SessionResponse)
+def get_session(session_id: str):
+    """
+    Retorna o histórico da sessão.
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada ou expirada")
+    return SessionResponse(
+        session_id=session.session_id,
+        messages=session.messages,
+        metadata=session.metadata,
+        created_at=session.created_at,
+        updated_at=session.updated_at,
+    )
+
+@router.delete("/sessions/{session_id}")
+def delete_session(session_id: str):
+    """
+    Encerra a sessão e descarta o histórico.
+    """
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Sessão não encontrada ou expirada")
+    return {"deleted": True}
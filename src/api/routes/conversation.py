@@ -0,0 +1,103 @@
+"""
+Conversa por voz:
+- /turn: um turno numa única chamada (identificação do locutor e transcrição
+  em paralelo, depois LLM com as instruções do locutor e TTS);
+- /ws: sessão full-duplex por WebSocket (microfone contínuo, resposta em áudio).
+"""
+import base64
+import binascii
+import logging
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+
+from api.schemas.conversation import ConversationTurnRequest, ConversationTurnResponse, SpeakerInfo
+from services.conversation.turn import SessionNotFound, get_conversation_pipeline
+from services.conversation.voice_session import VoiceSession, load_voice_session_config
+from services.stt.streaming import ENCODINGS
+from utils.executors import ExecutorOverloaded
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Reaproveita os modelos já carregados pelas demais rotas
+_pipeline = get_conversation_pipeline()
+_voice_session = load_voice_session_config()
+
+@router.post("/turn", response_model=ConversationTurnResponse)
+async def conversation_turn(req: ConversationTurnRequest):
+    """
+    Recebe o áudio do usuário uma vez e devolve a transcrição, o locutor, a
+    resposta do assistente (texto e áudio) e o tempo de cada etapa.
+    """
+    if (req.audio_path is None) == (req.audio_b64 is None):
+        raise HTTPException(400, "Informe audio_path ou audio_b64")
+    if req.audio_b64 is not None:
+        try:
+            audio = base64.b64decode(req.audio_b64, validate=True)
+        except binascii.Error:
+            raise HTTPException(400, "audio_b64 inválido")
+    else:
+        audio = req.audio_path
+
+    try:
+        result = await _pipeline.turn(
+            audio,
+            threshold=req.threshold,
+            session_id=req.session_id,
+            messages=req.messages,
+            tts_provider=req.tts_provider,
+            voice_id=req.voice_id,
+            voice_settings=req.voice_settings,
+        )
+    except SessionNotFound:
+        raise HTTPException(404, "Sessão não encontrada ou expirada")
+    except ExecutorOverloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Falha no turno de conversa: {e}")
+        raise HTTPException(500, str(e))
+
+    profile = result.profile or {}
+    return ConversationTurnResponse(
+        user_text=result.user_text,
+        speaker=SpeakerInfo(
+            matched=result.speaker.matched,
+            speaker_id=result.speaker.speaker_id,
+            speaker_name=profile.get("speaker_name"),
+            score=result.speaker.score,
+        ),
+        assistant_text=result.assistant_text,
+        audio_b64=base64.b64encode(result.audio).decode("ascii") if result.audio else None,
+        content_type=result.content_type,
+        session_id=result.session_id,
+        timings=result.timings,
+    )
+
+@router.websocket("/ws")
+async def conversation_ws(websocket: WebSocket, encoding: str = "pcm_s16le"):
+    """
+    Sessão de voz full-duplex.
+
+    O cliente envia o microfone em frames binários (PCM 16 kHz mono
+    `pcm_s16le`/`pcm_f32le` ou fluxo Ogg/WebM `opus`) e, para encerrar, a
+    mensagem de texto `end`. O servidor envia JSON `partial`/`final` (STT),
+    `speaker`, `reply_start`, `audio` (seguido do WAV da frase em binário),
+    `reply_end`, `interrupted` (o usuário falou por cima) e `error`.
+    """
+    await websocket.accept()
+    if encoding not in ENCODINGS:
+        await websocket.send_json({"type": "error", "detail": f"encoding deve ser um de {ENCODINGS}"})
+        await websocket.close(code=1003)
+        return
+
+    session = VoiceSession(websocket, _pipeline, _voice_session, encoding)
+    try:
+        await session.run()
+        if not session.disconnected:
+            await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Cliente desconectou da sessão de voz")
+    except Exception as e:
+        logger.error(f"Falha na sessão de voz: {e}")
+        if not session.disconnected:
+            await websocket.close(code=1011)
@@ -0,0 +1,16 @@
+"""
+Métricas dos executores de inferência (TitaNet, Whisper, VITS): execuções em
+andamento, profundidade da fila, recusas e tempo de espera.
+"""
+from fastapi import APIRouter
+
+from utils.executors import executors_stats
+
+router = APIRouter()
+
+@router.get("/stats")
+def get_executors_stats():
+    """
+    Estado de cada executor já usado no processo.
+    """
+    return executors_stats()
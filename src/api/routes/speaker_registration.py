@@ -1,20 +1,19 @@
-import os
-import tempfile
 import logging
 from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
 
 from api.schemas.speaker_registration import (
     SpeakerRegisterRequest,
     SpeakerRegisterResponse,
 )
 
-from services.vector_database.qdrant_service import QdrantService
-from services.speaker_recognition.speaker_recognition import (
-    load_model,
-    extract_embedding,
-)
+from services.speaker_recognition.speaker_recognition import extract_embedding
+from services.speaker_recognition.identification import get_speaker_runtime
+
+from services.vad.vad import apply_vad, load_vad_config
+from utils.audio_context import AudioContext
+from utils.executors import ExecutorOverloaded, get_executor
 
-from infra.storage import gcs_client
 from infra.bq.bq_client import insert_rows
 
 # Configure logging
@@ -23,43 +22,37 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-_titanet_model = load_model()
-_qdrant = QdrantService()
+# TitaNet e Qdrant compartilhados com a verificação e /conversation/turn
+_speaker = get_speaker_runtime()
+_titanet_model = _speaker.model
+_qdrant = _speaker.qdrant
 _qdrant.create_collection()
+_vad = load_vad_config("speaker_registration")
+_titanet_executor = get_executor("titanet")
 
-def _get_local_audio_path(audio_path: str) -> str:
-    """
-    Se `audio_path` for gs://..., baixa para tempfile e devolve esse caminho.
-    Caso contrário, devolve o próprio `audio_path`.
-    Retorna (tmp_path|audio_path)  e boolean flag se é temporário.
-    """
-    if audio_path.startswith("gs://"):
-        logger.info(f"Downloading audio from GCS: {audio_path}")
-        audio_bytes = gcs_client.download_bytes(audio_path)
-        tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        tmp.write(audio_bytes)
-        tmp.flush()
-        tmp.close()
-        logger.info(f"Audio downloaded to temporary file: {tmp.name}")
-        return tmp.name, True
-    logger.info(f"Using local audio path: {audio_path}")
-    return audio_path, False
+def _embed(ctx: AudioContext):
+    vad_result = apply_vad(ctx.audio, _vad)
+    logger.info(f"VAD kept {vad_result.kept_s}s of {vad_result.input_s}s")
+    return vad_result, extract_embedding(_titanet_model, vad_result.audio)
 
 @router.post("/", response_model=SpeakerRegisterResponse)
-def register_speaker(req: SpeakerRegisterRequest):
+async def register_speaker(req: SpeakerRegisterRequest):
     """
     Cadastra o locutor: extrai embedding, insere no Qdrant e devolve o UUID.
+    O embedding roda no executor do TitaNet; GCS, Qdrant e BigQuery em threads.
     """
     logger.info(f"Registering speaker: {req.speaker_name}")
-    local_path, is_tmp = _get_local_audio_path(req.audio_path)
 
     try:
+        # caminho inexistente ou ilegível também vira 400
+        ctx = await run_in_threadpool(AudioContext.from_source, req.audio_path)
         logger.info("Extracting embedding from audio")
-        embedding_vec = extract_embedding(_titanet_model, local_path)
+        vad_result, embedding_vec = await _titanet_executor.run(_embed, ctx)
+        vad_info = vad_result.metadata() if _vad["enabled"] else None
+    except ExecutorOverloaded:
+        raise
     except Exception as e:
         logger.error(f"Error extracting embedding: {e}")
-        if is_tmp and os.path.exists(local_path):
-            os.unlink(local_path)
         raise HTTPException(400, f"Erro ao extrair embedding: {e}")
 
     payload = {
@@ -70,7 +63,8 @@ def register_speaker(req: SpeakerRegisterRequest):
 
     try:
         logger.info("Inserting embedding into Qdrant")
-        speaker_uuid = _qdrant.insert_embedding(
+        speaker_uuid = await run_in_threadpool(
+            _qdrant.insert_embedding,
             embedding=embedding_vec,
             record_id=req.speaker_id,
             payload=payload,
@@ -79,9 +73,6 @@ def register_speaker(req: SpeakerRegisterRequest):
     except Exception as e:
         logger.error(f"Error inserting into Qdrant: {e}")
         raise HTTPException(500, f"Erro ao inserir no Qdrant: {e}")
-    finally:
-        if is_tmp and os.path.exists(local_path):
-            os.unlink(local_path)
     
     bq_row = {
         "speaker_id": req.speaker_id,
@@ -89,7 +80,7 @@ def register_speaker(req: SpeakerRegisterRequest):
         "instructions": req.instructions,
     }
     logger.info("Inserting speaker data into BigQuery")
-    bq_errors = insert_rows("system_prompts", [bq_row])
+    bq_errors = await run_in_threadpool(insert_rows, "system_prompts", [bq_row])
 
     if bq_errors:
         logger.error(f"Error inserting into BigQuery: {bq_errors}")
@@ -98,5 +89,6 @@ def register_speaker(req: SpeakerRegisterRequest):
     logger.info(f"Speaker registered successfully: {speaker_uuid}")
     return SpeakerRegisterResponse(
         speaker_id=speaker_uuid,
-        status="registered"
+        status="registered",
+        vad=vad_info,
     )
@@ -2,24 +2,21 @@
 Verifica locutor: recebe um áudio, extrai embedding, consulta Qdrant
 e devolve o speaker_id se a similaridade (ou distância) ultrapassar o threshold.
 """
-import os
-import tempfile
 import logging
-import numpy as np
 from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
 
 from api.schemas.speaker_verification import (
     SpeakerVerificationRequest,
     SpeakerVerificationResponse,
 )
 
-from services.vector_database.qdrant_service import QdrantService
-from services.speaker_recognition.speaker_recognition import (
-    load_model,
-    extract_embedding,
-)
+from services.speaker_recognition.speaker_recognition import extract_embedding
+from services.speaker_recognition.identification import get_speaker_runtime, match_embedding
 
-from infra.storage import gcs_client
+from services.vad.vad import apply_vad, load_vad_config
+from utils.audio_context import AudioContext
+from utils.executors import ExecutorOverloaded, get_executor
 
 # Configura o logger
 logging.basicConfig(level=logging.INFO)
@@ -27,78 +24,53 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-_titanet = load_model()
-_qdrant = QdrantService()
-
-def _materialize_audio(path: str) -> tuple[str, bool]:
-    """
-    Faz download se gs://..., devolve (local_path, is_tmp)
-    """
-    if path.startswith("gs://"):
-        logger.info(f"Downloading audio from {path}")
-        data = gcs_client.download_bytes(path)
-        tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        tmp.write(data)
-        tmp.flush()
-        tmp.close()
-        logger.info(f"Audio downloaded to temporary file {tmp.name}")
-        return tmp.name, True
-    return path, False
+# TitaNet e Qdrant compartilhados com o cadastro e /conversation/turn
+_speaker = get_speaker_runtime()
+_titanet = _speaker.model
+_qdrant = _speaker.qdrant
+_vad = load_vad_config("speaker_verification")
+# Pool dedicado ao TitaNet, com fila limitada
+_titanet_executor = get_executor("titanet")
 
+def _embed(ctx: AudioContext):
+    vad_result = apply_vad(ctx.audio, _vad)
+    logger.info(f"VAD kept {vad_result.kept_s}s of {vad_result.input_s}s")
+    return vad_result, extract_embedding(_titanet, vad_result.audio)
 
 @router.post("/", response_model=SpeakerVerificationResponse)
-def verify_speaker(req: SpeakerVerificationRequest):
+async def verify_speaker(req: SpeakerVerificationRequest):
     logger.info(f"Received request to verify speaker with audio path: {req.audio_path}")
     logger.info(f"Using threshold: {req.threshold}")
-    local_path, is_tmp = _materialize_audio(req.audio_path)
 
     try:
-        logger.info(f"Extracting embedding from audio at {local_path}")
-        emb = extract_embedding(_titanet, local_path)
+        # Bytes e buffer decodificado ficam em memória (e no cache curto do contexto);
+        # caminho inexistente ou ilegível também vira 400
+        ctx = await run_in_threadpool(AudioContext.from_source, req.audio_path)
+        logger.info(f"Extracting embedding from audio at {req.audio_path}")
+        vad_result, emb = await _titanet_executor.run(_embed, ctx)
+        vad_info = vad_result.metadata() if _vad["enabled"] else None
         logger.info("Embedding extracted successfully")
+    except ExecutorOverloaded:
+        raise
     except Exception as e:
         logger.error(f"Failed to extract embedding: {e}")
-        if is_tmp and os.path.exists(local_path):
-            os.unlink(local_path)
         raise HTTPException(400, f"Falha ao extrair embedding: {e}")
 
     try:
         logger.info("Searching for similar embeddings in Qdrant")
-        results = _qdrant.search_similar(embedding=emb, top_k=1, collection_name="speakers", with_vectors=True)
+        match = await run_in_threadpool(match_embedding, _qdrant, emb, req.threshold)
         logger.info("Search completed")
-        logger.info(f"Results: {results}")
     except Exception as e:
         logger.error(f"Error during Qdrant search: {e}")
         raise HTTPException(500, f"Erro na busca Qdrant: {e}")
-    finally:
-        if is_tmp and os.path.exists(local_path):
-            os.unlink(local_path)
-
-    if not results:
-        logger.info("No similar speakers found")
-        return SpeakerVerificationResponse(matched=False, speaker_id=None, score=None)
-
-    best = results[0]   
-    found_embedding = best.vector   
-    logger.info(f"Best match found with distance: {best.score}")
-    
-    # Calcula similaridade de cosseno entre os embeddings
-    cosine_similarity = float(np.dot(emb, found_embedding) / 
-                             (np.linalg.norm(emb) * np.linalg.norm(found_embedding)))
-    
-    logger.info(f"Cosine similarity: {cosine_similarity:.4f} | Threshold: {req.threshold}")
 
-    if cosine_similarity >= req.threshold:
-        logger.info(f"Speaker verified with ID: {best.id}")
-        return SpeakerVerificationResponse(
-            matched=True,
-            speaker_id=str(best.id),
-            score=cosine_similarity,
-        )
+    if match.matched:
+        logger.info(f"Speaker verified with ID: {match.speaker_id}")
     else:
-        logger.info("Speaker not verified, cosine similarity below threshold")
-        return SpeakerVerificationResponse(
-            matched=False,
-            speaker_id=None,
-            score=cosine_similarity,
-        )
\ No newline at end of file
+        logger.info("Speaker not verified")
+    return SpeakerVerificationResponse(
+        matched=match.matched,
+        speaker_id=match.speaker_id,
+        score=match.score,
+        vad=vad_info,
+    )
@@ -1,21 +1,152 @@
-from fastapi import APIRouter
-from api.schemas.stt import STTResponse, STTRequest
-from services.stt.stt import load_stt_pipeline, stt_from_audio
+import asyncio
+import logging
+import time
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+from api.schemas.stt import (
+    STTResponse,
+    STTRequest,
+    STTBatchRequest,
+    STTBatchResponse,
+    STTBatchItem,
+    STTBatchStats,
+)
+from services.stt.batcher import transcribe_paths
+from services.stt.runtime import get_stt_runtime
+from services.stt.streaming import (
+    ENCODINGS,
+    OpusStreamDecoder,
+    StreamingTranscriber,
+    parse_control_message,
+    pcm_to_float32,
+)
+from utils.audio_context import AudioContext
+from utils.executors import ExecutorOverloaded
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Carrega config uma única vez
-_provider, _asr_obj, _kwargs = load_stt_pipeline()
+# Carrega o pipeline uma única vez (compartilhado com /conversation/turn)
+_stt = get_stt_runtime()
+_provider, _asr_obj, _kwargs = _stt.provider, _stt.asr_obj, _stt.kwargs
+_long_form = _stt.long_form
+_streaming = _stt.streaming
+_batching = _stt.batching
+_vad = _stt.vad
+_batcher = _stt.batcher
 
 @router.post("/", response_model=STTResponse)
-def stt_transcribe(request: STTRequest):
+async def stt_transcribe(request: STTRequest):
     """
     Recebe audio_path (local ou gs://...), chama HuggingFace ou OpenAI.
+    Áudios repetidos (mesmo conteúdo) são servidos do cache.
+    """
+    ctx = await run_in_threadpool(AudioContext.from_source, request.audio_path)
+    text, vad_info, cached = await _stt.transcribe(ctx)
+    return STTResponse(text=text, vad=vad_info, cached=cached)
+
+@router.post("/batch", response_model=STTBatchResponse)
+async def stt_transcribe_batch(request: STTBatchRequest):
+    """
+    Transcreve N áudios numa chamada; no HuggingFace e no CTC eles são agrupados em lotes.
+    Os downloads rodam antes, fora do executor; o lote ocupa uma vaga do
+    executor do Whisper só durante a inferência.
     """
-    text = stt_from_audio(
-        request.audio_path,
+    start = time.perf_counter()
+    contexts = await asyncio.gather(
+        *(run_in_threadpool(AudioContext.from_source, path) for path in request.audio_paths)
+    )
+    texts, batches = await _stt.executor.run(
+        transcribe_paths,
+        contexts,
         provider=_provider,
         asr_obj=_asr_obj,
         transcription_kwargs=_kwargs,
+        long_form=_long_form,
+        batcher=_batcher,
+        max_workers=_batching["max_workers"],
+        vad=_vad,
+    )
+    return STTBatchResponse(
+        results=[STTBatchItem(audio_path=p, text=t) for p, t in zip(request.audio_paths, texts)],
+        batches=[STTBatchStats(**b.to_dict()) for b in batches],
+        elapsed_s=round(time.perf_counter() - start, 3),
     )
-    return STTResponse(text=text)
+
+@router.websocket("/stream")
+async def stt_stream(websocket: WebSocket, encoding: str = "pcm_s16le"):
+    """
+    Transcrição em tempo real.
+
+    O cliente envia frames binários (PCM 16 kHz mono `pcm_s16le`/`pcm_f32le`
+    ou fluxo Ogg/WebM `opus`) e, ao terminar, a mensagem de texto `end`.
+    O servidor responde com JSON `{"type": "partial"|"final", "text": ...}` e,
+    com o executor do Whisper cheio, `{"type": "error", "status": 429|503}`.
+    """
+    await websocket.accept()
+    if encoding not in ENCODINGS:
+        await websocket.send_json({"type": "error", "detail": f"encoding deve ser um de {ENCODINGS}"})
+        await websocket.close(code=1003)
+        return
+
+    asr_pipe = await run_in_threadpool(_stt.streaming_pipeline)
+    transcriber = StreamingTranscriber(asr_pipe, _streaming)
+    decoder = OpusStreamDecoder() if encoding == "opus" else None
+    new_audio = asyncio.Event()
+    finished = asyncio.Event()
+    disconnected = False
+
+    async def _receive():
+        nonlocal disconnected
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    disconnected = True
+                    break
+                if message.get("bytes"):
+                    if decoder is not None:
+                        await run_in_threadpool(decoder.feed, message["bytes"])
+                        transcriber.append(decoder.read())
+                    else:
+                        transcriber.append(pcm_to_float32(message["bytes"], encoding))
+                    new_audio.set()
+                elif message.get("text"):
+                    if parse_control_message(message["text"]).get("event") == "end":
+                        break
+        finally:
+            if decoder is not None:
+                transcriber.append(await run_in_threadpool(decoder.close))
+            finished.set()
+            new_audio.set()
+
+    async def _infer(fn):
+        # Passos do modelo no executor do Whisper; o handler de main.py só vale
+        # para HTTP, então a recusa vira um evento de erro no socket. Recusado
+        # antes de rodar, o áudio continua no buffer para o próximo passo.
+        try:
+            return await _stt.executor.run(fn)
+        except ExecutorOverloaded as e:
+            await websocket.send_json({"type": "error", "detail": str(e), "status": e.status_code})
+            return []
+
+    async def _decode():
+        while not finished.is_set():
+            await new_audio.wait()
+            new_audio.clear()
+            for event in await _infer(transcriber.step):
+                await websocket.send_json(event)
+        if disconnected:
+            return
+        for event in await _infer(transcriber.finish):
+            await websocket.send_json(event)
+        await websocket.send_json({"type": "end"})
+
+    try:
+        await asyncio.gather(_receive(), _decode())
+        if not disconnected:
+            await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Cliente desconectou do streaming de STT")
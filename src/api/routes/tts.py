@@ -1,45 +1,240 @@
-from fastapi import APIRouter, HTTPException
-from api.schemas.tts import TTSRequest, TTSResponse, ElevenTTSRequest, ElevenTTSResponse
-from services.tts.tts import tts_from_text, load_tts_pipeline, tts_eleven
+from fastapi import APIRouter, BackgroundTasks, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from api.schemas.tts import TTSRequest, TTSResponse, TTSStreamRequest, ElevenTTSRequest, ElevenTTSResponse
+from services.tts.tts import (
+    tts_from_text,
+    tts_eleven,
+    tts_render,
+    persist_tts_audio,
+    eleven_cache_key,
+    persist_eleven_audio,
+)
+from services.tts.elevenlabs import DEFAULT_MODEL_ID, DEFAULT_VOICE_ID, get_elevenlabs_client, relay
+from services.tts.runtime import get_tts_runtime
+from utils.audio_io import content_type, encode_audio, encode_wav, float_to_pcm16, read_audio_bytes, wav_stream_header
+from utils.executors import ExecutorOverloaded, get_executor
+import logging
 import uuid
 
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-# Carrega modelo na inicialização
-tts_tuple, language, output_dir, audio_format = load_tts_pipeline()
+# Carrega modelo na inicialização (compartilhado com /assistant/reply_and_speak)
+_runtime = get_tts_runtime()
+tts_tuple, language, output_dir, audio_format = (
+    _runtime.tts_tuple, _runtime.language, _runtime.output_dir, _runtime.audio_format
+)
+_bitrate_kbps = _runtime.bitrate_kbps
+_tts_batcher = _runtime.batcher
+_synthesizer = _runtime.synthesizer
+_tts_cache = _runtime.cache
+# Pool dedicado ao VITS: síntese com concorrência e fila limitadas
+_vits_executor = get_executor("vits")
+
+async def _stream_response(text: str, fmt: str = "wav", on_complete=None) -> StreamingResponse:
+    """
+    Sintetiza a primeira frase antes de responder (erros viram HTTP 500) e
+    envia as demais conforme ficam prontas. `on_complete` recebe o áudio inteiro.
+    Todas as frases passam pelo executor do VITS; fila cheia na primeira vira
+    429/503, nas seguintes encerra o stream.
+    """
+    segments = _synthesizer.astream_sentences(text)
+    try:
+        first = await segments.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=400, detail="Texto vazio")
+    except ExecutorOverloaded:
+        await segments.aclose()
+        raise
+    except Exception as e:
+        await segments.aclose()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def _chunks():
+        waveforms = [first.waveform]
+        try:
+            if fmt == "wav":
+                yield wav_stream_header(first.sample_rate)
+            yield float_to_pcm16(first.waveform)
+            async for segment in segments:
+                waveforms.append(segment.waveform)
+                yield float_to_pcm16(segment.waveform)
+        except ExecutorOverloaded as e:
+            logger.warning(f"TTS streaming interrompido: {e}")
+            return
+        finally:
+            await segments.aclose()
+        if on_complete is not None:
+            on_complete(np.concatenate(waveforms), first.sample_rate)
+
+    return StreamingResponse(
+        _chunks(),
+        media_type="audio/wav" if fmt == "wav" else "audio/L16",
+        headers={"X-Sample-Rate": str(first.sample_rate)},
+    )
 
 @router.post("/pretrained", response_model=TTSResponse)
-def tts_generate(request: TTSRequest):
+async def tts_generate(request: TTSRequest, background_tasks: BackgroundTasks):
     """
-    Converte texto em fala usando modelo pré-treinado local
+    Converte texto em fala usando modelo pré-treinado local.
+
+    - response_mode="uri" (padrão): devolve o gs:// do áudio.
+    - response_mode="bytes": devolve o áudio no corpo; o upload ao GCS (se
+      `persist`) acontece depois da resposta e o gs:// já existente, se houver,
+      vem no header X-Audio-Path.
+    - response_mode="stream": WAV contínuo, frase a frase.
     """
+    if request.response_mode == "stream":
+        on_complete = None
+        if request.persist:
+            on_complete = lambda waveform, sr: background_tasks.add_task(
+                persist_tts_audio, encode_audio(waveform, sr, audio_format, _bitrate_kbps),
+                request.text, tts_tuple, audio_format, _tts_cache, _bitrate_kbps,
+            )
+        return await _stream_response(request.text, on_complete=on_complete)
+
     try:
+        if request.response_mode == "bytes":
+            audio_bytes, gs_uri = await _vits_executor.run(
+                tts_render, request.text, tts_tuple, audio_format,
+                cache=_tts_cache, batcher=_tts_batcher, bitrate_kbps=_bitrate_kbps,
+            )
+            headers = {}
+            if gs_uri is not None:
+                headers["X-Audio-Path"] = gs_uri
+            elif request.persist:
+                background_tasks.add_task(
+                    persist_tts_audio, audio_bytes, request.text, tts_tuple, audio_format,
+                    _tts_cache, _bitrate_kbps,
+                )
+            return Response(content=audio_bytes, media_type=content_type(audio_format), headers=headers)
+
         file_id = str(uuid.uuid4())
 
-        gs_path = tts_from_text(
+        gs_path = await _vits_executor.run(
+            tts_from_text,
             text=request.text,
             tts_tuple=tts_tuple,
             language=language,
             output_dir=output_dir,  
             file_name=file_id,
-            audio_format=audio_format
+            audio_format=audio_format,
+            cache=_tts_cache,
+            batcher=_tts_batcher,
+            bitrate_kbps=_bitrate_kbps,
         )
         return TTSResponse(audio_path=gs_path, file_id=file_id)
+    except ExecutorOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/stream")
+async def tts_stream(request: TTSStreamRequest):
+    """
+    Sintetiza frase a frase e envia o áudio conforme fica pronto.
+    O primeiro trecho chega após a síntese da primeira frase, não do texto todo.
+    """
+    return await _stream_response(request.text, request.format)
+
+@router.websocket("/ws")
+async def tts_ws(websocket: WebSocket):
+    """
+    TTS por WebSocket. O cliente envia `{"text": ...}`; para cada frase o servidor
+    manda um JSON `{"type": "segment", ...}` seguido do WAV em binário e, ao final,
+    `{"type": "end"}`; com o executor do VITS cheio, `{"type": "error", "status": 429|503}`.
+    A conexão aceita vários textos em sequência.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            text = (message.get("text") or "").strip()
+            if not text:
+                await websocket.send_json({"type": "error", "detail": "Texto vazio"})
+                continue
+
+            try:
+                async for segment in _synthesizer.astream_sentences(text):
+                    await websocket.send_json({
+                        "type": "segment",
+                        "index": segment.index,
+                        "text": segment.text,
+                        "sample_rate": segment.sample_rate,
+                        "synth_s": round(segment.synth_s, 3),
+                    })
+                    await websocket.send_bytes(encode_wav(segment.waveform, segment.sample_rate))
+            except ExecutorOverloaded as e:
+                # O handler de main.py só vale para HTTP: avisa o cliente pelo socket
+                await websocket.send_json({"type": "error", "detail": str(e), "status": e.status_code})
+                continue
+            await websocket.send_json({"type": "end"})
+    except WebSocketDisconnect:
+        logger.info("Cliente desconectou do streaming de TTS")
+
+@router.get("/cache/stats")
+def tts_cache_stats():
+    """Hits/misses do cache de áudios sintetizados."""
+    return _tts_cache.stats() if _tts_cache is not None else {"enabled": False}
+
 @router.post("/elevenlabs", response_model=ElevenTTSResponse)
-def tts_generate_eleven(req: ElevenTTSRequest):
+async def tts_generate_eleven(req: ElevenTTSRequest, background_tasks: BackgroundTasks):
     """
-    Converte texto em fala usando ElevenLabs e retorna gs://...
+    Converte texto em fala usando ElevenLabs.
+
+    - response_mode="uri" (padrão): retorna gs://...
+    - response_mode="stream": repassa o áudio da ElevenLabs conforme chega; o
+      upload ao GCS (se `persist`) acontece depois que a transmissão termina.
     """
+    voice_id = req.voice_id or DEFAULT_VOICE_ID
+    if req.response_mode == "stream":
+        return await run_in_threadpool(_eleven_stream_response, req, voice_id, background_tasks)
+
     try:
-        gs_uri = tts_eleven(
+        # Só I/O (API da ElevenLabs e GCS): fica no threadpool, fora dos executores de modelo
+        gs_uri = await run_in_threadpool(
+            tts_eleven,
             text=req.text,
-            voice_id=req.voice_id or None,
+            voice_id=voice_id,
             voice_settings=req.voice_settings,
+            cache=_tts_cache,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
     return ElevenTTSResponse(audio_path=gs_uri)
+
+def _eleven_stream_response(req: ElevenTTSRequest, voice_id: str, background_tasks: BackgroundTasks):
+    client = get_elevenlabs_client()
+
+    if _tts_cache is not None:
+        gs_uri = _tts_cache.get(eleven_cache_key(req.text, voice_id, DEFAULT_MODEL_ID, req.voice_settings))
+        if gs_uri is not None:
+            return Response(
+                content=read_audio_bytes(gs_uri),
+                media_type=client.content_type,
+                headers={"X-Audio-Path": gs_uri},
+            )
+
+    chunks = client.stream(req.text, voice_id=voice_id, voice_settings=req.voice_settings)
+    try:
+        # Primeiro bloco antes de responder: erros da API viram HTTP 500
+        first = next(chunks, b"")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def _body():
+        yield first
+        yield from chunks
+
+    on_complete = None
+    if req.persist:
+        on_complete = lambda audio_bytes: background_tasks.add_task(
+            persist_eleven_audio, audio_bytes, req.text, voice_id, DEFAULT_MODEL_ID,
+            req.voice_settings, cache=_tts_cache,
+        )
+    return StreamingResponse(relay(_body(), on_complete), media_type=client.content_type)
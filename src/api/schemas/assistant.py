@@ -1,10 +1,44 @@
+from typing import Optional
 from pydantic import BaseModel, Field
 
 class AssistantRequestMessages(BaseModel):
     messages: list[dict] = Field(..., description="Mensagens de entrada fornecidas pelo usuário")
+    conversation_id: Optional[str] = Field(
+        None, description="Identifica a conversa para reaproveitar o resumo do histórico"
+    )
+    cacheable: bool = Field(False, description="Permite servir/guardar a resposta no cache do LLM")
 
 class AssistantRequest(BaseModel):
     user_text: str = Field(..., description="Texto de entrada fornecido pelo usuário")
+    cacheable: bool = Field(False, description="Permite servir/guardar a resposta no cache do LLM")
 
 class AssistantResponse(BaseModel):
     assistant_text: str = Field(..., description="Resposta do assistente")
+
+class SessionCreateRequest(BaseModel):
+    system_prompt: Optional[str] = Field(
+        None, description="Prompt de sistema da conversa (usa o prompt padrão do assistente se omitido)"
+    )
+    metadata: Optional[dict] = Field(None, description="Dados livres associados à sessão")
+    messages: Optional[list[dict]] = Field(
+        None, description="Histórico inicial (ex.: para restaurar uma sessão expirada)"
+    )
+
+class SessionCreateResponse(BaseModel):
+    session_id: str = Field(..., description="Identificador da sessão")
+
+class SessionMessageRequest(BaseModel):
+    content: str = Field(..., description="Nova mensagem do usuário (só a deste turno)")
+    stream: bool = Field(False, description="Responde via Server-Sent Events")
+
+class SessionMessageResponse(BaseModel):
+    session_id: str
+    assistant_text: str = Field(..., description="Resposta do assistente")
+    turns: int = Field(..., description="Mensagens na sessão após este turno")
+
+class SessionResponse(BaseModel):
+    session_id: str
+    messages: list[dict]
+    metadata: dict
+    created_at: float
+    updated_at: float
@@ -0,0 +1,37 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+class ConversationTurnRequest(BaseModel):
+    audio_path: Optional[str] = Field(
+        None, description="Áudio do usuário (gs://bucket/obj.wav ou caminho local)"
+    )
+    audio_b64: Optional[str] = Field(
+        None, description="Alternativa a audio_path: o próprio áudio em base64 (evita o upload ao GCS)"
+    )
+    threshold: float = Field(0.45, ge=0.0, le=1.0, description="Threshold da identificação do locutor")
+    session_id: Optional[str] = Field(
+        None, description="Sessão criada em /assistant/sessions; o turno é gravado nela"
+    )
+    messages: Optional[List[Dict[str, Any]]] = Field(
+        None, description="Histórico anterior, se não houver sessão"
+    )
+    tts_provider: Literal["pretrained", "elevenlabs", "none"] = Field(
+        "pretrained", description="Motor de síntese da resposta (none: só texto)"
+    )
+    voice_id: Optional[str] = Field(None, description="Voice ID da ElevenLabs")
+    voice_settings: Optional[Dict[str, Any]] = Field(None, description="Parâmetros de voz da ElevenLabs")
+
+class SpeakerInfo(BaseModel):
+    matched: bool = Field(..., description="Se o locutor foi reconhecido")
+    speaker_id: Optional[str] = Field(None, description="UUID do locutor no Qdrant")
+    speaker_name: Optional[str] = Field(None, description="Nome cadastrado no BigQuery")
+    score: Optional[float] = Field(None, description="Similaridade de cosseno com o locutor mais próximo")
+
+class ConversationTurnResponse(BaseModel):
+    user_text: str = Field(..., description="Transcrição do áudio do usuário")
+    speaker: SpeakerInfo
+    assistant_text: str = Field(..., description="Resposta do assistente")
+    audio_b64: Optional[str] = Field(None, description="Áudio da resposta em base64")
+    content_type: Optional[str] = Field(None, description="Tipo MIME do áudio da resposta")
+    session_id: Optional[str] = None
+    timings: Dict[str, float] = Field(..., description="Duração de cada etapa (s)")
@@ -1,4 +1,6 @@
 from pydantic import BaseModel, Field
+from typing import Optional
+from api.schemas.vad import VADInfo
 
 class SpeakerRegisterRequest(BaseModel):
     speaker_name: str = Field(..., description="Nome do locutor que será cadastrado")
@@ -9,3 +11,4 @@ class SpeakerRegisterRequest(BaseModel):
 class SpeakerRegisterResponse(BaseModel):
     speaker_id: str = Field(..., description="UUID gerado/atribuído no Qdrant")
     status: str     = Field(..., description="Mensagem de status da operação")
+    vad: Optional[VADInfo] = Field(None, description="Trechos mantidos pelo VAD (se habilitado para a rota)")
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from api.schemas.vad import VADInfo
 
 class SpeakerVerificationRequest(BaseModel):
     audio_path: str = Field(
@@ -21,3 +22,6 @@ class SpeakerVerificationResponse(BaseModel):
     score: Optional[float]    = Field(
         None, description="Score/distância devolvido pelo Qdrant"
     )
+    vad: Optional[VADInfo]    = Field(
+        None, description="Trechos mantidos pelo VAD (se habilitado para a rota)"
+    )
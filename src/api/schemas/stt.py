@@ -1,7 +1,30 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from api.schemas.vad import VADInfo
 
 class STTRequest(BaseModel):
     audio_path: str
 
 class STTResponse(BaseModel):
-    text: str
\ No newline at end of file
+    text: str
+    vad: Optional[VADInfo] = None
+    cached: bool = Field(False, description="Se veio do cache ou de uma transcrição idêntica em andamento")
+
+class STTBatchRequest(BaseModel):
+    audio_paths: List[str] = Field(..., min_length=1, description="Caminhos dos áudios (locais ou gs://...)")
+
+class STTBatchItem(BaseModel):
+    audio_path: str
+    text: str
+
+class STTBatchStats(BaseModel):
+    batch_id: int
+    size: int = Field(..., description="Quantidade de áudios no lote")
+    audio_s: float = Field(..., description="Duração total do áudio do lote (s)")
+    elapsed_s: float = Field(..., description="Tempo de processamento do lote (s)")
+    rtf: float = Field(..., description="Real-time factor: elapsed_s / audio_s")
+
+class STTBatchResponse(BaseModel):
+    results: List[STTBatchItem]
+    batches: List[STTBatchStats] = Field(default_factory=list, description="Lotes do HuggingFace/CTC (vazio para os demais providers)")
+    elapsed_s: float
@@ -1,12 +1,26 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 
 class TTSRequest(BaseModel):
     text: str
+    response_mode: Literal["uri", "bytes", "stream"] = Field(
+        "uri",
+        description="uri: JSON com o gs://; bytes: o áudio no corpo da resposta; "
+        "stream: WAV contínuo, frase a frase",
+    )
+    persist: bool = Field(
+        True, description="Em bytes/stream: salva o áudio no GCS em segundo plano"
+    )
 
 class TTSResponse(BaseModel):
     audio_path: str
 
+class TTSStreamRequest(BaseModel):
+    text: str = Field(..., description="Texto a ser sintetizado frase a frase")
+    format: Literal["wav", "pcm"] = Field(
+        "wav", description="wav: um único WAV contínuo; pcm: PCM 16 bits cru (taxa no header X-Sample-Rate)"
+    )
+
 class ElevenTTSRequest(BaseModel):
     text: str = Field(..., description="Texto a ser sintetizado")
     voice_id: Optional[str] = Field(
@@ -17,6 +31,12 @@ class ElevenTTSRequest(BaseModel):
         description="Dict com 'stability', 'similarity_boost' etc. "
         "(deixa em branco para usar defaults)",
     )
+    response_mode: Literal["uri", "stream"] = Field(
+        "uri", description="uri: JSON com o gs://; stream: o áudio repassado conforme chega"
+    )
+    persist: bool = Field(
+        True, description="Em stream: salva o áudio no GCS depois da transmissão"
+    )
 
 class ElevenTTSResponse(BaseModel):
     audio_path: str = Field(..., description="Caminho gs:// do áudio gerado")
\ No newline at end of file
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class SpeechSegmentInfo(BaseModel):
+    start_s: float = Field(..., description="Início do trecho mantido no áudio original (s)")
+    end_s: float   = Field(..., description="Fim do trecho mantido no áudio original (s)")
+
+class VADInfo(BaseModel):
+    speech_detected: bool = Field(..., description="Se o VAD encontrou fala (senão o áudio foi mantido inteiro)")
+    input_s: float        = Field(..., description="Duração do áudio recebido (s)")
+    kept_s: float         = Field(..., description="Duração enviada ao modelo (s)")
+    elapsed_ms: float     = Field(..., description="Tempo gasto pelo VAD (ms)")
+    segments: List[SpeechSegmentInfo]
@@ -1,5 +1,7 @@
-from fastapi import FastAPI
-from api.routes import tts, stt, speaker_verification, assistant, speaker_registration
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from api.routes import tts, stt, speaker_verification, assistant, speaker_registration, conversation, executors
+from utils.executors import ExecutorOverloaded
 
 app = FastAPI(
     title="EchoLoco API",
@@ -12,4 +14,15 @@ app.include_router(tts.router, prefix="/tts", tags=["TTS"])
 app.include_router(stt.router, prefix="/stt", tags=["STT"])
 app.include_router(speaker_verification.router, prefix="/speaker", tags=["Speaker Recognition"])
 app.include_router(assistant.router, prefix="/assistant", tags=["Assistant"])
-app.include_router(speaker_registration.router, prefix="/speaker_registration", tags=["Speaker Registration"])
\ No newline at end of file
+app.include_router(speaker_registration.router, prefix="/speaker_registration", tags=["Speaker Registration"])
+app.include_router(conversation.router, prefix="/conversation", tags=["Conversation"])
+app.include_router(executors.router, prefix="/executors", tags=["Executors"])
+
+@app.exception_handler(ExecutorOverloaded)
+async def executor_overloaded_handler(request: Request, exc: ExecutorOverloaded):
+    # Fila do modelo cheia (429) ou espera esgotada (503): recusa rápida
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after_s))},
+    )
@@ -1,6 +1,11 @@
 import os
+import time
 from utils.load_config import load_config
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from services.assistant.llm import GPT, GEMINI
+from services.assistant.llm_async import AsyncLLM, load_llm_async_config
+from services.assistant.history import HistoryCompactor, load_history_config
+from services.assistant.response_cache import ResponseCache, load_response_cache_config
 
 class Assistant:
     def __init__(self, config_path=None, prompt_path=None):
@@ -22,6 +27,24 @@ class Assistant:
         else:
             raise ValueError(f"Provider não suportado: {provider}")
 
+        # Cliente async com failover GPT <-> Gemini (usado pelas rotas async)
+        models = {
+            'gpt': llm_config.get('gpt_model', 'gpt-4o-mini'),
+            'gemini': llm_config.get('gemini_model', 'gemini-2.5-flash-preview-04-17'),
+        }
+        self.allm = AsyncLLM.from_config(provider, models, load_llm_async_config(llm_config))
+
+        # Mantém o prompt dentro do orçamento de tokens do modelo
+        self.history = HistoryCompactor(self.llm, model, load_history_config(config['assistant']))
+
+        # Respostas de requisições marcadas como cacheable (saudações, FAQ)
+        cache_cfg = load_response_cache_config(config['assistant'])
+        self.cache = None
+        if cache_cfg['enabled']:
+            embedding_model = cache_cfg['semantic']['embedding_model']
+            embed = (lambda text: self.llm.embed(text, model=embedding_model)) if embedding_model else self.llm.embed
+            self.cache = ResponseCache(provider, model, cache_cfg, embed=embed)
+
 
         prompt_path = prompt_path or os.path.join(os.path.dirname(__file__), "prompt.txt")
         if os.path.exists(prompt_path):
@@ -31,18 +54,95 @@ class Assistant:
             self.prompt_base = ""
 
 
-    def reply(self, user_text):
+    def _invoke(self, messages, cacheable=False):
+        if not cacheable or self.cache is None:
+            return self.llm.invoke(messages)
+        resposta, _ = self.cache.get_or_compute(messages, lambda: self.llm.invoke(messages))
+        return resposta
+
+    def reply(self, user_text, cacheable=False):
         messages = [
             {"role": "system", "content": self.prompt_base},
             {"role": "user", "content": user_text}
         ]
-        resposta = self.llm.invoke(messages)
+        resposta = self._invoke(messages, cacheable)
         return resposta
     
-    def reply_api(self, messages):
-        resposta = self.llm.invoke(messages)
+    def reply_api(self, messages, conversation_id=None, cacheable=False):
+        messages = self.history.compact(messages, conversation_id)
+        resposta = self._invoke(messages, cacheable)
         return resposta
 
+    def reply_stream(self, messages, conversation_id=None, cacheable=False):
+        """Como `reply_api`, mas gera a resposta em trechos conforme o LLM produz."""
+        messages = self.history.compact(messages, conversation_id)
+        if not cacheable or self.cache is None:
+            yield from self.llm.stream(messages)
+            return
+
+        cached, _, probe = self.cache.lookup(messages)
+        if cached is not None:
+            yield cached
+            return
+        start = time.perf_counter()
+        parts = []
+        for delta in self.llm.stream(messages):
+            parts.append(delta)
+            yield delta
+        resposta = "".join(parts).strip()
+        if resposta:
+            self.cache.set(messages, resposta, time.perf_counter() - start, probe)
+
+    # ------------------------------------------------------------------ #
+    # Versões async (failover entre providers quando `allm` está ativo)  #
+    # ------------------------------------------------------------------ #
+    async def _ainvoke(self, messages, cacheable=False):
+        if self.allm is None:
+            return await run_in_threadpool(self._invoke, messages, cacheable)
+        if not cacheable or self.cache is None:
+            return await self.allm.invoke(messages)
+        resposta, _ = await self.cache.aget_or_compute(messages, lambda: self.allm.invoke(messages))
+        return resposta
+
+    async def areply(self, user_text, cacheable=False):
+        messages = [
+            {"role": "system", "content": self.prompt_base},
+            {"role": "user", "content": user_text}
+        ]
+        return await self._ainvoke(messages, cacheable)
+
+    async def areply_api(self, messages, conversation_id=None, cacheable=False):
+        messages = self.history.compact(messages, conversation_id)
+        return await self._ainvoke(messages, cacheable)
+
+    async def areply_stream(self, messages, conversation_id=None, cacheable=False):
+        if self.allm is None:
+            async for delta in iterate_in_threadpool(self.reply_stream(messages, conversation_id, cacheable)):
+                yield delta
+            return
+
+        messages = self.history.compact(messages, conversation_id)
+        probe = None
+        if cacheable and self.cache is not None:
+            cached, _, probe = await run_in_threadpool(self.cache.lookup, messages)
+            if cached is not None:
+                yield cached
+                return
+        start = time.perf_counter()
+        parts = []
+        async for delta in self.allm.stream(messages):
+            parts.append(delta)
+            yield delta
+        resposta = "".join(parts).strip()
+        if probe is not None and resposta:
+            self.cache.set(messages, resposta, time.perf_counter() - start, probe)
+
+    def llm_stats(self):
+        return self.allm.stats() if self.allm is not None else {"enabled": False}
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else {"enabled": False}
+
     def welcome(self):
         return self.greeting
 
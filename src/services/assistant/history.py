@@ -0,0 +1,198 @@
+"""
+Compactação do histórico da conversa por orçamento de tokens.
+
+O prompt de sistema e as mensagens mais recentes seguem literais; as mais
+antigas são trocadas por um resumo. O resumo é mantido por conversa
+(`conversation_id` ou, sem ele, uma impressão digital do início da conversa)
+e atualizado de forma incremental em segundo plano: a requisição atual usa o
+último resumo pronto e nunca espera o LLM resumir. Enquanto não há resumo,
+as mensagens antigas são simplesmente descartadas.
+
+Os tokens são contados localmente com o tiktoken (ou ~4 caracteres por token
+se ele não estiver instalado).
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List
+
+from utils.cache import TTLCache
+
+try:
+    import tiktoken
+except ModuleNotFoundError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY = {
+    "enabled": True,
+    "budgets": {                # tokens de entrada por modelo ("default" para os demais)
+        "default": 4000,
+        "gpt-4o-mini": 6000,
+        "gpt-4.1-mini": 6000,
+    },
+    "keep_recent": 6,           # mensagens finais sempre literais (se couberem)
+    "summary_max_words": 150,
+    "ttl_s": 3600,              # resumos de conversas inativas expiram
+    "maxsize": 1024,
+}
+
+# Overhead aproximado de formatação por mensagem no chat da OpenAI
+_TOKENS_PER_MESSAGE = 4
+
+_SUMMARY_PROMPT = (
+    "Você mantém um resumo de uma conversa entre um usuário e um assistente de voz. "
+    "Atualize o resumo abaixo incorporando as novas mensagens. Preserve nomes, fatos, "
+    "preferências, pedidos em aberto e decisões; descarte cumprimentos e repetições. "
+    "Responda só com o resumo, em português, com no máximo {max_words} palavras.\n\n"
+    "Resumo atual:\n{summary}\n\nNovas mensagens:\n{transcript}"
+)
+
+
+def load_history_config(assistant_cfg: Dict) -> Dict:
+    user_cfg = assistant_cfg.get("history") or {}
+    merged = {**DEFAULT_HISTORY, **user_cfg}
+    merged["budgets"] = {**DEFAULT_HISTORY["budgets"], **(user_cfg.get("budgets") or {})}
+    return merged
+
+
+class TokenCounter:
+    def __init__(self, model: str):
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                # modelos desconhecidos (ex.: Gemini): aproximação com o encoding da OpenAI
+                self._encoding = tiktoken.get_encoding("o200k_base")
+
+    def text(self, text: str) -> int:
+        if self._encoding is None:
+            return max(1, len(text) // 4)
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def message(self, message: Dict) -> int:
+        return _TOKENS_PER_MESSAGE + self.text(str(message.get("content", "")))
+
+    def messages(self, messages: List[Dict]) -> int:
+        return sum(self.message(m) for m in messages)
+
+
+@dataclass
+class _Summary:
+    text: str
+    covered: int        # quantas mensagens (sem contar as de sistema iniciais) o resumo cobre
+    digest: str         # hash dessas mensagens, para detectar histórico editado
+
+
+def _digest(messages: List[Dict]) -> str:
+    payload = json.dumps([(m.get("role"), m.get("content")) for m in messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _transcript(messages: List[Dict]) -> str:
+    names = {"user": "Usuário", "assistant": "Assistente"}
+    return "\n".join(f"{names.get(m.get('role'), m.get('role'))}: {m.get('content', '')}" for m in messages)
+
+
+class HistoryCompactor:
+    def __init__(self, llm, model: str, cfg: Dict | None = None):
+        self.llm = llm
+        self.cfg = {**DEFAULT_HISTORY, **(cfg or {})}
+        budgets = self.cfg["budgets"]
+        self.budget = int(budgets.get(model, budgets["default"]))
+        self.counter = TokenCounter(model)
+        self._summaries = TTLCache(maxsize=self.cfg["maxsize"], ttl_s=self.cfg["ttl_s"])
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+
+    @staticmethod
+    def fingerprint(messages: List[Dict]) -> str:
+        """Identifica a conversa pelas primeiras mensagens, que não mudam entre turnos."""
+        return _digest(messages[:2])
+
+    def compact(self, messages: List[Dict], conversation_id: str | None = None) -> List[Dict]:
+        """Devolve as mensagens cabendo em `budget` tokens."""
+        if not self.cfg["enabled"] or self.counter.messages(messages) <= self.budget:
+            return messages
+
+        n_system = 0
+        while n_system < len(messages) and messages[n_system].get("role") == "system":
+            n_system += 1
+        system, turns = messages[:n_system], messages[n_system:]
+        key = conversation_id or self.fingerprint(messages)
+
+        summary = self._summaries.get(key)
+        if summary is not None and (
+            summary.covered > len(turns) or _digest(turns[: summary.covered]) != summary.digest
+        ):
+            summary = None  # histórico foi editado: o resumo não vale mais
+
+        # Quantas mensagens finais cabem literais junto com o sistema e o resumo.
+        # Mensagens já cobertas pelo resumo nunca voltam literais (`floor`).
+        floor = summary.covered if summary else 0
+        keep = min(len(turns), int(self.cfg["keep_recent"]))
+        while True:
+            cutoff = max(len(turns) - keep, floor)
+            summary_msgs = self._summary_messages(summary, cutoff)
+            total = self.counter.messages(system + summary_msgs + turns[cutoff:])
+            if total <= self.budget or keep <= 1:
+                break
+            keep -= 1
+        keep = len(turns) - cutoff
+        # Sobra orçamento: traz de volta mensagens mais antigas (as que o resumo
+        # ainda não cobre, para não repetir conteúdo)
+        while len(turns) - keep > floor:
+            candidate = self.counter.message(turns[len(turns) - keep - 1])
+            if total + candidate > self.budget:
+                break
+            keep, total = keep + 1, total + candidate
+        cutoff = len(turns) - keep
+
+        if cutoff > (summary.covered if summary else 0):
+            self._schedule_summary(key, turns[:cutoff], summary)
+
+        compacted = system + self._summary_messages(summary, cutoff) + turns[cutoff:]
+        logger.info(
+            f"Histórico compactado: {len(messages)} -> {len(compacted)} mensagens, "
+            f"{self.counter.messages(compacted)}/{self.budget} tokens"
+        )
+        return compacted
+
+    def _summary_messages(self, summary: "_Summary | None", cutoff: int) -> List[Dict]:
+        if summary is None or cutoff == 0:
+            return []
+        return [{"role": "system", "content": f"Resumo da conversa até aqui: {summary.text}"}]
+
+    # ------------------------------------------------------------------ #
+    # Resumo em segundo plano                                            #
+    # ------------------------------------------------------------------ #
+    def _schedule_summary(self, key: str, older: List[Dict], summary: "_Summary | None") -> None:
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._update_summary, key, list(older), summary)
+
+    def _update_summary(self, key: str, older: List[Dict], summary: "_Summary | None") -> None:
+        try:
+            start = summary.covered if summary else 0
+            prompt = _SUMMARY_PROMPT.format(
+                max_words=self.cfg["summary_max_words"],
+                summary=summary.text if summary else "(vazio)",
+                transcript=_transcript(older[start:]),
+            )
+            text = self.llm.invoke([{"role": "user", "content": prompt}])
+            if text:
+                self._summaries.set(key, _Summary(text.strip(), len(older), _digest(older)))
+        except Exception as e:
+            logger.error(f"Falha ao atualizar o resumo da conversa: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
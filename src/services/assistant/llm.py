@@ -5,6 +5,37 @@ import google.generativeai as genai
 
 load_dotenv()
 
+
+def to_gemini_contents(messages):
+    """
+    Converte mensagens no formato da OpenAI ({"role", "content"}) para o do
+    Gemini ({"role": "user"|"model", "parts": [...]}). Mensagens de sistema
+    viram um prefixo da primeira mensagem do usuário. Strings passam direto.
+    """
+    if isinstance(messages, str):
+        return messages
+    if isinstance(messages, dict):
+        messages = [messages]
+
+    system = "\n\n".join(m["content"] for m in messages if m.get("role") == "system" and m.get("content"))
+    contents = []
+    for m in messages:
+        if m.get("role") == "system":
+            continue
+        role = "model" if m.get("role") == "assistant" else "user"
+        text = m.get("content", "")
+        if system and role == "user" and not any(c["role"] == "user" for c in contents):
+            text = f"{system}\n\n{text}"
+        # o Gemini exige alternância de papéis: junta mensagens seguidas do mesmo papel
+        if contents and contents[-1]["role"] == role:
+            contents[-1]["parts"].append(text)
+        else:
+            contents.append({"role": role, "parts": [text]})
+    if system and not contents:
+        contents.append({"role": "user", "parts": [system]})
+    return contents
+
+
 class GPT():
     def __init__(self, api_key=None, model='gpt-4.1-mini'):
         
@@ -36,13 +67,43 @@ class GPT():
         
         response = self.client.chat.completions.create(
             messages=messages,
-            model="gpt-4o-mini",
+            model=self.model,
         )
         
         return response.choices[0].message.content.strip()
+
+    def embed(self, text, model="text-embedding-3-small"):
+        response = self.client.embeddings.create(input=text, model=model)
+        return response.data[0].embedding
+
+    def stream(self, messages):
+        """Gera os trechos de texto da resposta conforme chegam da API."""
+        if isinstance(messages, dict):
+            messages = [messages]
+
+        response = self.client.chat.completions.create(
+            messages=messages,
+            model=self.model,
+            stream=True,
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     
     
     
+def gemini_chunk_text(chunk):
+    """
+    Texto de um trecho do streaming do Gemini. `chunk.text` levanta ValueError
+    quando o trecho não tem partes (bloqueio de segurança, fim por MAX_TOKENS);
+    aqui esses trechos viram string vazia.
+    """
+    candidates = getattr(chunk, "candidates", None) or []
+    if not candidates or getattr(candidates[0], "content", None) is None:
+        return ""
+    return "".join(getattr(part, "text", "") or "" for part in candidates[0].content.parts)
+
+
 class GEMINI():
     def __init__(self, api_key=None, model='gemini-2.5-flash-preview-04-17'):
         
@@ -67,10 +128,17 @@ class GEMINI():
             return api_key.strip()
         
     def invoke(self, prompt):
-        try:
-            response = self.client.generate_content(prompt)
-            return response.text.strip()
-        
-        except Exception as e:
-            print(f"Erro ao gerar resposta: {e}")
-            return None
\ No newline at end of file
+        # Erros sobem para o chamador (antes viravam None e quebravam mais adiante)
+        response = self.client.generate_content(to_gemini_contents(prompt))
+        return response.text.strip()
+
+    def embed(self, text, model="models/text-embedding-004"):
+        return genai.embed_content(model=model, content=text)["embedding"]
+
+    def stream(self, prompt):
+        """Gera os trechos de texto da resposta conforme chegam da API."""
+        response = self.client.generate_content(to_gemini_contents(prompt), stream=True)
+        for chunk in response:
+            text = gemini_chunk_text(chunk)
+            if text:
+                yield text
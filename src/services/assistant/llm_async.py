@@ -0,0 +1,310 @@
+"""
+Camada assíncrona do LLM com failover entre providers.
+
+Cada provider (GPT e Gemini) tem um cliente async compartilhado entre as
+requisições (pool de conexões HTTP na OpenAI), um semáforo que limita as
+chamadas simultâneas, timeout por tentativa, deadline total com retries de
+backoff com jitter e um circuit breaker próprio.
+
+Com `failover.enabled`, a chamada vai para o provider configurado e, se ele
+não responder em `failover.hedge_after_s` (ou falhar, ou estiver com o
+circuito aberto), o outro provider é disparado e vence quem responder
+primeiro. No streaming, o critério é o primeiro trecho de texto: depois que
+a resposta começou a ser enviada não há troca de provider.
+"""
+
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import AsyncIterator, Dict, List, Tuple
+
+from services.assistant.llm import gemini_chunk_text, to_gemini_contents
+from utils.resilience import CircuitBreaker, hedged, retry_async
+
+try:
+    import httpx
+    import openai
+except ModuleNotFoundError:
+    httpx = None
+    openai = None
+
+try:
+    import google.generativeai as genai
+    from google.api_core import exceptions as google_exceptions
+except ModuleNotFoundError:
+    genai = None
+    google_exceptions = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_ASYNC = {
+    "enabled": True,
+    "max_concurrency": 16,    # chamadas simultâneas por provider
+    "max_connections": 32,    # pool HTTP (OpenAI)
+    "max_keepalive": 16,
+    "timeout_s": 20,          # por tentativa
+    "deadline_s": 30,         # total, incluindo retries
+    "max_retries": 1,
+    "retry_base_s": 0.25,
+    "retry_max_s": 2.0,
+    "breaker": {
+        "failure_threshold": 5,   # falhas seguidas para abrir o circuito
+        "reset_timeout_s": 30,    # tempo aberto antes da chamada de teste
+    },
+    "failover": {
+        "enabled": True,
+        "hedge_after_s": 4.0,     # orçamento de latência antes de disparar o outro provider
+    },
+}
+
+_API_KEY_ENV = {"gpt": "OPENAI_API_KEY", "gemini": "GEMINI_API_KEY"}
+
+
+def load_llm_async_config(llm_cfg: Dict) -> Dict:
+    user_cfg = llm_cfg.get("async") or {}
+    merged = {**DEFAULT_LLM_ASYNC, **user_cfg}
+    for section in ("breaker", "failover"):
+        merged[section] = {**DEFAULT_LLM_ASYNC[section], **(user_cfg.get(section) or {})}
+    return merged
+
+
+def _as_list(messages) -> List[Dict]:
+    return [messages] if isinstance(messages, dict) else messages
+
+
+# --------------------------------------------------------------------------- #
+# Clientes                                                                    #
+# --------------------------------------------------------------------------- #
+class AsyncGPT:
+    provider = "gpt"
+
+    def __init__(self, model: str, cfg: Dict | None = None):
+        if openai is None:
+            raise ImportError("pip install openai httpx")
+        self.model = model
+        self.cfg = cfg or DEFAULT_LLM_ASYNC
+        self._semaphore = asyncio.Semaphore(int(self.cfg["max_concurrency"]))
+        self._client: "openai.AsyncOpenAI | None" = None
+        self.retry_on = (
+            openai.APIConnectionError,
+            openai.APITimeoutError,
+            openai.RateLimitError,
+            openai.InternalServerError,
+        )
+
+    @property
+    def client(self) -> "openai.AsyncOpenAI":
+        # Criado no primeiro uso, já dentro do event loop do servidor
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=int(self.cfg["max_connections"]),
+                    max_keepalive_connections=int(self.cfg["max_keepalive"]),
+                ),
+                timeout=float(self.cfg["timeout_s"]),
+            )
+            self._client = openai.AsyncOpenAI(
+                api_key=os.getenv(_API_KEY_ENV["gpt"]),
+                http_client=http_client,
+                max_retries=0,  # retries ficam por nossa conta (com jitter e deadline)
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def invoke(self, messages) -> str:
+        async with self._semaphore:
+            response = await self.client.chat.completions.create(
+                messages=_as_list(messages),
+                model=self.model,
+                timeout=float(self.cfg["timeout_s"]),
+            )
+        return (response.choices[0].message.content or "").strip()
+
+    async def stream(self, messages) -> AsyncIterator[str]:
+        async with self._semaphore:
+            response = await self.client.chat.completions.create(
+                messages=_as_list(messages),
+                model=self.model,
+                stream=True,
+                timeout=float(self.cfg["timeout_s"]),
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+class AsyncGEMINI:
+    provider = "gemini"
+
+    def __init__(self, model: str, cfg: Dict | None = None):
+        if genai is None:
+            raise ImportError("pip install google-generativeai")
+        self.model = model
+        self.cfg = cfg or DEFAULT_LLM_ASYNC
+        self._semaphore = asyncio.Semaphore(int(self.cfg["max_concurrency"]))
+        genai.configure(api_key=os.getenv(_API_KEY_ENV["gemini"]))
+        self.client = genai.GenerativeModel(model_name=model)
+        self.retry_on = (
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.InternalServerError,
+        )
+
+    async def invoke(self, messages) -> str:
+        async with self._semaphore:
+            response = await self.client.generate_content_async(
+                to_gemini_contents(messages),
+                request_options={"timeout": float(self.cfg["timeout_s"])},
+            )
+        return response.text.strip()
+
+    async def stream(self, messages) -> AsyncIterator[str]:
+        async with self._semaphore:
+            response = await self.client.generate_content_async(
+                to_gemini_contents(messages),
+                stream=True,
+                request_options={"timeout": float(self.cfg["timeout_s"])},
+            )
+            async for chunk in response:
+                text = gemini_chunk_text(chunk)
+                if text:
+                    yield text
+
+
+_CLIENTS = {"gpt": AsyncGPT, "gemini": AsyncGEMINI}
+
+
+# --------------------------------------------------------------------------- #
+# Failover                                                                    #
+# --------------------------------------------------------------------------- #
+class AsyncLLM:
+    def __init__(self, primary, fallback=None, cfg: Dict | None = None):
+        self.cfg = cfg or DEFAULT_LLM_ASYNC
+        self.primary = primary
+        self.fallback = fallback if self.cfg["failover"]["enabled"] else None
+        self.breakers = {
+            client.provider: CircuitBreaker(name=f"llm-{client.provider}", **self.cfg["breaker"])
+            for client in (primary, fallback)
+            if client is not None
+        }
+        self.served = Counter()
+
+    @classmethod
+    def from_config(cls, provider: str, models: Dict[str, str], cfg: Dict) -> "AsyncLLM | None":
+        """
+        Args:
+            models: Modelo de cada provider ({"gpt": ..., "gemini": ...}).
+        """
+        if not cfg["enabled"]:
+            return None
+        primary = _CLIENTS[provider](models[provider], cfg)
+        fallback = None
+        other = "gemini" if provider == "gpt" else "gpt"
+        if cfg["failover"]["enabled"] and os.getenv(_API_KEY_ENV[other]):
+            try:
+                fallback = _CLIENTS[other](models[other], cfg)
+            except ImportError as e:
+                logger.warning(f"Failover do LLM desativado: {e}")
+        return cls(primary, fallback, cfg)
+
+    # ------------------------------------------------------------------ #
+    # Chamada a um provider                                              #
+    # ------------------------------------------------------------------ #
+    async def _with_retries(self, client, fn):
+        return await retry_async(
+            fn,
+            max_retries=int(self.cfg["max_retries"]),
+            base_delay_s=float(self.cfg["retry_base_s"]),
+            max_delay_s=float(self.cfg["retry_max_s"]),
+            retry_on=client.retry_on,
+            deadline_s=float(self.cfg["deadline_s"]),
+            name=f"llm-{client.provider}",
+        )
+
+    async def _invoke(self, client, messages) -> Tuple[str, str]:
+        breaker = self.breakers[client.provider]
+        text = await breaker.call(lambda: self._with_retries(client, lambda: client.invoke(messages)))
+        return text, client.provider
+
+    async def _open_stream(self, client, messages):
+        """Abre o stream e espera o primeiro trecho: devolve (primeiro, gerador, provider)."""
+        async def _first():
+            stream = client.stream(messages)
+            try:
+                return await stream.__anext__(), stream
+            except StopAsyncIteration:
+                return "", None
+            except BaseException:
+                # falha ou cancelamento antes do primeiro trecho: libera a vaga do semáforo
+                await stream.aclose()
+                raise
+
+        breaker = self.breakers[client.provider]
+        first, stream = await breaker.call(lambda: self._with_retries(client, _first))
+        return first, stream, client.provider
+
+    @staticmethod
+    async def _close_stream(result) -> None:
+        _, stream, _ = result
+        if stream is not None:
+            await stream.aclose()
+
+    async def _race(self, call, messages, on_discard=None):
+        if self.fallback is None:
+            return await call(self.primary, messages)
+        result, _ = await hedged(
+            lambda: call(self.primary, messages),
+            lambda: call(self.fallback, messages),
+            hedge_after_s=float(self.cfg["failover"]["hedge_after_s"]),
+            name="llm",
+            on_discard=on_discard,
+        )
+        return result
+
+    # ------------------------------------------------------------------ #
+    # API                                                                #
+    # ------------------------------------------------------------------ #
+    async def invoke(self, messages) -> str:
+        text, provider = await self._race(self._invoke, messages)
+        self.served[provider] += 1
+        return text
+
+    async def stream(self, messages) -> AsyncIterator[str]:
+        # O stream do provider que perdeu a corrida é fechado (devolve a vaga do semáforo)
+        first, stream, provider = await self._race(self._open_stream, messages, on_discard=self._close_stream)
+        self.served[provider] += 1
+        if stream is None:
+            if first:
+                yield first
+            return
+        try:
+            if first:
+                yield first
+            async for chunk in stream:
+                yield chunk
+        except Exception:
+            # falha no meio da resposta: não dá para trocar de provider, mas conta no circuito
+            self.breakers[provider].record_failure()
+            raise
+        finally:
+            # consumidor parou antes do fim: fecha o stream do provider
+            await stream.aclose()
+
+    def stats(self) -> Dict:
+        return {
+            "primary": f"{self.primary.provider}:{self.primary.model}",
+            "fallback": f"{self.fallback.provider}:{self.fallback.model}" if self.fallback else None,
+            "served": dict(self.served),
+            "breakers": {name: b.stats() for name, b in self.breakers.items()},
+        }
+
+    async def aclose(self) -> None:
+        for client in (self.primary, self.fallback):
+            if client is not None and hasattr(client, "aclose"):
+                await client.aclose()
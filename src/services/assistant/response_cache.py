@@ -0,0 +1,229 @@
+"""
+Cache de respostas do LLM.
+
+Só vale para requisições marcadas como `cacheable` (ex.: saudações e perguntas
+frequentes sobre o prompt fixo). A chave combina provider, modelo e as
+mensagens normalizadas; entradas expiram por TTL e saem por LRU.
+
+Opcionalmente, uma busca por similaridade de embeddings encontra perguntas
+quase iguais: com o mesmo contexto (todas as mensagens menos a última), a
+última mensagem do usuário é comparada por cosseno com as já respondidas e
+reaproveitada acima de `semantic.threshold`.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from starlette.concurrency import run_in_threadpool
+
+from utils.cache import AsyncSingleFlight, SingleFlight, TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE_CACHE = {
+    "enabled": True,
+    "ttl_s": 3600,
+    "maxsize": 1024,
+    "semantic": {
+        "enabled": False,
+        "threshold": 0.92,         # similaridade de cosseno mínima
+        "max_entries": 512,        # vetores mantidos para busca
+        "embedding_model": None,   # None = padrão do provider
+    },
+}
+
+
+def load_response_cache_config(assistant_cfg: Dict) -> Dict:
+    user_cfg = assistant_cfg.get("response_cache") or {}
+    merged = {**DEFAULT_RESPONSE_CACHE, **user_cfg}
+    merged["semantic"] = {**DEFAULT_RESPONSE_CACHE["semantic"], **(user_cfg.get("semantic") or {})}
+    return merged
+
+
+def normalize_content(text: str) -> str:
+    """Caixa, espaços e pontuação final não mudam a pergunta ("Olá!" == "olá")."""
+    text = " ".join(unicodedata.normalize("NFC", str(text)).casefold().split())
+    return re.sub(r"[\s.!?…]+$", "", text)
+
+
+def _hash(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class _Entry:
+    text: str
+    latency_s: float
+
+
+@dataclass
+class _Probe:
+    key: str
+    context_key: str | None = None
+    vector: np.ndarray | None = None
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        cfg: Dict | None = None,
+        embed: Callable[[str], List[float]] | None = None,
+    ):
+        """
+        Args:
+            embed: Função texto -> vetor; obrigatória para a busca semântica.
+        """
+        self.provider = provider
+        self.model = model
+        self.cfg = {**DEFAULT_RESPONSE_CACHE, **(cfg or {})}
+        self._entries = TTLCache(maxsize=self.cfg["maxsize"], ttl_s=self.cfg["ttl_s"])
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+
+        semantic = self.cfg["semantic"]
+        self.embed = embed if semantic["enabled"] else None
+        self.threshold = float(semantic["threshold"])
+        self.max_vectors = int(semantic["max_entries"])
+        # contexto -> [(vetor normalizado, chave exata)]; a entrada exata pode ter expirado
+        self._vectors = TTLCache(maxsize=self.cfg["maxsize"], ttl_s=self.cfg["ttl_s"])
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.saved_latency_s = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Chaves                                                             #
+    # ------------------------------------------------------------------ #
+    def _normalized(self, messages: List[Dict]) -> List[Tuple[str, str]]:
+        return [(m.get("role", ""), normalize_content(m.get("content", ""))) for m in messages]
+
+    def key(self, messages: List[Dict]) -> str:
+        return _hash([self.provider, self.model, self._normalized(messages)])
+
+    def _context_key(self, messages: List[Dict]) -> str:
+        return _hash([self.provider, self.model, self._normalized(messages[:-1])])
+
+    # ------------------------------------------------------------------ #
+    # Busca                                                              #
+    # ------------------------------------------------------------------ #
+    def _query_vector(self, messages: List[Dict]) -> np.ndarray | None:
+        if self.embed is None or not messages or messages[-1].get("role") != "user":
+            return None
+        try:
+            vector = np.asarray(self.embed(normalize_content(messages[-1]["content"])), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Falha ao gerar embedding para o cache semântico: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _semantic_lookup(self, context_key: str, vector: np.ndarray) -> Tuple["_Entry | None", float]:
+        best, best_score = None, -1.0
+        for candidate, key in self._vectors.get(context_key) or []:
+            score = float(np.dot(candidate, vector))
+            if score > best_score:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    best, best_score = entry, score
+        return (best, best_score) if best_score >= self.threshold else (None, best_score)
+
+    def lookup(self, messages: List[Dict]) -> Tuple[str | None, str | None, "_Probe"]:
+        """
+        Devolve (resposta, "exact" | "semantic", probe) num hit ou (None, None,
+        probe) num miss. `probe` leva chave e embedding já calculados para o `set`.
+        """
+        self.requests += 1
+        key = self.key(messages)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.exact_hits += 1
+            self.saved_latency_s += entry.latency_s
+            return entry.text, "exact", _Probe(key)
+
+        vector = self._query_vector(messages)
+        probe = _Probe(key, self._context_key(messages) if vector is not None else None, vector)
+        if vector is not None:
+            entry, score = self._semantic_lookup(probe.context_key, vector)
+            if entry is not None:
+                self.semantic_hits += 1
+                self.saved_latency_s += entry.latency_s
+                logger.info(f"Resposta do LLM servida por similaridade ({score:.3f})")
+                return entry.text, "semantic", probe
+        return None, None, probe
+
+    def get_or_compute(self, messages: List[Dict], fn: Callable[[], str]) -> Tuple[str, str | None]:
+        """
+        Devolve (resposta, "exact" | "semantic" | None). Em caso de miss, `fn`
+        é chamada uma vez mesmo com requisições idênticas simultâneas.
+        """
+        text, kind, probe = self.lookup(messages)
+        if text is not None:
+            return text, kind
+
+        def _compute():
+            start = time.perf_counter()
+            result = fn()
+            if result:
+                self.set(messages, result, time.perf_counter() - start, probe)
+            return result
+
+        text, shared = self._flight.do(probe.key, _compute)
+        if shared:
+            self.exact_hits += 1
+            return text, "exact"
+        return text, None
+
+    async def aget_or_compute(
+        self, messages: List[Dict], fn: Callable[[], Awaitable[str]]
+    ) -> Tuple[str, str | None]:
+        """Versão async de `get_or_compute` (o embedding da busca roda no threadpool)."""
+        text, kind, probe = await run_in_threadpool(self.lookup, messages)
+        if text is not None:
+            return text, kind
+
+        async def _compute():
+            start = time.perf_counter()
+            result = await fn()
+            if result:
+                self.set(messages, result, time.perf_counter() - start, probe)
+            return result
+
+        text, shared = await self._async_flight.do(probe.key, _compute)
+        if shared:
+            self.exact_hits += 1
+            return text, "exact"
+        return text, None
+
+    def set(self, messages: List[Dict], text: str, latency_s: float, probe: "_Probe | None" = None) -> None:
+        probe = probe or _Probe(self.key(messages))
+        self._entries.set(probe.key, _Entry(text, latency_s))
+        if probe.vector is not None:
+            with self._lock:
+                vectors = [(v, k) for v, k in (self._vectors.get(probe.context_key) or []) if k != probe.key]
+                self._vectors.set(probe.context_key, (vectors + [(probe.vector, probe.key)])[-self.max_vectors:])
+
+    def stats(self) -> Dict:
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "size": len(self._entries),
+            "requests": self.requests,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "hit_rate": hits / self.requests if self.requests else 0.0,
+            "saved_latency_s": round(self.saved_latency_s, 3),
+        }
@@ -0,0 +1,32 @@
+"""
+Assistente e armazenamento de sessões, criados uma vez por processo.
+
+As rotas do assistente e a de conversa (/conversation/turn) compartilham o
+mesmo cliente do LLM, cache de respostas e sessões.
+"""
+
+import threading
+
+from utils.load_config import load_config
+from services.assistant.assistant import Assistant
+from services.assistant.session_store import SessionStore, load_session_store, load_sessions_config
+
+_assistant: Assistant | None = None
+_sessions: SessionStore | None = None
+_lock = threading.Lock()
+
+
+def get_assistant() -> Assistant:
+    global _assistant
+    with _lock:
+        if _assistant is None:
+            _assistant = Assistant()
+        return _assistant
+
+
+def get_session_store() -> SessionStore:
+    global _sessions
+    with _lock:
+        if _sessions is None:
+            _sessions = load_session_store(load_sessions_config(load_config()["assistant"]))
+        return _sessions
@@ -0,0 +1,187 @@
+"""
+Armazenamento de sessões de conversa no servidor.
+
+O cliente cria uma sessão e depois envia só a mensagem nova de cada turno; o
+histórico fica aqui. Sessões inativas expiram após `ttl_s`. O backend padrão
+é em memória; `backend: sqlite` persiste as sessões em disco local e
+sobrevive a reinícios do serviço.
+
+Como o prefixo do histórico é sempre o mesmo entre turnos, o prompt enviado
+ao LLM também aproveita o cache de prefixo do provider.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from starlette.concurrency import run_in_threadpool
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSIONS = {
+    "backend": "memory",                 # memory ou sqlite
+    "ttl_s": 3600,                       # sessões inativas expiram
+    "maxsize": 10000,                    # backend memory: sessões mantidas
+    "sqlite_path": "./.cache/sessions.sqlite",
+}
+
+
+def load_sessions_config(assistant_cfg: Dict) -> Dict:
+    return {**DEFAULT_SESSIONS, **(assistant_cfg.get("sessions") or {})}
+
+
+@dataclass
+class Session:
+    session_id: str
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+
+class SessionStore:
+    """Sessões em memória (LRU com TTL)."""
+
+    def __init__(self, ttl_s: float = 3600, maxsize: int = 10000):
+        self.ttl_s = ttl_s
+        self._sessions = TTLCache(maxsize=maxsize, ttl_s=ttl_s)
+        # Referências fracas: o lock some quando ninguém mais o usa, inclusive
+        # de sessões que expiraram pelo TTL sem passar por delete()
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._locks_guard = threading.Lock()
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """
+        Lock (asyncio) por sessão, compartilhado por /assistant/sessions e
+        /conversation/turn. Quem usa o lock deve manter a referência até liberá-lo.
+        """
+        with self._locks_guard:
+            lock = self._locks.get(session_id)
+            if lock is None:
+                lock = self._locks[session_id] = asyncio.Lock()
+            return lock
+
+    @asynccontextmanager
+    async def turn(self, session_id: str):
+        """
+        Turno inteiro sob o lock da sessão: leitura do histórico, chamada ao
+        LLM e gravação. Turnos concorrentes da mesma sessão esperam a vez em vez
+        de intercalar. Entrega uma cópia do histórico (None se não existe ou expirou).
+        """
+        async with self.lock(session_id):
+            session = await run_in_threadpool(self.get, session_id)
+            yield list(session.messages) if session is not None else None
+
+    async def record_turn(self, session_id: str, user_message: Dict, reply_text: str) -> Session | None:
+        """Grava o turno depois da resposta (dentro de `turn()`): falhas não deixam mensagem órfã."""
+        return await run_in_threadpool(
+            self.append, session_id, [user_message, {"role": "assistant", "content": reply_text}]
+        )
+
+    def create(self, messages: List[Dict] | None = None, metadata: Dict | None = None) -> Session:
+        session = Session(uuid.uuid4().hex, list(messages or []), dict(metadata or {}))
+        self._save(session)
+        return session
+
+    def get(self, session_id: str) -> Session | None:
+        return self._sessions.get(session_id)
+
+    def append(self, session_id: str, messages: List[Dict]) -> Session | None:
+        session = self.get(session_id)
+        if session is None:
+            return None
+        session.messages.extend(messages)
+        session.updated_at = time.time()
+        self._save(session)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._locks_guard:
+            self._locks.pop(session_id, None)
+        return self._sessions.pop(session_id) is not None
+
+    def _save(self, session: Session) -> None:
+        # set() renova o TTL: a expiração conta a partir da última atividade
+        self._sessions.set(session.session_id, session)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessões persistidas em SQLite local; o TTL é aplicado pela data da última atividade."""
+
+    def __init__(self, path: str, ttl_s: float = 3600):
+        super().__init__(ttl_s=ttl_s)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY, messages TEXT NOT NULL, metadata TEXT,"
+                " created_at REAL, updated_at REAL)"
+            )
+        self.purge_expired()
+
+    def get(self, session_id: str) -> Session | None:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT messages, metadata, created_at, updated_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        messages, metadata, created_at, updated_at = row
+        if self.ttl_s and time.time() - updated_at > self.ttl_s:
+            self.delete(session_id)
+            return None
+        return Session(session_id, json.loads(messages), json.loads(metadata or "{}"), created_at, updated_at)
+
+    def delete(self, session_id: str) -> bool:
+        with self._locks_guard:
+            self._locks.pop(session_id, None)
+        with self._db_lock, self._conn:
+            cur = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return cur.rowcount > 0
+
+    def purge_expired(self) -> int:
+        if not self.ttl_s:
+            return 0
+        with self._db_lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_s,)
+            )
+        if cur.rowcount:
+            logger.info(f"{cur.rowcount} sessões expiradas removidas")
+        return cur.rowcount
+
+    def _save(self, session: Session) -> None:
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, messages, metadata, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    session.session_id,
+                    json.dumps(session.messages, ensure_ascii=False),
+                    json.dumps(session.metadata, ensure_ascii=False),
+                    session.created_at,
+                    session.updated_at,
+                ),
+            )
+
+
+def load_session_store(cfg: Dict) -> SessionStore:
+    if cfg["backend"] == "sqlite":
+        return SQLiteSessionStore(cfg["sqlite_path"], ttl_s=cfg["ttl_s"])
+    if cfg["backend"] != "memory":
+        raise ValueError(f"Backend de sessões não suportado: {cfg['backend']}")
+    return SessionStore(ttl_s=cfg["ttl_s"], maxsize=cfg["maxsize"])
@@ -0,0 +1,220 @@
+"""
+Turno completo de conversa por voz numa única chamada.
+
+O áudio é lido e decodificado uma vez (AudioContext); identificação do
+locutor e transcrição rodam em paralelo sobre o mesmo buffer. Com o locutor identificado, o perfil
+(nome e instruções) vem do BigQuery, a mensagem vai para o LLM e a resposta é
+sintetizada. Cada etapa é cronometrada e devolvida em `timings`.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from services.assistant.runtime import get_assistant, get_session_store
+from services.speaker_recognition.identification import SpeakerMatch, get_speaker_runtime, match_embedding
+from services.speaker_recognition.profiles import SpeakerProfiles
+from services.stt.runtime import get_stt_runtime
+from services.tts.elevenlabs import DEFAULT_VOICE_ID, get_elevenlabs_client
+from services.tts.runtime import get_tts_runtime
+from services.tts.tts import tts_render
+from services.vad.vad import apply_vad, load_vad_config
+from utils.audio_context import AudioContext
+from utils.executors import ExecutorOverloaded, get_executor
+from utils.audio_io import content_type
+
+logger = logging.getLogger(__name__)
+
+TTS_PROVIDERS = ("pretrained", "elevenlabs", "none")
+
+
+class SessionNotFound(KeyError):
+    pass
+
+
+def speaker_message(user_text: str, profile: Dict | None) -> str:
+    """Mensagem enviada ao LLM, com o nome e as instruções do locutor (se identificado)."""
+    if profile:
+        return (
+            f"A mensagem está sendo enviada pelo {profile['speaker_name']}. "
+            f"Instruções: {profile.get('instructions') or ''}. "
+            f"Mensagem: {user_text}"
+        )
+    return (
+        "A mensagem está sendo enviada por um usuário não identificado. "
+        "Instruções: Responda de forma amigável e genérica. "
+        f"Mensagem: {user_text}"
+    )
+
+
+@dataclass
+class TurnResult:
+    user_text: str
+    speaker: SpeakerMatch
+    profile: Dict | None
+    assistant_text: str
+    audio: bytes | None = None
+    content_type: str | None = None
+    session_id: str | None = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class _Timer:
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    async def run(self, name: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[f"{name}_s"] = round(time.perf_counter() - start, 3)
+
+
+class ConversationPipeline:
+    def __init__(self):
+        self.stt = get_stt_runtime()
+        self.speaker = get_speaker_runtime()
+        self.assistant = get_assistant()
+        self.sessions = get_session_store()
+        self.tts = get_tts_runtime()
+        self.profiles = SpeakerProfiles()
+        self.speaker_vad = load_vad_config("speaker_verification")
+        self.titanet_executor = get_executor("titanet")
+        self.vits_executor = get_executor("vits")
+
+    # ------------------------------------------------------------------ #
+    # Etapas                                                             #
+    # ------------------------------------------------------------------ #
+    def embed(self, audio: AudioContext | np.ndarray) -> List[float]:
+        """Embedding TitaNet de um áudio (buffer float32 16 kHz mono ou AudioContext)."""
+        from services.speaker_recognition.speaker_recognition import extract_embedding
+
+        audio = AudioContext.from_source(audio).audio
+        return extract_embedding(self.speaker.model, apply_vad(audio, self.speaker_vad).audio)
+
+    def identify_audio(self, audio: np.ndarray, threshold: float) -> SpeakerMatch:
+        """Identifica o locutor num buffer float32 16 kHz mono."""
+        return match_embedding(self.speaker.qdrant, self.embed(audio), threshold)
+
+    def identify(self, audio: AudioContext | bytes, threshold: float) -> SpeakerMatch:
+        return self.identify_audio(AudioContext.from_source(audio).audio, threshold)
+
+    async def aidentify(self, audio: AudioContext | np.ndarray, threshold: float) -> SpeakerMatch:
+        """Embedding no executor do TitaNet; a busca no Qdrant vai para o threadpool."""
+        embedding = await self.titanet_executor.run(self.embed, audio)
+        return await run_in_threadpool(match_embedding, self.speaker.qdrant, embedding, threshold)
+
+    async def _identify_safe(self, ctx: AudioContext, threshold: float) -> SpeakerMatch:
+        # Falha na identificação não derruba o turno: segue com o perfil padrão
+        try:
+            return await self.aidentify(ctx, threshold)
+        except ExecutorOverloaded as e:
+            logger.warning(f"Identificação do locutor pulada: {e}")
+            return SpeakerMatch(matched=False)
+        except Exception as e:
+            logger.error(f"Falha na identificação do locutor: {e}")
+            return SpeakerMatch(matched=False)
+
+    async def lookup_profile(self, match: SpeakerMatch) -> Dict | None:
+        if not match.matched:
+            return None
+        try:
+            return await run_in_threadpool(self.profiles.get, match.speaker_id)
+        except Exception as e:
+            logger.error(f"Falha ao consultar o perfil do locutor: {e}")
+            return None
+
+    async def _reply(self, content: str, session_id: str | None, messages: List[Dict] | None) -> str:
+        user_message = {"role": "user", "content": content}
+        if session_id is None:
+            history = list(messages or [])
+            if self.assistant.prompt_base and not any(m.get("role") == "system" for m in history):
+                history.insert(0, {"role": "system", "content": self.assistant.prompt_base})
+            return await self.assistant.areply_api(history + [user_message])
+
+        # Lock da sessão durante o turno inteiro: turnos concorrentes não se intercalam
+        async with self.sessions.turn(session_id) as history:
+            if history is None:
+                raise SessionNotFound(session_id)
+            reply_text = await self.assistant.areply_api(history + [user_message], session_id)
+            if reply_text and await self.sessions.record_turn(session_id, user_message, reply_text) is None:
+                raise SessionNotFound(session_id)
+        return reply_text
+
+    async def _speak(self, text: str, provider: str, voice_id: str | None, voice_settings: Dict | None):
+        if provider == "none" or not text:
+            return None, None
+        if provider == "elevenlabs":
+            client = get_elevenlabs_client()
+            audio = await run_in_threadpool(
+                client.synthesize, text, voice_id=voice_id or DEFAULT_VOICE_ID, voice_settings=voice_settings
+            )
+            return audio, client.content_type
+        audio, _ = await self.vits_executor.run(
+            tts_render, text, self.tts.tts_tuple, self.tts.audio_format,
+            self.tts.cache, self.tts.batcher, self.tts.bitrate_kbps,
+        )
+        return audio, content_type(self.tts.audio_format)
+
+    # ------------------------------------------------------------------ #
+    # Turno                                                              #
+    # ------------------------------------------------------------------ #
+    async def turn(
+        self,
+        audio: str | bytes | AudioContext,
+        filename: str = "audio.wav",
+        threshold: float = 0.45,
+        session_id: str | None = None,
+        messages: List[Dict[str, Any]] | None = None,
+        tts_provider: str = "pretrained",
+        voice_id: str | None = None,
+        voice_settings: Dict | None = None,
+    ) -> TurnResult:
+        """`audio`: caminho local/gs://, os próprios bytes ou um AudioContext já resolvido."""
+        timer = _Timer()
+        start = time.perf_counter()
+
+        if isinstance(audio, str):
+            ctx = await timer.run("fetch", run_in_threadpool(AudioContext.from_source, audio))
+        else:
+            ctx = AudioContext.from_source(audio, filename)
+
+        # A primeira etapa que pedir o buffer decodifica; a outra espera e reaproveita
+        match, (user_text, _, _) = await asyncio.gather(
+            timer.run("speaker", self._identify_safe(ctx, threshold)),
+            timer.run("stt", self.stt.transcribe(ctx)),
+        )
+        profile = await timer.run("profile", self.lookup_profile(match))
+        assistant_text = await timer.run(
+            "llm", self._reply(speaker_message(user_text, profile), session_id, messages)
+        )
+        reply_audio, mime = await timer.run("tts", self._speak(assistant_text, tts_provider, voice_id, voice_settings))
+
+        timer.timings["total_s"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Turno de conversa: {timer.timings}")
+        return TurnResult(
+            user_text=user_text,
+            speaker=match,
+            profile=profile,
+            assistant_text=assistant_text or "",
+            audio=reply_audio,
+            content_type=mime,
+            session_id=session_id,
+            timings=timer.timings,
+        )
+
+
+_pipeline: ConversationPipeline | None = None
+
+
+def get_conversation_pipeline() -> ConversationPipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = ConversationPipeline()
+    return _pipeline
@@ -0,0 +1,289 @@
+"""
+Sessão de voz full-duplex por WebSocket.
+
+O cliente envia o microfone continuamente (PCM 16 kHz mono ou Ogg/WebM Opus)
+e recebe, pela mesma conexão, transcrições parciais e o áudio da resposta.
+Cada etapa é uma task asyncio ligada à seguinte por uma fila limitada:
+
+    recepção -> [audio_q] -> STT incremental + VAD -> [utterance_q] -> LLM + TTS -> [out_q] -> envio
+
+- STT: `StreamingTranscriber` (VAD por energia, parciais e fim de fala).
+- Locutor: identificado em segundo plano com o áudio da fala recém-fechada;
+  a resposta só espera a identificação (até `speaker_wait_s`) enquanto ainda
+  não há locutor conhecido na sessão.
+- Resposta: stream do LLM cortado em frases e sintetizado frase a frase.
+- Barge-in: uma transcrição parcial enquanto o assistente fala cancela a
+  resposta em andamento e descarta o áudio dela ainda não enviado.
+
+As filas limitadas propagam a pressão: se o envio não acompanha, a síntese
+espera; se o STT não acompanha, a leitura do socket espera.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, List
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketDisconnect
+
+from services.conversation.turn import ConversationPipeline, speaker_message
+from services.speaker_recognition.identification import SpeakerMatch
+from services.stt.streaming import (
+    OpusStreamDecoder,
+    StreamingTranscriber,
+    parse_control_message,
+    pcm_to_float32,
+)
+from utils.audio_io import TARGET_SAMPLE_RATE, encode_wav
+from utils.executors import ExecutorOverloaded
+from utils.load_config import load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOICE_SESSION = {
+    "audio_queue": 64,        # frames recebidos aguardando o STT
+    "utterance_queue": 4,     # falas fechadas aguardando resposta
+    "output_queue": 32,       # eventos/áudios aguardando envio
+    "threshold": 0.45,        # identificação do locutor
+    "speaker_min_s": 1.0,     # fala mínima para tentar identificar o locutor
+    "speaker_wait_s": 1.5,    # espera máxima pela identificação antes do LLM
+    "barge_in": True,
+}
+
+
+def load_voice_session_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_VOICE_SESSION, **((cfg.get("conversation") or {}).get("voice_session") or {})}
+
+
+class VoiceSession:
+    def __init__(self, websocket, pipeline: ConversationPipeline, cfg: Dict | None = None, encoding: str = "pcm_s16le"):
+        self.ws = websocket
+        self.pipeline = pipeline
+        self.cfg = {**DEFAULT_VOICE_SESSION, **(cfg or {})}
+        self.encoding = encoding
+
+        self.audio_q: asyncio.Queue = asyncio.Queue(maxsize=int(self.cfg["audio_queue"]))
+        self.utterance_q: asyncio.Queue = asyncio.Queue(maxsize=int(self.cfg["utterance_queue"]))
+        self.out_q: asyncio.Queue = asyncio.Queue(maxsize=int(self.cfg["output_queue"]))
+
+        prompt = pipeline.assistant.prompt_base
+        self.messages: List[Dict] = [{"role": "system", "content": prompt}] if prompt else []
+        self.conversation_id = uuid.uuid4().hex
+
+        self.speaker: SpeakerMatch | None = None
+        self.profile: Dict | None = None
+        self._speaker_task: asyncio.Task | None = None
+        self._reply_task: asyncio.Task | None = None
+        self._reply_id = 0
+        self._cancelled: set = set()
+        self.disconnected = False
+
+    # ------------------------------------------------------------------ #
+    # Recepção                                                           #
+    # ------------------------------------------------------------------ #
+    async def _receive(self) -> None:
+        decoder = OpusStreamDecoder() if self.encoding == "opus" else None
+        try:
+            while True:
+                message = await self.ws.receive()
+                if message["type"] == "websocket.disconnect":
+                    self.disconnected = True
+                    break
+                if message.get("bytes"):
+                    if decoder is not None:
+                        await run_in_threadpool(decoder.feed, message["bytes"])
+                        pcm = decoder.read()
+                    else:
+                        pcm = pcm_to_float32(message["bytes"], self.encoding)
+                    await self.audio_q.put(pcm)
+                elif message.get("text"):
+                    if parse_control_message(message["text"]).get("event") == "end":
+                        break
+        finally:
+            if decoder is not None:
+                await self.audio_q.put(await run_in_threadpool(decoder.close))
+            await self.audio_q.put(None)
+
+    # ------------------------------------------------------------------ #
+    # STT incremental                                                    #
+    # ------------------------------------------------------------------ #
+    async def _transcribe(self) -> None:
+        stt = self.pipeline.stt
+        transcriber = StreamingTranscriber(await run_in_threadpool(stt.streaming_pipeline), stt.streaming)
+        finished = False
+        while not finished:
+            pcm = await self.audio_q.get()
+            if pcm is None:
+                break
+            transcriber.append(pcm)
+            # junta o que mais chegou enquanto o modelo rodava: um step por lote
+            while not self.audio_q.empty():
+                pcm = self.audio_q.get_nowait()
+                if pcm is None:
+                    finished = True
+                    break
+                transcriber.append(pcm)
+            for event in await self._infer(transcriber.step):
+                await self._on_transcript(event, transcriber)
+
+        for event in await self._infer(transcriber.finish):
+            await self._on_transcript(event, transcriber)
+        await self.utterance_q.put(None)
+
+    async def _infer(self, fn) -> List[Dict]:
+        # Passo do STT no executor do Whisper; recusado antes de rodar, o áudio
+        # fica no buffer do transcriber para o próximo passo
+        try:
+            return await self.pipeline.stt.executor.run(fn)
+        except ExecutorOverloaded as e:
+            await self.out_q.put(("json", None, {"type": "error", "detail": str(e), "status": e.status_code}))
+            return []
+
+    async def _on_transcript(self, event: Dict, transcriber: StreamingTranscriber) -> None:
+        await self.out_q.put(("json", None, event))
+        if event["type"] == "partial" and self.cfg["barge_in"]:
+            await self._interrupt()
+        elif event["type"] == "final" and event["text"]:
+            self._identify_in_background(transcriber.last_utterance)
+            await self.utterance_q.put(event["text"])
+
+    async def _interrupt(self) -> None:
+        if self._reply_task is not None and not self._reply_task.done():
+            self._cancelled.add(self._reply_id)
+            self._reply_task.cancel()
+            await self.out_q.put(("json", None, {"type": "interrupted", "reply": self._reply_id}))
+
+    # ------------------------------------------------------------------ #
+    # Locutor                                                            #
+    # ------------------------------------------------------------------ #
+    def _identify_in_background(self, audio: np.ndarray) -> None:
+        if self.speaker is not None and self.speaker.matched:
+            return
+        if self._speaker_task is not None and not self._speaker_task.done():
+            return
+        if len(audio) < self.cfg["speaker_min_s"] * TARGET_SAMPLE_RATE:
+            return
+        self._speaker_task = asyncio.create_task(self._identify(audio))
+
+    async def _identify(self, audio: np.ndarray) -> None:
+        try:
+            match = await self.pipeline.aidentify(audio, float(self.cfg["threshold"]))
+        except Exception as e:
+            logger.error(f"Falha na identificação do locutor: {e}")
+            return
+        self.speaker = match
+        self.profile = await self.pipeline.lookup_profile(match)
+        await self.out_q.put(("json", None, {
+            "type": "speaker",
+            "matched": match.matched,
+            "speaker_id": match.speaker_id,
+            "speaker_name": (self.profile or {}).get("speaker_name"),
+            "score": match.score,
+        }))
+
+    # ------------------------------------------------------------------ #
+    # Resposta                                                           #
+    # ------------------------------------------------------------------ #
+    async def _respond(self) -> None:
+        while True:
+            text = await self.utterance_q.get()
+            if text is None:
+                break
+            if self.disconnected:
+                continue
+            if self.profile is None and self._speaker_task is not None and not self._speaker_task.done():
+                await asyncio.wait({self._speaker_task}, timeout=float(self.cfg["speaker_wait_s"]))
+
+            self._reply_id += 1
+            self._reply_task = asyncio.create_task(self._reply(self._reply_id, text))
+            await asyncio.wait({self._reply_task})
+            if not self._reply_task.cancelled() and self._reply_task.exception() is not None:
+                error = self._reply_task.exception()
+                logger.error(f"Falha na resposta da sessão de voz: {error}")
+                event = {"type": "error", "detail": str(error)}
+                if isinstance(error, ExecutorOverloaded):
+                    # síntese recusada pelo executor do VITS (frases passam por ele)
+                    event["status"] = error.status_code
+                await self.out_q.put(("json", None, event))
+        await self.out_q.put(None)
+
+    async def _reply(self, reply_id: int, text: str) -> None:
+        user_message = {"role": "user", "content": speaker_message(text, self.profile)}
+        synthesizer = self.pipeline.tts.synthesizer
+        parts: List[str] = []
+        start = time.perf_counter()
+        first_audio_s = None
+
+        async def _deltas():
+            async for delta in self.pipeline.assistant.areply_stream(
+                self.messages + [user_message], self.conversation_id
+            ):
+                parts.append(delta)
+                yield delta
+
+        await self.out_q.put(("json", reply_id, {"type": "reply_start", "reply": reply_id}))
+        try:
+            async for segment in synthesizer.astream_text(_deltas()):
+                wav = await run_in_threadpool(encode_wav, segment.waveform, segment.sample_rate)
+                if first_audio_s is None:
+                    first_audio_s = round(time.perf_counter() - start, 3)
+                header = {
+                    "type": "audio",
+                    "reply": reply_id,
+                    "index": segment.index,
+                    "text": segment.text,
+                    "sample_rate": segment.sample_rate,
+                }
+                await self.out_q.put(("audio", reply_id, (header, wav)))
+        finally:
+            # Mesmo interrompida, o que já foi gerado entra no histórico
+            reply_text = "".join(parts).strip()
+            if reply_text:
+                self.messages += [user_message, {"role": "assistant", "content": reply_text}]
+
+        await self.out_q.put(("json", reply_id, {
+            "type": "reply_end",
+            "reply": reply_id,
+            "assistant_text": reply_text,
+            "first_audio_s": first_audio_s,
+        }))
+
+    # ------------------------------------------------------------------ #
+    # Envio                                                              #
+    # ------------------------------------------------------------------ #
+    async def _send(self) -> None:
+        while True:
+            item = await self.out_q.get()
+            if item is None:
+                break
+            kind, reply_id, payload = item
+            if reply_id is not None and reply_id in self._cancelled:
+                continue  # áudio de resposta interrompida
+            if kind == "audio":
+                header, wav = payload
+                await self.ws.send_json(header)
+                await self.ws.send_bytes(wav)
+            else:
+                await self.ws.send_json(payload)
+
+    # ------------------------------------------------------------------ #
+    # Execução                                                           #
+    # ------------------------------------------------------------------ #
+    async def run(self) -> None:
+        tasks = [
+            asyncio.create_task(stage)
+            for stage in (self._receive(), self._transcribe(), self._respond(), self._send())
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None and not isinstance(task.exception(), WebSocketDisconnect):
+                    raise task.exception()
+        finally:
+            for task in tasks + [self._reply_task, self._speaker_task]:
+                if task is not None and not task.done():
+                    task.cancel()
@@ -0,0 +1,65 @@
+"""
+Identificação de locutor: embedding TitaNet + busca no Qdrant.
+
+O modelo e o cliente do Qdrant são carregados uma vez por processo e
+compartilhados entre as rotas de verificação, cadastro e conversa.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, List
+
+import numpy as np
+
+from services.vector_database.qdrant_service import QdrantService
+
+logger = logging.getLogger(__name__)
+
+SPEAKERS_COLLECTION = "speakers"
+
+
+@dataclass
+class SpeakerMatch:
+    matched: bool
+    speaker_id: str | None = None
+    score: float | None = None    # similaridade de cosseno com o mais próximo
+
+
+def match_embedding(qdrant: QdrantService, embedding: List[float], threshold: float) -> SpeakerMatch:
+    """Busca o locutor mais próximo e compara a similaridade de cosseno com `threshold`."""
+    results = qdrant.search_similar(
+        embedding=embedding, top_k=1, collection_name=SPEAKERS_COLLECTION, with_vectors=True
+    )
+    if not results:
+        logger.info("No similar speakers found")
+        return SpeakerMatch(matched=False)
+
+    best = results[0]
+    cosine_similarity = float(
+        np.dot(embedding, best.vector) / (np.linalg.norm(embedding) * np.linalg.norm(best.vector))
+    )
+    logger.info(f"Cosine similarity: {cosine_similarity:.4f} | Threshold: {threshold}")
+    if cosine_similarity >= threshold:
+        return SpeakerMatch(matched=True, speaker_id=str(best.id), score=cosine_similarity)
+    return SpeakerMatch(matched=False, score=cosine_similarity)
+
+
+@dataclass
+class SpeakerRuntime:
+    model: Any
+    qdrant: QdrantService
+
+
+_runtime: SpeakerRuntime | None = None
+_runtime_lock = threading.Lock()
+
+
+def get_speaker_runtime() -> SpeakerRuntime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            from services.speaker_recognition.speaker_recognition import load_model
+
+            _runtime = SpeakerRuntime(model=load_model(), qdrant=QdrantService())
+        return _runtime
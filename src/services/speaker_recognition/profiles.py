@@ -0,0 +1,55 @@
+"""
+Perfis dos locutores cadastrados (nome e instruções para o assistente),
+lidos da tabela `system_prompts` do BigQuery.
+
+Consultas parametrizadas e cache curto por speaker_id: o perfil é consultado
+a cada turno da conversa e quase nunca muda.
+"""
+
+import logging
+from typing import Dict
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PROFILES_TABLE = "system_prompts"
+
+
+class SpeakerProfiles:
+    def __init__(self, ttl_s: float = 300, maxsize: int = 1024):
+        self._cache = TTLCache(maxsize=maxsize, ttl_s=ttl_s)
+
+    @staticmethod
+    def _bq_id(speaker_id: str) -> str:
+        # O Qdrant devolve o UUID com hífens; no BigQuery ele está sem
+        return speaker_id.replace("-", "")
+
+    def _fetch(self, speaker_id: str) -> Dict | None:
+        from google.cloud import bigquery
+        from infra.bq.bq_client import DATASET_ID, query
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter("speaker_id", "STRING", speaker_id)]
+        )
+        rows = list(query(
+            f"SELECT speaker_name, instructions FROM {DATASET_ID}.{PROFILES_TABLE} "
+            "WHERE speaker_id = @speaker_id LIMIT 1",
+            job_config=job_config,
+        ))
+        if not rows:
+            return None
+        return {"speaker_name": rows[0].get("speaker_name"), "instructions": rows[0].get("instructions")}
+
+    def get(self, speaker_id: str) -> Dict | None:
+        """Devolve {"speaker_name", "instructions"} ou None se o locutor não tem perfil."""
+        key = self._bq_id(speaker_id)
+        if not key:
+            return None
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit or None
+        profile = self._fetch(key)
+        # guarda também a ausência ({}), para não consultar de novo a cada turno
+        self._cache.set(key, profile or {})
+        return profile
@@ -6,6 +6,8 @@ import os
 import numpy as np
 import torch
 
+from utils.audio_context import AudioContext
+
 def load_model():
     """
     Carrega o modelo pré-treinado de reconhecimento de locutor
@@ -16,32 +18,44 @@ def load_model():
     print("Modelo carregado:", model)
     return model
 
+def _embed_waveform(model, audio):
+    """
+    Embedding de um buffer float32 16 kHz mono.
+    Usa `infer_segment` (NeMo recente) e cai para arquivo temporário se não existir.
+    """
+    if hasattr(model, "infer_segment"):
+        embedding, _ = model.infer_segment(audio)
+        return embedding[0].cpu().numpy().tolist()
+
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+        sf.write(tmp.name, audio, 16000)
+        tmp_path = tmp.name
+    try:
+        return model.get_embedding(tmp_path)[0].cpu().numpy().tolist()
+    finally:
+        os.unlink(tmp_path)
+
 def extract_embedding(model, audio_path):
     """
     Extrai o embedding do arquivo de áudio com Titanet.
 
     Args:
         model: Modelo Titanet carregado.
-        audio_path: Caminho para o arquivo de áudio.
+        audio_path: Caminho para o arquivo de áudio, AudioContext ou buffer
+            float32 16 kHz mono (ex.: já aparado pelo VAD).
 
     Returns:
         list[float]: O vetor do embedding.
     """
-    # Carrega e resample
-    audio, _ = librosa.load(audio_path, sr=16000, mono=True)
-
-    # Salva temporariamente como wav
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        sf.write(tmp.name, audio, 16000)
-        tmp_path = tmp.name
-
-    # Extrai embedding
-    embedding = model.get_embedding(tmp_path)[0].cpu().numpy().tolist()
-
-    # Remove o arquivo temporário
-    os.unlink(tmp_path)
-
-    return embedding
+    if isinstance(audio_path, np.ndarray):
+        audio = audio_path
+    elif isinstance(audio_path, AudioContext):
+        audio = audio_path.audio
+    else:
+        # Carrega e resample
+        audio, _ = librosa.load(audio_path, sr=16000, mono=True)
+
+    return _embed_waveform(model, audio)
 
 def verify_speakers(model, file1, file2):
     """
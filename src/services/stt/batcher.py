@@ -0,0 +1,192 @@
+"""
+Batching do pipeline HuggingFace de STT.
+
+Junta áudios de requisições concorrentes (e os N arquivos do /stt/batch) numa
+única chamada ao pipeline e mede o real-time factor (RTF = tempo de
+processamento / duração do áudio) de cada lote.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from utils.load_config import load_config
+from utils.audio_io import TARGET_SAMPLE_RATE
+from utils.audio_context import AudioContext
+from utils.batching import MicroBatcher
+from services.stt.long_form import should_use_long_form
+from services.stt.stt import BATCHED_PROVIDERS, stt_from_audio, transcribe_ctc_batch
+from services.vad.vad import apply_vad
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCHING = {
+    "enabled": True,
+    "max_batch_size": 8,
+    "max_wait_ms": 30,
+    "max_workers": 4,   # downloads/decodificação e chamadas não-HF do /stt/batch
+}
+
+
+@dataclass
+class BatchStats:
+    batch_id: int
+    size: int
+    audio_s: float
+    elapsed_s: float
+    rtf: float
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def load_batching_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_BATCHING, **(cfg["stt"].get("batching") or {})}
+
+
+class ASRBatcher:
+    def __init__(
+        self,
+        asr_pipe,
+        transcription_kwargs: Dict | None = None,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 30.0,
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        transcribe_batch: Callable[[List[np.ndarray]], List[str]] | None = None,
+    ):
+        """
+        `transcribe_batch` substitui a chamada ao pipeline HF (ex.: provider ctc).
+        """
+        self.asr_pipe = asr_pipe
+        self.transcription_kwargs = transcription_kwargs or {}
+        self.sample_rate = sample_rate
+        self.transcribe_batch = transcribe_batch
+        self._batcher = MicroBatcher(
+            self._process,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name="stt-batcher",
+        )
+
+    def _process(self, audios: List[np.ndarray]) -> List[Tuple[str, BatchStats]]:
+        start = time.perf_counter()
+        if self.transcribe_batch is not None:
+            texts = self.transcribe_batch(audios)
+        else:
+            outputs = self.asr_pipe(
+                [{"raw": a, "sampling_rate": self.sample_rate} for a in audios],
+                batch_size=len(audios),
+                **self.transcription_kwargs,
+            )
+            texts = [out["text"].strip() for out in outputs]
+        elapsed = time.perf_counter() - start
+        audio_s = sum(len(a) for a in audios) / self.sample_rate
+        stats = BatchStats(
+            batch_id=self._batcher.next_batch_id(),
+            size=len(audios),
+            audio_s=round(audio_s, 3),
+            elapsed_s=round(elapsed, 3),
+            rtf=round(elapsed / audio_s, 4) if audio_s else 0.0,
+        )
+        logger.info(
+            f"Lote STT #{stats.batch_id}: {stats.size} áudios, {stats.audio_s:.1f}s "
+            f"em {stats.elapsed_s:.2f}s (RTF {stats.rtf:.3f})"
+        )
+        return [(text, stats) for text in texts]
+
+    @classmethod
+    def from_config(
+        cls,
+        provider: str,
+        asr_obj,
+        transcription_kwargs: Dict | None,
+        batching: Dict,
+    ) -> "ASRBatcher | None":
+        """Cria o batcher se o provider suportar lotes e o batching estiver habilitado."""
+        if provider not in BATCHED_PROVIDERS or not batching["enabled"]:
+            return None
+        transcribe_batch = None
+        if provider == "ctc":
+            transcribe_batch = lambda audios: transcribe_ctc_batch(asr_obj, audios)
+        return cls(
+            asr_obj,
+            transcription_kwargs=transcription_kwargs,
+            max_batch_size=batching["max_batch_size"],
+            max_wait_ms=batching["max_wait_ms"],
+            transcribe_batch=transcribe_batch,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return self._batcher.queue_depth
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        text, _ = self._batcher.submit(audio).result()
+        return text
+
+    def transcribe_many(self, audios: List[np.ndarray]) -> List[Tuple[str, BatchStats]]:
+        """Envia todos de uma vez; podem ser divididos em lotes e misturados com outras requisições."""
+        futures = self._batcher.submit_many(audios)
+        return [f.result() for f in futures]
+
+
+def transcribe_paths(
+    audio_paths: List["str | AudioContext"],
+    provider: str,
+    asr_obj: object,
+    transcription_kwargs: Dict | None = None,
+    long_form: Dict | None = None,
+    batcher: ASRBatcher | None = None,
+    max_workers: int = 4,
+    vad: Dict | None = None,
+) -> Tuple[List[str], List[BatchStats]]:
+    """
+    Transcreve N arquivos (caminhos ou AudioContext já baixados). Com `batcher`,
+    baixa/decodifica em paralelo e manda os áudios curtos para o lote
+    compartilhado; os longos seguem o modo long-form.
+    Sem batcher (ex.: OpenAI), faz as chamadas em paralelo. Com `vad` habilitado,
+    cada áudio é aparado antes da transcrição.
+
+    Returns:
+        (textos na ordem de `audio_paths`, estatísticas dos lotes usados)
+    """
+    use_vad = bool(vad and vad.get("enabled"))
+
+    def _load(audio_path):
+        audio = AudioContext.from_source(audio_path).audio
+        return apply_vad(audio, vad).audio if use_vad else audio
+
+    def _single(source):
+        if use_vad and not isinstance(source, np.ndarray):
+            source = _load(source)
+        return stt_from_audio(
+            source,
+            provider=provider,
+            asr_obj=asr_obj,
+            transcription_kwargs=transcription_kwargs,
+            long_form=long_form,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        if batcher is None or provider not in BATCHED_PROVIDERS:
+            return list(pool.map(_single, audio_paths)), []
+
+        audios = list(pool.map(_load, audio_paths))
+        texts: List[str | None] = [None] * len(audios)
+        long_idx = {i for i, a in enumerate(audios) if should_use_long_form(a, long_form)}
+        short_idx = [i for i in range(len(audios)) if i not in long_idx]
+
+        long_futures = {i: pool.submit(_single, audios[i]) for i in long_idx}
+        batch_stats: Dict[int, BatchStats] = {}
+        for i, (text, stats) in zip(short_idx, batcher.transcribe_many([audios[i] for i in short_idx])):
+            texts[i] = text
+            batch_stats[stats.batch_id] = stats
+        for i, fut in long_futures.items():
+            texts[i] = fut.result()
+
+    return texts, sorted(batch_stats.values(), key=lambda s: s.batch_id)
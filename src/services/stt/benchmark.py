@@ -0,0 +1,138 @@
+"""
+Benchmark de latência e WER dos providers de STT.
+Execute o script com o comando (a partir de src/):
+python -m services.stt.benchmark --manifest audios_metadata_stt.csv --providers huggingface,openai,faster-whisper
+
+O manifest é um CSV com as colunas:
+- path: caminho do áudio (local ou gs://...)
+- text: transcrição de referência
+"""
+
+import argparse
+import csv
+import re
+import statistics
+import time
+import unicodedata
+from typing import Dict, List, Tuple
+
+from services.stt.stt import load_stt_pipeline, stt_from_audio
+from utils.audio_io import duration_seconds, load_audio
+
+
+# --------------------------------------------------------------------------- #
+# 1. WER                                                                      #
+# --------------------------------------------------------------------------- #
+def normalize_text(text: str) -> List[str]:
+    """Minúsculas, sem pontuação; mantém acentos (relevantes no português)."""
+    text = unicodedata.normalize("NFC", text.lower())
+    text = re.sub(r"[^\w\s]", " ", text)
+    return text.split()
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """Devolve (edições, palavras na referência) pela distância de Levenshtein em palavras."""
+    ref, hyp = normalize_text(reference), normalize_text(hypothesis)
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        curr = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            curr[j] = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = curr
+    return prev[-1], len(ref)
+
+
+# --------------------------------------------------------------------------- #
+# 2. Execução                                                                 #
+# --------------------------------------------------------------------------- #
+def read_manifest(path: str) -> List[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row for row in csv.DictReader(f)]
+
+
+def run_provider(
+    provider: str,
+    rows: List[Dict[str, str]],
+    local_checkpoint: str,
+    openai_model: str = "whisper-1",
+    warmup: int = 1,
+) -> Dict:
+    overrides = {
+        "provider": provider,
+        "model_checkpoint": openai_model if provider == "openai" else local_checkpoint,
+    }
+    provider, asr_obj, kwargs = load_stt_pipeline(overrides=overrides)
+
+    audios = [load_audio(row["path"]) for row in rows]
+    for audio in audios[:warmup]:
+        stt_from_audio(audio, provider=provider, asr_obj=asr_obj, transcription_kwargs=kwargs)
+
+    latencies, errors, words, audio_s = [], 0, 0, 0.0
+    for row, audio in zip(rows, audios):
+        start = time.perf_counter()
+        text = stt_from_audio(audio, provider=provider, asr_obj=asr_obj, transcription_kwargs=kwargs)
+        latencies.append(time.perf_counter() - start)
+        e, n = word_errors(row["text"], text)
+        errors, words = errors + e, words + n
+        audio_s += duration_seconds(audio)
+
+    latencies.sort()
+    return {
+        "provider": provider,
+        "files": len(rows),
+        "latency_mean_s": statistics.mean(latencies),
+        "latency_p50_s": latencies[len(latencies) // 2],
+        "latency_p90_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))],
+        "rtf": sum(latencies) / audio_s if audio_s else 0.0,
+        "wer": errors / words if words else 0.0,
+    }
+
+
+# --------------------------------------------------------------------------- #
+# 3. Programa principal                                                       #
+# --------------------------------------------------------------------------- #
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara latência e WER dos providers de STT.")
+    parser.add_argument("--manifest", required=True, help="CSV com colunas path,text.")
+    parser.add_argument(
+        "--providers",
+        default="huggingface,openai,faster-whisper",
+        help="Providers separados por vírgula.",
+    )
+    parser.add_argument(
+        "--local_checkpoint",
+        default="freds0/distil-whisper-large-v3-ptbr",
+        help="Checkpoint Whisper usado por huggingface e faster-whisper.",
+    )
+    parser.add_argument("--openai_model", default="whisper-1", help="Modelo da OpenAI.")
+    parser.add_argument("--limit", type=int, default=None, help="Usa só os N primeiros áudios.")
+    parser.add_argument("--warmup", type=int, default=1, help="Áudios usados para aquecer cada provider.")
+    args = parser.parse_args()
+
+    rows = read_manifest(args.manifest)[: args.limit]
+    print(f"Áudios: {len(rows)}")
+
+    results = []
+    for provider in [p.strip() for p in args.providers.split(",") if p.strip()]:
+        print(f"⏳ {provider}…")
+        try:
+            results.append(run_provider(
+                provider,
+                rows,
+                local_checkpoint=args.local_checkpoint,
+                openai_model=args.openai_model,
+                warmup=args.warmup,
+            ))
+        except Exception as e:
+            print(f"  ❌ {provider} falhou: {e}")
+
+    print(f"\n{'provider':<16}{'média(s)':>10}{'p50(s)':>10}{'p90(s)':>10}{'RTF':>8}{'WER':>8}")
+    for r in results:
+        print(
+            f"{r['provider']:<16}{r['latency_mean_s']:>10.3f}{r['latency_p50_s']:>10.3f}"
+            f"{r['latency_p90_s']:>10.3f}{r['rtf']:>8.3f}{r['wer']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Cache de transcrições com deduplicação de requisições concorrentes.
+
+A chave combina o hash do conteúdo do áudio com provider, modelo e parâmetros
+da transcrição; requisições idênticas simultâneas esperam uma única execução.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from utils.cache import AsyncSingleFlight, SingleFlight, TTLCache
+from utils.load_config import load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE = {
+    "enabled": True,
+    "ttl_s": 600,
+    "maxsize": 512,
+}
+
+
+def load_cache_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_CACHE, **(cfg["stt"].get("cache") or {})}
+
+
+def model_name_from_config(stt_cfg: Dict, provider: str) -> str:
+    """Identificador do modelo efetivamente usado pelo provider."""
+    if provider == "ctc":
+        return (stt_cfg.get("ctc") or {}).get("model_checkpoint", "")
+    return stt_cfg.get("model_checkpoint", "")
+
+
+class TranscriptCache:
+    def __init__(self, ttl_s: float | None = 600, maxsize: int = 512):
+        self._cache = TTLCache(maxsize=maxsize, ttl_s=ttl_s)
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+
+    @classmethod
+    def from_config(cls, cache_cfg: Dict) -> "TranscriptCache | None":
+        if not cache_cfg["enabled"]:
+            return None
+        return cls(ttl_s=cache_cfg["ttl_s"], maxsize=cache_cfg["maxsize"])
+
+    @staticmethod
+    def key(audio_bytes: bytes, provider: str, model: str, params: Dict[str, Any] | None = None) -> str:
+        h = hashlib.sha256(audio_bytes)
+        h.update(b"\0" + provider.encode() + b"\0" + model.encode() + b"\0")
+        h.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def get_or_compute(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Devolve (valor, hit). Em caso de miss, só a primeira requisição executa
+        `fn`; as concorrentes com a mesma chave recebem o mesmo resultado.
+        """
+        value = self._cache.get(key)
+        if value is not None:
+            return value, True
+
+        def _compute():
+            # Outra requisição pode ter preenchido o cache enquanto esperávamos
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+            result = fn()
+            self._cache.set(key, result)
+            return result
+
+        value, shared = self._flight.do(key, _compute)
+        if shared:
+            logger.info(f"Transcrição coalescida com requisição em andamento ({key[:12]})")
+        return value, shared
+
+    async def aget_or_compute(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Versão async de `get_or_compute` (para rotas async)."""
+        value = self._cache.get(key)
+        if value is not None:
+            return value, True
+
+        async def _compute():
+            result = await fn()
+            self._cache.set(key, result)
+            return result
+
+        value, shared = await self._async_flight.do(key, _compute)
+        if shared:
+            logger.info(f"Transcrição coalescida com requisição em andamento ({key[:12]})")
+        return value, shared
+
+    def stats(self) -> Dict:
+        return {
+            **self._cache.stats(),
+            "inflight": self._flight.inflight() + self._async_flight.inflight(),
+        }
@@ -0,0 +1,192 @@
+"""
+Transcrição de áudios longos em blocos.
+
+O áudio é dividido em janelas (preferindo cortes em silêncio, com sobreposição
+quando o corte cai em fala), os blocos são transcritos em paralelo e o texto é
+costurado de volta usando os timestamps de cada segmento.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from utils.load_config import load_config
+from utils.audio_io import TARGET_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LONG_FORM = {
+    "enabled": False,
+    "min_duration_s": 30.0,   # abaixo disso transcreve em uma chamada só
+    "chunk_length_s": 30.0,   # tamanho da janela
+    "overlap_s": 2.0,         # sobreposição quando o corte cai em fala
+    "silence_search_s": 3.0,  # quanto antes do fim da janela procurar silêncio
+    "silence_db": -40.0,      # energia (dBFS) considerada silêncio
+    "batch_size": 8,          # HuggingFace: blocos por forward
+    "max_workers": 4,         # OpenAI: requisições simultâneas
+}
+
+_FRAME_S = 0.02
+
+
+@dataclass
+class Segment:
+    start: float
+    end: float
+    text: str
+
+
+def load_long_form_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_LONG_FORM, **(cfg["stt"].get("long_form") or {})}
+
+
+def should_use_long_form(audio: np.ndarray, long_form: Dict | None, sample_rate: int = TARGET_SAMPLE_RATE) -> bool:
+    if not long_form or not long_form.get("enabled"):
+        return False
+    return len(audio) / sample_rate >= float(long_form.get("min_duration_s", 0))
+
+
+# --------------------------------------------------------------------------- #
+# Divisão em janelas                                                          #
+# --------------------------------------------------------------------------- #
+def _frame_db(audio: np.ndarray, frame: int) -> np.ndarray:
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.array([], dtype=np.float32)
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1) + 1e-12)
+    return 20.0 * np.log10(rms)
+
+
+def split_audio(
+    audio: np.ndarray,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    chunk_length_s: float = 30.0,
+    overlap_s: float = 2.0,
+    silence_search_s: float = 3.0,
+    silence_db: float = -40.0,
+) -> List[Tuple[int, int]]:
+    """
+    Divide o áudio em janelas [(início, fim)] em amostras.
+
+    Perto do fim de cada janela procura o trecho mais silencioso; se ele estiver
+    abaixo de `silence_db` o corte é feito ali sem sobreposição. Caso contrário o
+    corte é fixo e a próxima janela recua `overlap_s` segundos.
+    """
+    n = len(audio)
+    window = int(chunk_length_s * sample_rate)
+    overlap = int(overlap_s * sample_rate)
+    search = int(silence_search_s * sample_rate)
+    frame = max(1, int(_FRAME_S * sample_rate))
+
+    chunks: List[Tuple[int, int]] = []
+    start = 0
+    while start < n:
+        target_end = start + window
+        if target_end >= n:
+            chunks.append((start, n))
+            break
+
+        search_start = max(start + window // 2, target_end - search)
+        db = _frame_db(audio[search_start:target_end], frame)
+        if len(db) and db.min() <= silence_db:
+            quietest = int(np.argmin(db))
+            end = search_start + quietest * frame + frame // 2
+            next_start = end
+        else:
+            end = target_end
+            next_start = max(start + 1, end - overlap)
+
+        chunks.append((start, end))
+        start = next_start
+    return chunks
+
+
+# --------------------------------------------------------------------------- #
+# Costura                                                                     #
+# --------------------------------------------------------------------------- #
+def _merge_overlap_words(left: str, right: str, max_words: int = 12) -> str:
+    """Junta dois textos removendo a repetição de palavras na emenda."""
+    lw, rw = left.split(), right.split()
+    for k in range(min(max_words, len(lw), len(rw)), 0, -1):
+        if [w.lower() for w in lw[-k:]] == [w.lower() for w in rw[:k]]:
+            return " ".join(lw + rw[k:])
+    return " ".join(lw + rw)
+
+
+def stitch_segments(
+    chunk_bounds: List[Tuple[float, float]],
+    chunk_segments: List[List[Segment]],
+) -> str:
+    """
+    Costura os segmentos (timestamps relativos a cada bloco) em um texto único.
+
+    Onde dois blocos se sobrepõem, a fronteira é o meio da sobreposição: cada
+    segmento fica com o bloco que contém o seu ponto médio.
+    """
+    kept: List[Segment] = []
+    for i, ((c_start, c_end), segments) in enumerate(zip(chunk_bounds, chunk_segments)):
+        lower = -np.inf
+        upper = np.inf
+        if i > 0:
+            prev_end = chunk_bounds[i - 1][1]
+            if prev_end > c_start:
+                lower = (c_start + prev_end) / 2
+        if i + 1 < len(chunk_bounds):
+            next_start = chunk_bounds[i + 1][0]
+            if next_start < c_end:
+                upper = (next_start + c_end) / 2
+
+        for seg in segments:
+            mid = c_start + (seg.start + seg.end) / 2
+            if lower <= mid < upper:
+                kept.append(Segment(c_start + seg.start, c_start + seg.end, seg.text))
+
+    kept.sort(key=lambda s: s.start)
+    return " ".join(s.text.strip() for s in kept if s.text.strip())
+
+
+def stitch_texts(texts: List[str]) -> str:
+    """Fallback sem timestamps: junta textos removendo palavras repetidas na emenda."""
+    merged = ""
+    for text in texts:
+        merged = _merge_overlap_words(merged, text.strip()) if merged else text.strip()
+    return merged
+
+
+# --------------------------------------------------------------------------- #
+# Execução                                                                    #
+# --------------------------------------------------------------------------- #
+def transcribe_chunks(
+    audio: np.ndarray,
+    transcribe_chunk: Callable[[np.ndarray], Tuple[str, List[Segment] | None]],
+    long_form: Dict,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+) -> str:
+    """
+    Divide `audio`, transcreve os blocos em paralelo com `transcribe_chunk` e costura.
+
+    `transcribe_chunk` devolve (texto, segmentos|None) com timestamps relativos ao bloco.
+    """
+    bounds = split_audio(
+        audio,
+        sample_rate=sample_rate,
+        chunk_length_s=float(long_form["chunk_length_s"]),
+        overlap_s=float(long_form["overlap_s"]),
+        silence_search_s=float(long_form["silence_search_s"]),
+        silence_db=float(long_form["silence_db"]),
+    )
+    logger.info(f"Long-form: {len(audio) / sample_rate:.1f}s em {len(bounds)} blocos")
+
+    max_workers = max(1, int(long_form.get("max_workers", 4)))
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(bounds))) as pool:
+        results = list(pool.map(lambda b: transcribe_chunk(audio[b[0]:b[1]]), bounds))
+
+    bounds_s = [(s / sample_rate, e / sample_rate) for s, e in bounds]
+    if all(segments is not None for _, segments in results):
+        return stitch_segments(bounds_s, [segments for _, segments in results])
+    return stitch_texts([text for text, _ in results])
@@ -0,0 +1,186 @@
+"""
+Cliente assíncrono de transcrição da OpenAI.
+
+Um único AsyncOpenAI com pool de conexões HTTP é compartilhado entre as
+requisições; um semáforo limita as chamadas simultâneas, cada tentativa tem
+timeout próprio e o conjunto tem um deadline, com retries de backoff com jitter.
+Opcionalmente, se a OpenAI não responder dentro de `hedge.after_s`, uma
+transcrição com o modelo local é disparada e vence quem terminar primeiro.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from utils.load_config import load_config
+from utils.audio_io import TARGET_SAMPLE_RATE, encode_wav
+from utils.resilience import hedged, retry_async
+from services.stt.long_form import Segment, split_audio, stitch_segments, stitch_texts
+
+try:
+    import httpx
+    import openai
+except ModuleNotFoundError:
+    httpx = None
+    openai = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPENAI_ASYNC = {
+    "enabled": True,
+    "max_concurrency": 8,     # chamadas simultâneas à OpenAI
+    "max_connections": 16,    # pool HTTP
+    "max_keepalive": 8,
+    "timeout_s": 15,          # por tentativa
+    "deadline_s": 30,         # total, incluindo retries
+    "max_retries": 2,
+    "retry_base_s": 0.25,
+    "retry_max_s": 2.0,
+    "hedge": {
+        "enabled": False,
+        "after_s": 4.0,       # orçamento de latência antes de disparar o modelo local
+        "model_checkpoint": None,
+    },
+}
+
+
+def load_openai_async_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    user_cfg = cfg["stt"].get("openai_async") or {}
+    merged = {**DEFAULT_OPENAI_ASYNC, **user_cfg}
+    merged["hedge"] = {**DEFAULT_OPENAI_ASYNC["hedge"], **(user_cfg.get("hedge") or {})}
+    if not merged["hedge"]["model_checkpoint"]:
+        merged["hedge"]["model_checkpoint"] = (cfg["stt"].get("streaming") or {}).get("model_checkpoint")
+    merged["device"] = cfg["stt"].get("device", "cpu")
+    return merged
+
+
+class AsyncOpenAITranscriber:
+    def __init__(self, model: str, transcription_kwargs: Dict | None = None, cfg: Dict | None = None):
+        if openai is None:
+            raise ImportError("pip install openai httpx")
+        self.model = model
+        self.transcription_kwargs = transcription_kwargs or {}
+        self.cfg = cfg or DEFAULT_OPENAI_ASYNC
+        self._semaphore = asyncio.Semaphore(int(self.cfg["max_concurrency"]))
+        self._client: "openai.AsyncOpenAI | None" = None
+        self._retry_on = (
+            openai.APIConnectionError,
+            openai.APITimeoutError,
+            openai.RateLimitError,
+            openai.InternalServerError,
+        )
+
+    @classmethod
+    def from_config(cls, provider: str, asr_obj, transcription_kwargs: Dict, cfg: Dict) -> "AsyncOpenAITranscriber | None":
+        if provider != "openai" or not cfg["enabled"]:
+            return None
+        return cls(asr_obj["model"], transcription_kwargs, cfg)
+
+    # ------------------------------------------------------------------ #
+    # Cliente                                                            #
+    # ------------------------------------------------------------------ #
+    @property
+    def client(self) -> "openai.AsyncOpenAI":
+        # Criado no primeiro uso, já dentro do event loop do servidor
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=int(self.cfg["max_connections"]),
+                    max_keepalive_connections=int(self.cfg["max_keepalive"]),
+                ),
+                timeout=float(self.cfg["timeout_s"]),
+            )
+            self._client = openai.AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                http_client=http_client,
+                max_retries=0,  # retries ficam por nossa conta (com jitter e deadline)
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    # ------------------------------------------------------------------ #
+    # Chamadas                                                           #
+    # ------------------------------------------------------------------ #
+    async def _create(self, audio_bytes: bytes, filename: str, **extra):
+        async with self._semaphore:
+            return await self.client.audio.transcriptions.create(
+                model=self.model,
+                file=(filename, audio_bytes),
+                timeout=float(self.cfg["timeout_s"]),
+                **{**self.transcription_kwargs, **extra},
+            )
+
+    async def _openai(self, audio_bytes: bytes, filename: str, **extra):
+        return await retry_async(
+            lambda: self._create(audio_bytes, filename, **extra),
+            max_retries=int(self.cfg["max_retries"]),
+            base_delay_s=float(self.cfg["retry_base_s"]),
+            max_delay_s=float(self.cfg["retry_max_s"]),
+            retry_on=self._retry_on,
+            deadline_s=float(self.cfg["deadline_s"]),
+            name="openai-stt",
+        )
+
+    async def _local(self, audio_bytes: bytes) -> str:
+        from services.stt.stt import load_local_asr_pipeline, stt_from_audio
+
+        hedge_cfg = self.cfg["hedge"]
+
+        def _run():
+            asr_pipe = load_local_asr_pipeline(hedge_cfg["model_checkpoint"], self.cfg.get("device", "cpu"))
+            return stt_from_audio(audio_bytes, provider="huggingface", asr_obj=asr_pipe)
+
+        return (await run_in_threadpool(_run)).strip()
+
+    async def transcribe(self, audio_bytes: bytes, filename: str = "audio.wav") -> str:
+        async def _primary():
+            return (await self._openai(audio_bytes, filename)).text
+
+        hedge_cfg = self.cfg["hedge"]
+        if not hedge_cfg["enabled"]:
+            return await _primary()
+
+        text, winner = await hedged(
+            _primary,
+            lambda: self._local(audio_bytes),
+            hedge_after_s=float(hedge_cfg["after_s"]),
+            name="openai-stt",
+        )
+        if winner == "hedge":
+            logger.info("Transcrição servida pelo modelo local (hedge)")
+        return text
+
+    async def transcribe_long(self, audio: np.ndarray, long_form: Dict) -> str:
+        """Long-form: um request por bloco, todos em paralelo (limitados pelo semáforo)."""
+        def _split():
+            # busca de silêncio e WAV dos blocos são CPU: fora do event loop
+            bounds = split_audio(
+                audio,
+                chunk_length_s=float(long_form["chunk_length_s"]),
+                overlap_s=float(long_form["overlap_s"]),
+                silence_search_s=float(long_form["silence_search_s"]),
+                silence_db=float(long_form["silence_db"]),
+            )
+            return bounds, [encode_wav(audio[s:e]) for s, e in bounds]
+
+        bounds, wavs = await run_in_threadpool(_split)
+        extra = {"response_format": "verbose_json"}
+        responses = await asyncio.gather(*(self._openai(wav, "chunk.wav", **extra) for wav in wavs))
+
+        segments = [getattr(r, "segments", None) for r in responses]
+        if all(seg is not None for seg in segments):
+            bounds_s = [(s / TARGET_SAMPLE_RATE, e / TARGET_SAMPLE_RATE) for s, e in bounds]
+            return stitch_segments(
+                bounds_s,
+                [[Segment(x.start, x.end, x.text) for x in seg] for seg in segments],
+            )
+        return stitch_texts([r.text for r in responses])
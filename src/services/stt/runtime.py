@@ -0,0 +1,128 @@
+"""
+Pipeline de STT configurado, carregado uma vez por processo.
+
+As rotas de STT e a de conversa (/conversation/turn) usam o mesmo modelo,
+batcher, cache de transcrições e cliente async da OpenAI.
+"""
+
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
+from utils.load_config import load_config
+from utils.audio_io import encode_wav
+from utils.audio_context import AudioContext
+from utils.executors import get_executor
+from services.stt.stt import load_local_asr_pipeline, load_stt_pipeline, stt_from_audio
+from services.stt.long_form import load_long_form_config, should_use_long_form
+from services.stt.batcher import ASRBatcher, load_batching_config
+from services.stt.streaming import load_streaming_config
+from services.stt.cache import TranscriptCache, load_cache_config, model_name_from_config
+from services.stt.openai_async import AsyncOpenAITranscriber, load_openai_async_config
+from services.vad.vad import apply_vad, load_vad_config
+
+
+class STTRuntime:
+    def __init__(self):
+        self.provider, self.asr_obj, self.kwargs = load_stt_pipeline()
+        self.long_form = load_long_form_config()
+        self.streaming = load_streaming_config()
+        self.batching = load_batching_config()
+        self.vad = load_vad_config("stt")
+
+        # Junta requisições concorrentes num único forward (HuggingFace e CTC)
+        self.batcher = ASRBatcher.from_config(self.provider, self.asr_obj, self.kwargs, self.batching)
+
+        # Cache por conteúdo do áudio + provider/modelo/parâmetros
+        self.cache = TranscriptCache.from_config(load_cache_config())
+        self.model_name = model_name_from_config(load_config()["stt"], self.provider)
+        self.cache_params = {"kwargs": self.kwargs, "vad": self.vad, "long_form": self.long_form}
+
+        # Provider openai: cliente async com pool, limite de concorrência, retries e hedge
+        self.openai_async = AsyncOpenAITranscriber.from_config(
+            self.provider, self.asr_obj, self.kwargs, load_openai_async_config()
+        )
+
+        # Modelos locais rodam no executor dedicado (concorrência e fila limitadas)
+        self.executor = get_executor("whisper")
+
+    def streaming_pipeline(self):
+        """Pipeline local usado no streaming (reaproveita o do /stt se for HuggingFace)."""
+        if self.provider == "huggingface":
+            return self.asr_obj
+        device = load_config()["stt"].get("device", "cpu")
+        return load_local_asr_pipeline(self.streaming["model_checkpoint"], device)
+
+    def transcribe_sync(self, audio: AudioContext | bytes, filename: str | None = None):
+        ctx = AudioContext.from_source(audio, filename)
+        audio_source, vad_info = ctx, None
+        if self.vad["enabled"]:
+            vad_result = apply_vad(ctx.audio, self.vad)
+            audio_source, vad_info = vad_result.audio, vad_result.metadata()
+
+        text = stt_from_audio(
+            audio_source,
+            provider=self.provider,
+            asr_obj=self.asr_obj,
+            transcription_kwargs=self.kwargs,
+            long_form=self.long_form,
+            batcher=self.batcher,
+            filename=ctx.filename,
+        )
+        return text, vad_info
+
+    def _prepare_openai(self, ctx: AudioContext):
+        """Decodificação, VAD e WAV do áudio cortado, tudo numa única ida à thread."""
+        audio, vad_info = None, None
+        if self.vad["enabled"] or self.long_form["enabled"]:
+            audio = ctx.audio
+        if self.vad["enabled"]:
+            vad_result = apply_vad(audio, self.vad)
+            audio, vad_info = vad_result.audio, vad_result.metadata()
+
+        long_form = audio is not None and should_use_long_form(audio, self.long_form)
+        wav = encode_wav(audio) if self.vad["enabled"] and not long_form else None
+        return audio, vad_info, long_form, wav
+
+    async def _transcribe_openai(self, ctx: AudioContext):
+        """Caminho async (OpenAI): só VAD/decodificação vão para thread."""
+        audio, vad_info, long_form, wav = await run_in_threadpool(self._prepare_openai, ctx)
+
+        if long_form:
+            text = await self.openai_async.transcribe_long(audio, self.long_form)
+        elif wav is not None:
+            text = await self.openai_async.transcribe(wav, "audio.wav")
+        else:
+            text = await self.openai_async.transcribe(ctx.data, ctx.filename)
+        return text, vad_info
+
+    async def transcribe(self, audio: AudioContext | bytes, filename: str | None = None):
+        """
+        Devolve (texto, vad_info, cached); áudios repetidos saem do cache.
+        Com AudioContext, o buffer decodificado é compartilhado com as outras etapas.
+        """
+        ctx = AudioContext.from_source(audio, filename)
+        if self.openai_async is not None:
+            run = lambda: self._transcribe_openai(ctx)
+        else:
+            run = lambda: self.executor.run(self.transcribe_sync, ctx)
+
+        if self.cache is None:
+            text, vad_info = await run()
+            return text, vad_info, False
+
+        key = TranscriptCache.key(ctx.data, self.provider, self.model_name, self.cache_params)
+        (text, vad_info), cached = await self.cache.aget_or_compute(key, run)
+        return text, vad_info, cached
+
+
+_runtime: STTRuntime | None = None
+_runtime_lock = threading.Lock()
+
+
+def get_stt_runtime() -> STTRuntime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = STTRuntime()
+        return _runtime
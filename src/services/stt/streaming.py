@@ -0,0 +1,244 @@
+"""
+Transcrição incremental para áudio recebido em tempo real.
+
+Os frames são acumulados num buffer da fala corrente; a cada
+`partial_interval_s` de áudio novo o buffer inteiro é decodificado pelo
+pipeline local (parcial) e, quando a fala termina (`endpoint_silence_ms` de
+silêncio), o texto é fechado (final) e o buffer é reiniciado.
+"""
+
+import json
+import logging
+import queue
+import subprocess
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from utils.load_config import load_config
+from utils.audio_io import TARGET_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAMING = {
+    "model_checkpoint": None,   # None = usa stt.model_checkpoint
+    "partial_interval_s": 0.6,  # áudio novo necessário para uma nova parcial
+    "endpoint_silence_ms": 300, # silêncio após fala que fecha o texto
+    "max_buffer_s": 20,         # fecha o texto à força acima disso
+    "silence_db": -40,          # energia (dBFS) considerada silêncio
+    "transcription_kwargs": {},
+}
+
+ENCODINGS = ("pcm_s16le", "pcm_f32le", "opus")
+
+_FRAME_S = 0.02
+
+
+def load_streaming_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    streaming = {**DEFAULT_STREAMING, **(cfg["stt"].get("streaming") or {})}
+    if not streaming["model_checkpoint"]:
+        streaming["model_checkpoint"] = cfg["stt"]["model_checkpoint"]
+    return streaming
+
+
+def pcm_to_float32(data: bytes, encoding: str) -> np.ndarray:
+    if encoding == "pcm_s16le":
+        return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    if encoding == "pcm_f32le":
+        return np.frombuffer(data, dtype="<f4").astype(np.float32)
+    raise ValueError(f"Encoding PCM desconhecido: {encoding}")
+
+
+class OpusStreamDecoder:
+    """
+    Decodifica um fluxo Ogg/WebM Opus (ex.: MediaRecorder) via ffmpeg em pipe.
+
+    `feed` escreve os bytes no stdin do ffmpeg; uma thread lê o PCM de saída e
+    `read` devolve o que já foi decodificado, sem bloquear.
+    """
+
+    def __init__(self, sample_rate: int = TARGET_SAMPLE_RATE):
+        self._proc = subprocess.Popen(
+            [
+                "ffmpeg", "-loglevel", "quiet",
+                "-i", "pipe:0",
+                "-f", "s16le", "-ac", "1", "-ar", str(sample_rate),
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self._out: "queue.Queue[bytes]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _read_loop(self) -> None:
+        while True:
+            chunk = self._proc.stdout.read1(4096)
+            if not chunk:
+                break
+            self._out.put(chunk)
+
+    def feed(self, data: bytes) -> None:
+        self._proc.stdin.write(data)
+        self._proc.stdin.flush()
+
+    def read(self) -> np.ndarray:
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._out.get_nowait())
+            except queue.Empty:
+                break
+        data = b"".join(chunks)
+        data = data[: len(data) - len(data) % 2]
+        return pcm_to_float32(data, "pcm_s16le")
+
+    def close(self) -> np.ndarray:
+        """Fecha o stdin, espera o ffmpeg terminar e devolve o resto do PCM."""
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._proc.wait(timeout=5)
+        self._reader.join(timeout=5)
+        return self.read()
+
+
+class StreamingTranscriber:
+    """
+    Mantém o buffer da fala corrente e decide quando emitir parciais e finais.
+
+    `append` é barato e pode ser chamado do event loop; `step` e `finish`
+    rodam o modelo e devem ir para uma thread.
+    """
+
+    def __init__(self, asr_pipe, cfg: Dict, sample_rate: int = TARGET_SAMPLE_RATE):
+        self.asr_pipe = asr_pipe
+        self.cfg = cfg
+        self.sample_rate = sample_rate
+        self._frame = int(_FRAME_S * sample_rate)
+        self._lock = threading.Lock()
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)  # sobra < 1 frame para o VAD
+        self._speech_started = False
+        self._last_speech_end = 0       # amostra final da última fala no buffer
+        self._decoded_upto = 0          # amostras cobertas pela última parcial
+        self._last_partial = ""
+        self._speech_end_time: float | None = None
+        self.last_utterance = np.zeros(0, dtype=np.float32)  # áudio da última fala fechada
+
+    # ------------------------------------------------------------------ #
+    # Entrada                                                            #
+    # ------------------------------------------------------------------ #
+    def append(self, pcm: np.ndarray) -> None:
+        if not len(pcm):
+            return
+        with self._lock:
+            start = len(self._buffer)
+            self._buffer = np.concatenate([self._buffer, pcm])
+            pending = np.concatenate([self._pending, pcm])
+            n_frames = len(pending) // self._frame
+            offset = start - len(self._pending)
+            for i in range(n_frames):
+                frame = pending[i * self._frame:(i + 1) * self._frame]
+                db = 20.0 * np.log10(np.sqrt(np.mean(frame ** 2) + 1e-12))
+                if db > self.cfg["silence_db"]:
+                    self._speech_started = True
+                    self._last_speech_end = offset + (i + 1) * self._frame
+                    self._speech_end_time = None
+                elif self._speech_started and self._speech_end_time is None:
+                    self._speech_end_time = time.monotonic()
+            self._pending = pending[n_frames * self._frame:]
+
+    # ------------------------------------------------------------------ #
+    # Decodificação                                                      #
+    # ------------------------------------------------------------------ #
+    def _transcribe(self, audio: np.ndarray) -> str:
+        result = self.asr_pipe(
+            {"raw": audio, "sampling_rate": self.sample_rate},
+            **self.cfg.get("transcription_kwargs", {}),
+        )
+        return result["text"].strip()
+
+    def _endpoint_reached(self) -> bool:
+        silence = (len(self._buffer) - self._last_speech_end) / self.sample_rate
+        return self._speech_started and silence * 1000 >= self.cfg["endpoint_silence_ms"]
+
+    def step(self) -> List[Dict]:
+        """Emite no máximo um evento (parcial ou final) para o áudio acumulado."""
+        with self._lock:
+            buffer = self._buffer
+            speech_end = self._last_speech_end
+            speech_started = self._speech_started
+            endpoint = self._endpoint_reached()
+            overflow = len(buffer) >= self.cfg["max_buffer_s"] * self.sample_rate
+
+        if not speech_started:
+            # descarta silêncio acumulado antes da fala
+            with self._lock:
+                keep = int(0.3 * self.sample_rate)
+                if len(self._buffer) > keep:
+                    self._buffer = self._buffer[-keep:]
+                    self._last_speech_end = 0
+            return []
+
+        if endpoint or overflow:
+            return [self._finalize(buffer, speech_end)]
+
+        if (len(buffer) - self._decoded_upto) / self.sample_rate >= self.cfg["partial_interval_s"]:
+            text = self._transcribe(buffer)
+            self._decoded_upto = len(buffer)
+            if text and text != self._last_partial:
+                self._last_partial = text
+                return [{"type": "partial", "text": text}]
+        return []
+
+    def _finalize(self, buffer: np.ndarray, speech_end: int) -> Dict:
+        # Se a última parcial já cobre toda a fala, reaproveita o texto
+        if self._last_partial and self._decoded_upto >= speech_end:
+            text = self._last_partial
+        else:
+            text = self._transcribe(buffer[:speech_end])
+
+        latency_ms = None
+        if self._speech_end_time is not None:
+            latency_ms = round((time.monotonic() - self._speech_end_time) * 1000, 1)
+
+        self.last_utterance = buffer[:speech_end]
+        event = {
+            "type": "final",
+            "text": text,
+            "audio_s": round(speech_end / self.sample_rate, 3),
+            "latency_ms": latency_ms,
+        }
+        with self._lock:
+            self._buffer = self._buffer[len(buffer):]
+            self._pending = np.zeros(0, dtype=np.float32)
+            self._speech_started = False
+            self._last_speech_end = 0
+            self._speech_end_time = None
+        self._decoded_upto = 0
+        self._last_partial = ""
+        return event
+
+    def finish(self) -> List[Dict]:
+        """Fecha a fala pendente (se houver) no fim do fluxo."""
+        with self._lock:
+            buffer = self._buffer
+            speech_end = self._last_speech_end or len(buffer)
+            speech_started = self._speech_started
+        if not speech_started:
+            return []
+        return [self._finalize(buffer, speech_end)]
+
+
+def parse_control_message(text: str) -> Dict:
+    try:
+        message = json.loads(text)
+    except json.JSONDecodeError:
+        message = {"event": text.strip()}
+    return message if isinstance(message, dict) else {}
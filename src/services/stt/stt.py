@@ -1,9 +1,22 @@
+import io
 import os
 import tempfile
-from typing import Dict, Tuple, Literal
+import threading
+from functools import lru_cache
+from typing import Dict, List, Tuple, Literal
+
+import numpy as np
 
 from utils.load_config import load_config
-from infra.storage import gcs_client
+from utils.audio_io import decode_audio, encode_wav, TARGET_SAMPLE_RATE
+from utils.audio_context import AudioContext
+from services.stt.long_form import (
+    Segment,
+    should_use_long_form,
+    split_audio,
+    stitch_texts,
+    transcribe_chunks,
+)
 
 # openai só é importado se for necessário
 try:
@@ -16,9 +29,184 @@ try:
 except ModuleNotFoundError:
     pipeline = None
 
-def load_stt_pipeline(config_path: str | None = None) -> Tuple[Literal["huggingface", "openai"], object, Dict]:
+try:
+    from faster_whisper import WhisperModel
+except ModuleNotFoundError:
+    WhisperModel = None
+
+STTProvider = Literal["huggingface", "openai", "faster-whisper", "ctc"]
+
+# Providers que aceitam vários áudios numa única chamada (ASRBatcher)
+BATCHED_PROVIDERS = ("huggingface", "ctc")
+
+# faster-whisper espera o código ISO do idioma
+_LANGUAGE_CODES = {"portuguese": "pt", "english": "en", "spanish": "es"}
+
+DEFAULT_FASTER_WHISPER = {
+    "model_path": None,          # diretório CTranslate2; None = converte model_checkpoint
+    "compute_type": "int8",      # int8 | int8_float32 | float32 (cpu)
+    "cpu_threads": 0,            # 0 = padrão do CTranslate2
+    "num_workers": 1,            # transcrições simultâneas no mesmo modelo
+    "beam_size": 1,
+    "vad_filter": False,
+}
+
+DEFAULT_CTC = {
+    "model_checkpoint": "jonatasgrosman/wav2vec2-large-xlsr-53-portuguese",
+    "kenlm_model_path": None,    # arquivo .arpa/.bin do KenLM em português
+    "alpha": 0.5,                # peso do modelo de linguagem
+    "beta": 1.0,                 # bônus por palavra
+    "beam_width": 64,
+    "num_processes": 4,          # processos do beam search (1 = sem pool)
+    "batch_size": 8,             # áudios por forward do wav2vec2
+}
+
+def _build_ctc_decoder(labels: List[str], kenlm_model_path: str | None, alpha: float, beta: float):
+    from pyctcdecode import build_ctcdecoder
+
+    return build_ctcdecoder(labels, kenlm_model_path=kenlm_model_path, alpha=alpha, beta=beta)
+
+# Decoder de cada processo do pool (montado no initializer, KenLM carregado uma vez por processo)
+_worker_decoder = None
+
+def _init_ctc_worker(decoder_args: Tuple) -> None:
+    global _worker_decoder
+    _worker_decoder = _build_ctc_decoder(*decoder_args)
+
+def _ctc_decode_worker(args: Tuple[np.ndarray, int]) -> str:
+    log_probs, beam_width = args
+    return _worker_decoder.decode(log_probs, beam_width=beam_width)
+
+def _load_ctc(stt_cfg: Dict) -> Dict:
+    """
+    Carrega o wav2vec2 (CTC) e monta o decoder do pyctcdecode com KenLM uma única vez.
+    O pool do beam search só é criado no primeiro lote (ver `_ctc_pool`).
+    """
+    from transformers import AutoModelForCTC, AutoProcessor
+
+    ctc_cfg = {**DEFAULT_CTC, **(stt_cfg.get("ctc") or {})}
+    processor = AutoProcessor.from_pretrained(ctc_cfg["model_checkpoint"])
+    model = AutoModelForCTC.from_pretrained(ctc_cfg["model_checkpoint"]).eval()
+    model.to("cuda" if stt_cfg.get("device", "cpu") == "cuda" else "cpu")
+
+    # Labels na ordem dos logits: delimitador de palavra vira espaço e o pad é o blank
+    tokenizer = processor.tokenizer
+    labels = [tok for tok, _ in sorted(tokenizer.get_vocab().items(), key=lambda kv: kv[1])]
+    labels = [
+        " " if tok == tokenizer.word_delimiter_token else "" if tok == tokenizer.pad_token else tok
+        for tok in labels
+    ]
+    decoder_args = (labels, ctc_cfg["kenlm_model_path"], float(ctc_cfg["alpha"]), float(ctc_cfg["beta"]))
+
+    return {
+        "model": model,
+        "processor": processor,
+        "decoder": _build_ctc_decoder(*decoder_args),
+        "decoder_args": decoder_args,
+        "num_processes": int(ctc_cfg["num_processes"]),
+        "pool": None,
+        "pool_lock": threading.Lock(),
+        "beam_width": int(ctc_cfg["beam_width"]),
+        "batch_size": int(ctc_cfg["batch_size"]),
+        "device": model.device,
+    }
+
+def _ctc_pool(ctc_obj: Dict):
+    """
+    Pool do beam search, criado sob demanda com "forkserver": o servidor já tem
+    threads (uvicorn, executores, torch) e um fork nesse estado pode travar.
+    Cada processo monta o próprio decoder no initializer.
+    """
+    if ctc_obj["num_processes"] <= 1:
+        return None
+    with ctc_obj["pool_lock"]:
+        if ctc_obj["pool"] is None:
+            import multiprocessing
+
+            ctc_obj["pool"] = multiprocessing.get_context("forkserver").Pool(
+                ctc_obj["num_processes"],
+                initializer=_init_ctc_worker,
+                initargs=(ctc_obj["decoder_args"],),
+            )
+        return ctc_obj["pool"]
+
+def _ctc_frame_lengths(attention_mask, num_frames: int) -> List[int]:
+    """
+    Frames válidos de cada áudio do lote, proporcionais à parte não-padding da
+    entrada (a convolução do wav2vec2 reduz a taxa de forma uniforme).
+    """
+    input_lengths = attention_mask.sum(-1).tolist()
+    total = attention_mask.shape[-1]
+    return [min(num_frames, int(np.ceil(n * num_frames / total))) for n in input_lengths]
+
+def transcribe_ctc_batch(ctc_obj: Dict, audios: List[np.ndarray]) -> List[str]:
+    """
+    Transcreve vários áudios (float32 16 kHz) com o wav2vec2 em lotes e faz o
+    beam search com KenLM em paralelo no pool de processos.
+    """
+    import torch
+
+    model, processor = ctc_obj["model"], ctc_obj["processor"]
+    batch_size = ctc_obj["batch_size"]
+
+    logits_list = []
+    for i in range(0, len(audios), batch_size):
+        batch = audios[i:i + batch_size]
+        inputs = processor(
+            batch,
+            sampling_rate=TARGET_SAMPLE_RATE,
+            return_tensors="pt",
+            padding=True,
+            return_attention_mask=True,
+        ).to(ctc_obj["device"])
+        with torch.inference_mode():
+            logits = model(inputs.input_values, attention_mask=inputs.attention_mask).logits
+            log_probs = torch.log_softmax(logits, dim=-1).cpu().numpy()
+        lengths = _ctc_frame_lengths(inputs.attention_mask, log_probs.shape[1])
+        logits_list.extend(lp[:n] for lp, n in zip(log_probs, lengths))
+
+    beam_width = ctc_obj["beam_width"]
+    pool = _ctc_pool(ctc_obj) if len(logits_list) > 1 else None
+    if pool is not None:
+        texts = pool.map(_ctc_decode_worker, [(lp, beam_width) for lp in logits_list])
+    else:
+        decoder = ctc_obj["decoder"]
+        texts = [decoder.decode(lp, beam_width=beam_width) for lp in logits_list]
+    return [t.strip() for t in texts]
+
+def _ensure_ctranslate2_model(model_checkpoint: str, model_path: str | None, compute_type: str) -> str:
+    """
+    Devolve um diretório CTranslate2 para o checkpoint, convertendo na primeira vez.
+    Tamanhos oficiais do faster-whisper (ex.: "small") são repassados sem conversão.
+    """
+    if model_path and os.path.isdir(model_path):
+        return model_path
+    if "/" not in model_checkpoint:
+        return model_checkpoint
+
+    import ctranslate2
+
+    output_dir = model_path or os.path.join(
+        "./ct2_models", model_checkpoint.replace("/", "--") + f"-{compute_type}"
+    )
+    if not os.path.isdir(output_dir):
+        quantization = "int8" if compute_type.startswith("int8") else compute_type
+        converter = ctranslate2.converters.TransformersConverter(
+            model_checkpoint, copy_files=["tokenizer.json", "preprocessor_config.json"]
+        )
+        converter.convert(output_dir, quantization=quantization)
+    return output_dir
+
+def load_stt_pipeline(
+    config_path: str | None = None,
+    overrides: Dict | None = None,
+) -> Tuple[STTProvider, object, Dict]:
+    """
+    Carrega o provider de STT configurado.
+    `overrides` sobrescreve chaves da seção `stt` (usado no benchmark).
+    """
     cfg = load_config(config_path) if config_path else load_config()
-    stt_cfg = cfg["stt"]
+    stt_cfg = {**cfg["stt"], **(overrides or {})}
 
     provider = stt_cfg.get("provider", "huggingface").lower()
 
@@ -39,26 +227,107 @@ def load_stt_pipeline(config_path: str | None = None) -> Tuple[Literal["huggingf
         model_name = stt_cfg.get("model_checkpoint", "whisper-1")
         return "openai", {"model": model_name}, stt_cfg.get("transcription_kwargs", {})
 
+    elif provider == "faster-whisper":
+        if WhisperModel is None:
+            raise ImportError("pip install faster-whisper")
+        fw_cfg = {**DEFAULT_FASTER_WHISPER, **(stt_cfg.get("faster_whisper") or {})}
+        model_path = _ensure_ctranslate2_model(
+            stt_cfg["model_checkpoint"], fw_cfg["model_path"], fw_cfg["compute_type"]
+        )
+        model = WhisperModel(
+            model_path,
+            device=stt_cfg.get("device", "cpu"),
+            compute_type=fw_cfg["compute_type"],
+            cpu_threads=int(fw_cfg["cpu_threads"]),
+            num_workers=int(fw_cfg["num_workers"]),
+        )
+        language = stt_cfg.get("language", "portuguese").lower()
+        kwargs = {
+            "language": _LANGUAGE_CODES.get(language, language),
+            "beam_size": int(fw_cfg["beam_size"]),
+            "vad_filter": bool(fw_cfg["vad_filter"]),
+            **stt_cfg.get("transcription_kwargs", {}),
+        }
+        return "faster-whisper", model, kwargs
+
+    elif provider == "ctc":
+        return "ctc", _load_ctc(stt_cfg), stt_cfg.get("transcription_kwargs", {})
+
     else:
         raise ValueError(f"Provider STT desconhecido: {provider}")
 
+@lru_cache(maxsize=2)
+def load_local_asr_pipeline(model_checkpoint: str, device: str = "cpu"):
+    """
+    Carrega (uma vez por checkpoint) um pipeline HuggingFace local.
+    Usado pelos modos que precisam do modelo local mesmo com provider openai.
+    """
+    if pipeline is None:
+        raise ImportError("transformers não instalado.")
+    return pipeline(
+        "automatic-speech-recognition",
+        model=model_checkpoint,
+        device=0 if device == "cuda" else -1,
+    )
+
 def stt_from_audio(
-    audio_source: str | bytes,
-    provider: Literal["huggingface", "openai"],
+    audio_source: str | bytes | np.ndarray | AudioContext,
+    provider: STTProvider,
     asr_obj: object,
     transcription_kwargs: Dict | None = None,
+    long_form: Dict | None = None,
+    batcher=None,
+    filename: str | None = None,
 ) -> str:
+    """
+    Transcreve `audio_source` (caminho local, gs://..., bytes, float32 16 kHz mono
+    ou AudioContext, cujo buffer decodificado é reaproveitado).
+
+    Se `long_form` estiver habilitado e o áudio for mais longo que
+    `min_duration_s`, a transcrição é feita em blocos paralelos. Com `batcher`
+    (ASRBatcher) e provider huggingface/ctc, a chamada entra no lote compartilhado.
+    `filename` é o nome enviado à OpenAI quando a entrada são bytes (define o formato).
+    """
     if transcription_kwargs is None:
         transcription_kwargs = {}
 
-    # Se for gs://... baixa bytes primeiro
-    if isinstance(audio_source, str) and audio_source.startswith("gs://"):
-        audio_bytes = gcs_client.download_bytes(audio_source)
-        audio_input = audio_bytes
-        filename_hint = os.path.basename(audio_source)
+    # Caminho local ou gs://... é lido uma vez (contexto em cache por alguns segundos)
+    if isinstance(audio_source, str):
+        audio_source = AudioContext.from_source(audio_source)
+    ctx = audio_source if isinstance(audio_source, AudioContext) else None
+    if ctx is not None:
+        audio_input = ctx.data
+        filename_hint = filename or ctx.filename
     else:
         audio_input = audio_source
-        filename_hint = "audio.wav" if isinstance(audio_source, (bytes, bytearray)) else os.path.basename(audio_source)
+        filename_hint = filename or "audio.wav"
+
+    def _as_array():
+        # Reaproveita o buffer já decodificado por outra etapa (VAD, locutor)
+        if ctx is not None:
+            return ctx.audio
+        return audio_input if isinstance(audio_input, np.ndarray) else decode_audio(audio_input)
+
+    use_batcher = batcher is not None and provider in BATCHED_PROVIDERS
+    if use_batcher or (long_form and long_form.get("enabled")):
+        audio = _as_array()
+        if should_use_long_form(audio, long_form):
+            return _stt_long_form(audio, provider, asr_obj, transcription_kwargs, long_form)
+        if use_batcher:
+            return batcher.transcribe(audio)
+        audio_input = audio
+
+    if isinstance(audio_input, np.ndarray):
+        if provider == "huggingface":
+            result = asr_obj({"raw": audio_input, "sampling_rate": TARGET_SAMPLE_RATE}, **transcription_kwargs)
+            return result["text"]
+        if provider == "openai":
+            audio_input = encode_wav(audio_input)
+
+    # ---------------------------- CTC + KenLM ---------------------------- #
+    if provider == "ctc":
+        audio = audio_input if isinstance(audio_input, np.ndarray) else _as_array()
+        return transcribe_ctc_batch(asr_obj, [audio])[0]
 
     # ------------------------------ HuggingFace ------------------------------ #
     if provider == "huggingface":
@@ -88,4 +357,89 @@ def stt_from_audio(
             file=(filename_hint, audio_bytes),
             **transcription_kwargs,
         )
-        return response.text 
\ No newline at end of file
+        return response.text
+
+    # ---------------------------- faster-whisper ---------------------------- #
+    elif provider == "faster-whisper":
+        if isinstance(audio_input, (bytes, bytearray)):
+            audio_input = io.BytesIO(audio_input)
+        segments, _ = asr_obj.transcribe(audio_input, **transcription_kwargs)
+        return " ".join(seg.text.strip() for seg in segments).strip()
+
+    else:
+        raise ValueError(f"Provider STT desconhecido: {provider}")
+
+def _stt_long_form(
+    audio,
+    provider: STTProvider,
+    asr_obj: object,
+    transcription_kwargs: Dict,
+    long_form: Dict,
+) -> str:
+    # ------------------------------ HuggingFace ------------------------------ #
+    # O pipeline já faz a divisão, o batching e a costura por timestamps
+    if provider == "huggingface":
+        kwargs = {
+            "chunk_length_s": float(long_form["chunk_length_s"]),
+            "stride_length_s": float(long_form["overlap_s"]),
+            "batch_size": int(long_form["batch_size"]),
+            "return_timestamps": True,
+            **transcription_kwargs,
+        }
+        result = asr_obj({"raw": audio, "sampling_rate": TARGET_SAMPLE_RATE}, **kwargs)
+        return result["text"].strip()
+
+    # -------------------------------- OpenAI -------------------------------- #
+    # Requisições simultâneas, uma por bloco, com timestamps por segmento
+    elif provider == "openai":
+        def _transcribe_chunk(chunk):
+            kwargs = {"response_format": "verbose_json", **transcription_kwargs}
+            response = openai.audio.transcriptions.create(
+                model=asr_obj["model"],
+                file=("chunk.wav", encode_wav(chunk)),
+                **kwargs,
+            )
+            segments = getattr(response, "segments", None)
+            if segments is None:
+                return response.text, None
+            return response.text, [Segment(s.start, s.end, s.text) for s in segments]
+
+        return transcribe_chunks(audio, _transcribe_chunk, long_form)
+
+    # ---------------------------- faster-whisper ---------------------------- #
+    # Pipeline em lote do próprio faster-whisper (janelas de 30s decodificadas juntas)
+    elif provider == "faster-whisper":
+        from faster_whisper import BatchedInferencePipeline
+
+        kwargs = dict(transcription_kwargs)
+        if not kwargs.get("vad_filter"):
+            # Sem VAD o pipeline exige as janelas (em segundos, até 30s cada):
+            # mesmas bordas do CTC, sem sobreposição para não repetir texto
+            bounds = split_audio(
+                audio,
+                chunk_length_s=min(float(long_form["chunk_length_s"]), 30.0),
+                overlap_s=0.0,
+                silence_search_s=float(long_form["silence_search_s"]),
+                silence_db=float(long_form["silence_db"]),
+            )
+            kwargs["clip_timestamps"] = [
+                {"start": s / TARGET_SAMPLE_RATE, "end": e / TARGET_SAMPLE_RATE} for s, e in bounds
+            ]
+
+        batched = BatchedInferencePipeline(model=asr_obj)
+        segments, _ = batched.transcribe(audio, batch_size=int(long_form["batch_size"]), **kwargs)
+        return " ".join(seg.text.strip() for seg in segments).strip()
+
+    # ---------------------------- CTC + KenLM ---------------------------- #
+    # Blocos transcritos num lote só; sem timestamps, a emenda é feita por palavras
+    elif provider == "ctc":
+        bounds = split_audio(
+            audio,
+            chunk_length_s=float(long_form["chunk_length_s"]),
+            overlap_s=float(long_form["overlap_s"]),
+            silence_search_s=float(long_form["silence_search_s"]),
+            silence_db=float(long_form["silence_db"]),
+        )
+        return stitch_texts(transcribe_ctc_batch(asr_obj, [audio[s:e] for s, e in bounds]))
+
+    raise ValueError(f"Provider STT desconhecido: {provider}")
@@ -0,0 +1,116 @@
+"""
+Batching do VITS entre requisições.
+
+Textos de requisições concorrentes (e as frases de um texto longo) são
+tokenizados juntos, com padding e attention mask, e sintetizados num único
+forward. Cada waveform é cortado pelo comprimento previsto pelo modelo
+(`sequence_lengths`), então o resultado por texto é o mesmo da chamada isolada.
+"""
+
+import logging
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import torch
+
+from utils.load_config import load_config
+from utils.batching import MicroBatcher
+from services.tts.streaming import split_sentences
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTS_BATCHING = {
+    "enabled": True,
+    "max_batch_size": 8,
+    "max_wait_ms": 20,
+    "sentence_pause_s": 0.15,   # silêncio entre frases de um texto longo
+}
+
+
+def load_tts_batching_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_TTS_BATCHING, **(cfg["tts"].get("batching") or {})}
+
+
+def synthesize_vits_batch(model, tokenizer, texts: List[str]) -> List[np.ndarray]:
+    """Um forward do VITS para todos os textos; devolve os waveforms sem o padding."""
+    inputs = tokenizer(texts, padding=True, return_tensors="pt").to(model.device)
+    with torch.inference_mode():
+        output = model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+    waveforms = output.waveform.cpu().numpy()
+    lengths = output.sequence_lengths.cpu().tolist()
+    return [waveforms[i, : int(lengths[i])] for i in range(len(texts))]
+
+
+class TTSBatcher:
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        sentence_pause_s: float = 0.15,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.sample_rate = model.config.sampling_rate
+        self.sentence_pause_s = sentence_pause_s
+        self._batcher = MicroBatcher(
+            self._process,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name="tts-batcher",
+        )
+
+    @classmethod
+    def from_config(cls, tts_tuple, batching: Dict) -> "TTSBatcher | None":
+        """Só o VITS tem forward em lote com comprimentos previstos."""
+        tts_type, tts_obj = tts_tuple
+        if tts_type != "vits" or not batching["enabled"]:
+            return None
+        model, tokenizer = tts_obj
+        return cls(
+            model,
+            tokenizer,
+            max_batch_size=batching["max_batch_size"],
+            max_wait_ms=batching["max_wait_ms"],
+            sentence_pause_s=batching["sentence_pause_s"],
+        )
+
+    def _process(self, texts: List[str]) -> List[np.ndarray]:
+        start = time.perf_counter()
+        waveforms = synthesize_vits_batch(self.model, self.tokenizer, texts)
+        elapsed = time.perf_counter() - start
+        audio_s = sum(len(w) for w in waveforms) / self.sample_rate
+        logger.info(
+            f"Lote TTS #{self._batcher.next_batch_id()}: {len(texts)} textos, {audio_s:.1f}s de áudio "
+            f"em {elapsed:.2f}s (RTF {elapsed / audio_s if audio_s else 0.0:.3f})"
+        )
+        return waveforms
+
+    @property
+    def queue_depth(self) -> int:
+        return self._batcher.queue_depth
+
+    def synthesize(self, text: str) -> Tuple[np.ndarray, int]:
+        """Sintetiza uma frase (entra no próximo lote)."""
+        return self._batcher.submit(text).result(), self.sample_rate
+
+    def synthesize_text(self, text: str) -> Tuple[np.ndarray, int]:
+        """
+        Textos longos são divididos em frases que vão juntas para o lote; os
+        waveforms são concatenados com uma pausa curta entre eles.
+        """
+        sentences = split_sentences(text) or [text]
+        if len(sentences) == 1:
+            return self.synthesize(sentences[0])
+
+        futures = self._batcher.submit_many(sentences)
+        pause = np.zeros(int(self.sentence_pause_s * self.sample_rate), dtype=np.float32)
+        parts = []
+        for i, fut in enumerate(futures):
+            if i:
+                parts.append(pause)
+            parts.append(fut.result())
+        return np.concatenate(parts), self.sample_rate
@@ -0,0 +1,125 @@
+"""
+Benchmark de real-time factor e memória dos modos de otimização do TTS local.
+Execute o script com o comando (a partir de src/):
+python -m services.tts.benchmark --modes eager,eager+int8,torchscript,onnx --threads 4
+
+Cada modo roda num processo próprio, para que a memória medida (pico de RSS)
+seja só a dele. Modos: eager, torchscript, onnx; o sufixo "+int8" ativa a
+quantização dinâmica.
+"""
+
+import argparse
+import multiprocessing as mp
+import resource
+import statistics
+import time
+from typing import Dict, List
+
+SENTENCES = [
+    "Olá! Como posso ajudar você hoje?",
+    "Claro, vou verificar essa informação para você agora mesmo.",
+    "A previsão para amanhã é de sol com algumas nuvens à tarde.",
+    "Obrigado pela conversa, até a próxima!",
+]
+
+
+# --------------------------------------------------------------------------- #
+# 1. Execução de um modo (processo filho)                                     #
+# --------------------------------------------------------------------------- #
+def _rss_mb() -> float:
+    # ru_maxrss vem em KiB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, model_checkpoint: str | None, threads: int | None, repeats: int, warmup: int) -> Dict:
+    from services.tts.tts import load_tts_pipeline, synthesize_waveform
+
+    base_mode, _, suffix = mode.partition("+")
+    overrides = {
+        "optimize": {
+            "mode": base_mode,
+            "quantize": suffix == "int8",
+            "num_threads": threads,
+        }
+    }
+    if model_checkpoint:
+        overrides["model_checkpoint"] = model_checkpoint
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    tts_tuple, *_ = load_tts_pipeline(overrides=overrides)
+    load_s = time.perf_counter() - start
+    rss_loaded = _rss_mb()
+
+    model = tts_tuple[1][0] if tts_tuple[0] != "pipeline" else tts_tuple[1].model
+    effective = getattr(model, "optimization", "") or "eager"
+
+    for text in SENTENCES[:warmup]:
+        synthesize_waveform(text, tts_tuple)
+
+    latencies, rtfs = [], []
+    for _ in range(repeats):
+        for text in SENTENCES:
+            start = time.perf_counter()
+            waveform, sr = synthesize_waveform(text, tts_tuple)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            rtfs.append(elapsed / (len(waveform) / sr))
+
+    return {
+        "mode": mode,
+        "effective": effective,
+        "load_s": load_s,
+        "latency_mean_s": statistics.mean(latencies),
+        "rtf_mean": statistics.mean(rtfs),
+        "model_mb": rss_loaded - rss_before,
+        "peak_mb": _rss_mb(),
+    }
+
+
+def _run_isolated(args) -> Dict:
+    try:
+        return run_mode(*args)
+    except Exception as e:
+        return {"mode": args[0], "error": str(e)}
+
+
+# --------------------------------------------------------------------------- #
+# 2. Programa principal                                                       #
+# --------------------------------------------------------------------------- #
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara RTF e memória dos modos de otimização do TTS.")
+    parser.add_argument(
+        "--modes",
+        default="eager,eager+int8,torchscript,onnx",
+        help="Modos separados por vírgula (eager, torchscript, onnx; sufixo +int8).",
+    )
+    parser.add_argument("--model_checkpoint", default=None, help="Sobrescreve tts.model_checkpoint.")
+    parser.add_argument("--threads", type=int, default=None, help="Threads intra-op.")
+    parser.add_argument("--repeats", type=int, default=3, help="Repetições do conjunto de frases.")
+    parser.add_argument("--warmup", type=int, default=2, help="Frases de aquecimento.")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    results: List[Dict] = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        print(f"⏳ {mode}…")
+        with ctx.Pool(1) as pool:
+            result = pool.apply(
+                _run_isolated, ((mode, args.model_checkpoint, args.threads, args.repeats, args.warmup),)
+            )
+        if "error" in result:
+            print(f"  ❌ {mode} falhou: {result['error']}")
+        else:
+            results.append(result)
+
+    print(f"\n{'modo':<18}{'efetivo':<20}{'carga(s)':>9}{'média(s)':>10}{'RTF':>8}{'modelo(MB)':>12}{'pico(MB)':>10}")
+    for r in results:
+        print(
+            f"{r['mode']:<18}{r['effective']:<20}{r['load_s']:>9.1f}{r['latency_mean_s']:>10.3f}"
+            f"{r['rtf_mean']:>8.3f}{r['model_mb']:>12.0f}{r['peak_mb']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark do cliente da ElevenLabs: chamada antiga (requests.post por frase,
+resposta inteira) contra sessão persistente + endpoint de streaming.
+Execute o script com os comandos (a partir de src/):
+python -m services.tts.mock_elevenlabs --port 8123 &
+ELEVEN_BASE_URL=http://127.0.0.1:8123 XI_API_KEY=mock python -m services.tts.benchmark_elevenlabs --requests 40 --concurrency 4
+
+Mede, por modo, o tempo até o primeiro byte de áudio disponível para o
+chamador (TTFB) e o tempo total de cada requisição.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import requests
+
+from services.tts.elevenlabs import (
+    DEFAULT_MODEL_ID,
+    DEFAULT_VOICE_ID,
+    DEFAULT_VOICE_SETTINGS,
+    ElevenLabsClient,
+)
+
+SENTENCES = [
+    "Olá! Como posso ajudar você hoje?",
+    "Claro, vou verificar essa informação para você agora mesmo.",
+    "Obrigado pela conversa, até a próxima!",
+    "Essa é uma resposta um pouco mais longa, com várias frases. Ela serve para medir o tempo total.",
+]
+
+
+# --------------------------------------------------------------------------- #
+# 1. Modos                                                                    #
+# --------------------------------------------------------------------------- #
+def legacy_call(base_url: str, api_key: str, text: str) -> Tuple[float, float]:
+    """Como o tts_eleven antigo: conexão nova e resposta inteira em memória."""
+    start = time.perf_counter()
+    resp = requests.post(
+        f"{base_url}/v1/text-to-speech/{DEFAULT_VOICE_ID}",
+        headers={"xi-api-key": api_key, "Content-Type": "application/json"},
+        json={"text": text, "model_id": DEFAULT_MODEL_ID, "voice_settings": DEFAULT_VOICE_SETTINGS},
+        timeout=60,
+    )
+    resp.raise_for_status()
+    _ = resp.content
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def streaming_call(client: ElevenLabsClient, text: str) -> Tuple[float, float]:
+    start = time.perf_counter()
+    ttfb = None
+    for _ in client.stream(text):
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+    return ttfb or 0.0, time.perf_counter() - start
+
+
+# --------------------------------------------------------------------------- #
+# 2. Execução                                                                 #
+# --------------------------------------------------------------------------- #
+def run_mode(call: Callable[[str], Tuple[float, float]], n_requests: int, concurrency: int) -> Dict:
+    texts = [SENTENCES[i % len(SENTENCES)] for i in range(n_requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results: List[Tuple[float, float]] = list(pool.map(call, texts))
+    wall = time.perf_counter() - start
+
+    ttfbs = sorted(r[0] for r in results)
+    totals = sorted(r[1] for r in results)
+    p90 = lambda xs: xs[min(len(xs) - 1, int(len(xs) * 0.9))]
+    return {
+        "ttfb_p50_s": statistics.median(ttfbs),
+        "ttfb_p90_s": p90(ttfbs),
+        "total_p50_s": statistics.median(totals),
+        "total_p90_s": p90(totals),
+        "throughput_rps": n_requests / wall if wall else 0.0,
+    }
+
+
+# --------------------------------------------------------------------------- #
+# 3. Programa principal                                                       #
+# --------------------------------------------------------------------------- #
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara o cliente antigo e o de streaming da ElevenLabs.")
+    parser.add_argument("--requests", type=int, default=40, help="Requisições por modo.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requisições simultâneas.")
+    parser.add_argument("--warmup", type=int, default=2, help="Requisições de aquecimento por modo.")
+    args = parser.parse_args()
+
+    base_url = os.getenv("ELEVEN_BASE_URL", "https://api.elevenlabs.io").rstrip("/")
+    api_key = os.getenv("XI_API_KEY")
+    if not api_key:
+        raise SystemExit("XI_API_KEY não definido (use qualquer valor com o mock).")
+    print(f"Servidor: {base_url}")
+
+    client = ElevenLabsClient(api_key=api_key, base_url=base_url)
+    modes = {
+        "legacy": lambda text: legacy_call(base_url, api_key, text),
+        "pooled-stream": lambda text: streaming_call(client, text),
+    }
+
+    results = {}
+    for name, call in modes.items():
+        print(f"⏳ {name}…")
+        for text in SENTENCES[: args.warmup]:
+            call(text)
+        results[name] = run_mode(call, args.requests, args.concurrency)
+
+    print(f"\n{'modo':<16}{'TTFB p50':>10}{'TTFB p90':>10}{'total p50':>11}{'total p90':>11}{'req/s':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<16}{r['ttfb_p50_s']:>10.3f}{r['ttfb_p90_s']:>10.3f}"
+            f"{r['total_p50_s']:>11.3f}{r['total_p90_s']:>11.3f}{r['throughput_rps']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Cache de áudios sintetizados.
+
+A chave combina o texto normalizado com engine, voz, configurações de voz e
+versão do modelo. Um LRU em memória responde às frases quentes (saudações,
+despedidas) e um índice SQLite persistente mapeia as chaves para objetos
+gs:// (ou arquivos locais) já existentes, sobrevivendo a reinícios do serviço.
+Assim frases repetidas não voltam a ser sintetizadas nem enviadas ao GCS.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, Tuple
+
+from utils.cache import SingleFlight, TTLCache
+from utils.load_config import load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTS_CACHE = {
+    "enabled": True,
+    "maxsize": 1024,                              # entradas no LRU em memória
+    "ttl_s": None,                                # None = sem expiração
+    "index_path": "./.cache/tts_index.sqlite",    # None = só memória
+}
+
+
+def load_tts_cache_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_TTS_CACHE, **(cfg["tts"].get("cache") or {})}
+
+
+def normalize_text(text: str) -> str:
+    """NFC e espaços colapsados; caixa e pontuação são mantidas porque mudam a prosódia."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class _SQLiteIndex:
+    """Índice chave -> URI persistido em SQLite (seguro entre threads)."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tts_cache ("
+                " key TEXT PRIMARY KEY, uri TEXT NOT NULL, engine TEXT, text TEXT, created_at REAL)"
+            )
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT uri FROM tts_cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, uri: str, engine: str, text: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tts_cache (key, uri, engine, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, uri, engine, text, time.time()),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tts_cache WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tts_cache").fetchone()[0]
+
+
+class TTSCache:
+    def __init__(self, maxsize: int = 1024, ttl_s: float | None = None, index_path: str | None = None):
+        self._memory = TTLCache(maxsize=maxsize, ttl_s=ttl_s)
+        self._index = _SQLiteIndex(index_path) if index_path else None
+        self._flight = SingleFlight()
+        self.index_hits = 0
+
+    @classmethod
+    def from_config(cls, cache_cfg: Dict) -> "TTSCache | None":
+        if not cache_cfg["enabled"]:
+            return None
+        return cls(
+            maxsize=cache_cfg["maxsize"],
+            ttl_s=cache_cfg["ttl_s"],
+            index_path=cache_cfg["index_path"],
+        )
+
+    @staticmethod
+    def key(
+        text: str,
+        engine: str,
+        voice_id: str | None = None,
+        voice_settings: Dict[str, Any] | None = None,
+        model_version: str | None = None,
+        encoding: str | None = None,
+    ) -> str:
+        """`encoding` identifica formato/bitrate do arquivo salvo (ex.: "opus@32k")."""
+        payload = {
+            "text": normalize_text(text),
+            "engine": engine,
+            "voice_id": voice_id,
+            "voice_settings": voice_settings or {},
+            "model_version": model_version,
+            "encoding": encoding,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        uri = self._memory.get(key)
+        if uri is not None:
+            return uri
+        if self._index is None:
+            return None
+
+        uri = self._index.get(key)
+        if uri is None:
+            return None
+        if not uri.startswith("gs://") and not os.path.exists(uri):
+            # arquivo local removido: a entrada não serve mais
+            self._index.delete(key)
+            return None
+        self.index_hits += 1
+        self._memory.set(key, uri)
+        return uri
+
+    def set(self, key: str, uri: str, engine: str = "", text: str = "") -> None:
+        self._memory.set(key, uri)
+        if self._index is not None:
+            self._index.set(key, uri, engine, normalize_text(text))
+
+    def get_or_create(
+        self, key: str, fn: Callable[[], str], engine: str = "", text: str = ""
+    ) -> Tuple[str, bool]:
+        """
+        Devolve (uri, hit). Em caso de miss, `fn` gera o áudio uma única vez
+        mesmo com requisições concorrentes para a mesma frase.
+        """
+        uri = self.get(key)
+        if uri is not None:
+            return uri, True
+
+        def _create():
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            created = fn()
+            self.set(key, created, engine, text)
+            return created
+
+        uri, shared = self._flight.do(key, _create)
+        return uri, shared
+
+    def stats(self) -> Dict:
+        return {
+            **self._memory.stats(),
+            "index_hits": self.index_hits,
+            "index_size": len(self._index) if self._index is not None else 0,
+            "inflight": self._flight.inflight(),
+        }
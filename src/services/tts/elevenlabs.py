@@ -0,0 +1,161 @@
+"""
+Cliente da ElevenLabs com sessão HTTP persistente e endpoint de streaming.
+
+Uma única `requests.Session` (pool de conexões keep-alive) é compartilhada por
+todas as requisições, evitando handshake TCP/TLS a cada frase. O áudio é
+lido do endpoint `/stream` em blocos e repassado ao chamador conforme chega;
+quem precisar do arquivo inteiro (upload ao GCS) recebe os bytes no final.
+
+A URL base vem de ELEVEN_BASE_URL, o que permite apontar para o servidor
+falso de `services.tts.mock_elevenlabs` em testes e benchmarks.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.load_config import load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_ID = "eleven_multilingual_v2"
+DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
+DEFAULT_VOICE_SETTINGS = {
+    "stability": 0.4,
+    "similarity_boost": 0.8,
+}
+
+DEFAULT_ELEVENLABS = {
+    "pool_maxsize": 16,         # conexões keep-alive mantidas com a API
+    "connect_timeout_s": 5,
+    "read_timeout_s": 30,       # entre blocos, não para a resposta inteira
+    "chunk_size": 4096,
+    "output_format": "mp3_44100_64",
+    "connect_retries": 2,       # só falhas de conexão (o POST não é reenviado após enviado)
+}
+
+_OUTPUT_CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "pcm": "audio/L16",
+    "ulaw": "audio/basic",
+    "opus": "audio/ogg",
+}
+
+
+def load_elevenlabs_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_ELEVENLABS, **(cfg["tts"].get("elevenlabs") or {})}
+
+
+def output_content_type(output_format: str) -> str:
+    return _OUTPUT_CONTENT_TYPES.get(output_format.split("_")[0], "application/octet-stream")
+
+
+def output_extension(output_format: str) -> str:
+    return output_format.split("_")[0]
+
+
+class ElevenLabsClient:
+    def __init__(self, cfg: Dict | None = None, api_key: str | None = None, base_url: str | None = None):
+        self.cfg = {**DEFAULT_ELEVENLABS, **(cfg or {})}
+        self.api_key = api_key or os.getenv("XI_API_KEY")
+        self.base_url = (base_url or os.getenv("ELEVEN_BASE_URL", "https://api.elevenlabs.io")).rstrip("/")
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=int(self.cfg["pool_maxsize"]),
+            max_retries=Retry(
+                total=None,
+                connect=int(self.cfg["connect_retries"]),
+                read=0,
+                status=0,
+                backoff_factor=0.2,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def content_type(self) -> str:
+        return output_content_type(self.cfg["output_format"])
+
+    def stream(
+        self,
+        text: str,
+        voice_id: str = DEFAULT_VOICE_ID,
+        model_id: str = DEFAULT_MODEL_ID,
+        voice_settings: Dict[str, Any] | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Gera os blocos de áudio conforme a ElevenLabs os envia. A requisição é
+        feita antes do primeiro `next`, então erros da API aparecem já na
+        primeira iteração.
+        """
+        if not self.api_key:
+            raise RuntimeError("XI_API_KEY não definido.")
+
+        start = time.perf_counter()
+        resp = self.session.post(
+            f"{self.base_url}/v1/text-to-speech/{voice_id}/stream",
+            params={"output_format": self.cfg["output_format"]},
+            headers={"xi-api-key": self.api_key, "Content-Type": "application/json"},
+            json={
+                "text": text,
+                "model_id": model_id,
+                "voice_settings": voice_settings or DEFAULT_VOICE_SETTINGS,
+            },
+            stream=True,
+            timeout=(float(self.cfg["connect_timeout_s"]), float(self.cfg["read_timeout_s"])),
+        )
+        with resp:
+            if resp.status_code != 200:
+                raise RuntimeError(
+                    f"ElevenLabs API erro {resp.status_code}: {resp.text[:200]}"
+                )
+            first = True
+            for chunk in resp.iter_content(chunk_size=int(self.cfg["chunk_size"])):
+                if not chunk:
+                    continue
+                if first:
+                    logger.info(f"ElevenLabs: primeiro bloco em {time.perf_counter() - start:.2f}s")
+                    first = False
+                yield chunk
+
+    def synthesize(self, text: str, **kwargs) -> bytes:
+        """Áudio completo (ainda via streaming, com a mesma conexão do pool)."""
+        return b"".join(self.stream(text, **kwargs))
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def relay(chunks: Iterator[bytes], on_complete: Callable[[bytes], None] | None = None) -> Iterator[bytes]:
+    """
+    Repassa os blocos ao chamador e, se a transmissão terminar por completo,
+    entrega o áudio inteiro a `on_complete` (ex.: upload ao GCS).
+    """
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    if on_complete is not None:
+        on_complete(b"".join(parts))
+
+
+_client: ElevenLabsClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_elevenlabs_client() -> ElevenLabsClient:
+    """Cliente único do processo (a sessão e o pool de conexões são compartilhados)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ElevenLabsClient(load_elevenlabs_config())
+        return _client
@@ -0,0 +1,99 @@
+"""
+Servidor falso da ElevenLabs para testes e benchmarks (sem custo de API).
+Execute o servidor com o comando (a partir de src/):
+python -m services.tts.mock_elevenlabs --port 8123 --ttfb_ms 250 --chunk_ms 40
+
+E aponte o cliente para ele:
+ELEVEN_BASE_URL=http://127.0.0.1:8123 XI_API_KEY=mock uvicorn main:app
+
+Imita os dois endpoints usados: `/v1/text-to-speech/{voice_id}` (resposta
+inteira) e `/v1/text-to-speech/{voice_id}/stream` (blocos espaçados no tempo,
+como a geração incremental real). O áudio é um tom senoidal com duração
+proporcional ao texto.
+"""
+
+import argparse
+import asyncio
+from functools import lru_cache
+
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from utils.audio_io import encode_audio
+
+SAMPLE_RATE = 22050
+CHARS_PER_SECOND = 15
+
+app = FastAPI(title="Mock ElevenLabs")
+app.state.ttfb_s = 0.25
+app.state.chunk_s = 0.04
+app.state.chunk_size = 4096
+
+
+class MockTTSRequest(BaseModel):
+    text: str
+    model_id: str | None = None
+    voice_settings: dict | None = None
+
+
+@lru_cache(maxsize=64)
+def _fake_audio(seconds: int) -> bytes:
+    t = np.arange(seconds * SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.2 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    return encode_audio(tone, SAMPLE_RATE, "mp3", 64)
+
+
+def _audio_for(text: str) -> bytes:
+    return _fake_audio(max(1, round(len(text) / CHARS_PER_SECOND)))
+
+
+def _check_key(xi_api_key: str | None) -> None:
+    if not xi_api_key:
+        raise HTTPException(status_code=401, detail="xi-api-key ausente")
+
+
+@app.post("/v1/text-to-speech/{voice_id}")
+async def tts(voice_id: str, req: MockTTSRequest, xi_api_key: str | None = Header(None)):
+    _check_key(xi_api_key)
+    audio = _audio_for(req.text)
+    n_chunks = -(-len(audio) // app.state.chunk_size)
+    # sem streaming, a resposta só sai quando toda a "geração" termina
+    await asyncio.sleep(app.state.ttfb_s + n_chunks * app.state.chunk_s)
+    return Response(content=audio, media_type="audio/mpeg")
+
+
+@app.post("/v1/text-to-speech/{voice_id}/stream")
+async def tts_stream(voice_id: str, req: MockTTSRequest, xi_api_key: str | None = Header(None)):
+    _check_key(xi_api_key)
+    audio = _audio_for(req.text)
+    size = app.state.chunk_size
+
+    async def _chunks():
+        await asyncio.sleep(app.state.ttfb_s)
+        for i in range(0, len(audio), size):
+            if i:
+                await asyncio.sleep(app.state.chunk_s)
+            yield audio[i:i + size]
+
+    return StreamingResponse(_chunks(), media_type="audio/mpeg")
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Servidor falso da ElevenLabs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--ttfb_ms", type=float, default=250, help="Atraso até o primeiro bloco.")
+    parser.add_argument("--chunk_ms", type=float, default=40, help="Intervalo entre blocos.")
+    args = parser.parse_args()
+
+    app.state.ttfb_s = args.ttfb_ms / 1000
+    app.state.chunk_s = args.chunk_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
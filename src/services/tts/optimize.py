@@ -0,0 +1,258 @@
+"""
+Camada de otimização dos modelos de TTS locais (VITS e Parler-TTS).
+
+Tudo acontece uma vez, no `load_tts_pipeline`:
+- threads do PyTorch ajustadas (`num_threads`/`interop_threads`);
+- modelo movido para o device e colocado em `eval`, sem gradientes;
+- quantização dinâmica int8 das camadas Linear (opcional, por modelo);
+- VITS exportado para TorchScript ou ONNX (opcional), com o grafo salvo em
+  `export_dir` e reaproveitado nas próximas inicializações.
+
+Os modos exportados são validados com um texto de tamanho diferente do usado
+na exportação; se a validação falhar, o modelo volta ao modo eager com um aviso.
+Os runners exportados têm a mesma interface do VitsModel usada pelo serviço
+(`model(input_ids=..., attention_mask=...)` -> `.waveform`, `.sequence_lengths`).
+"""
+
+import logging
+import os
+from types import SimpleNamespace
+from typing import Dict
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPTIMIZE = {
+    "mode": "eager",            # eager, torchscript, onnx (os dois últimos só para VITS)
+    "quantize": False,          # int8 dinâmico nas camadas Linear
+    "num_threads": None,        # torch.set_num_threads / threads intra-op do ONNX Runtime
+    "interop_threads": None,
+    "export_dir": "./.cache/tts_export",
+}
+
+OPTIMIZE_MODES = ("eager", "torchscript", "onnx")
+
+# Textos usados para exportar e validar os grafos (comprimentos diferentes)
+_EXPORT_TEXT = "Olá, tudo bem?"
+_CHECK_TEXT = "Esta frase é mais longa e serve para validar o grafo exportado com outro comprimento."
+
+
+def load_optimize_config(tts_cfg: Dict) -> Dict:
+    cfg = {**DEFAULT_OPTIMIZE, **(tts_cfg.get("optimize") or {})}
+    if cfg["mode"] not in OPTIMIZE_MODES:
+        raise ValueError(f"tts.optimize.mode deve ser um de {OPTIMIZE_MODES}")
+    return cfg
+
+
+_threads_configured = False
+
+
+def configure_threads(num_threads: int | None, interop_threads: int | None) -> None:
+    """O PyTorch só aceita mudar as threads inter-op uma vez por processo."""
+    global _threads_configured
+    if num_threads:
+        torch.set_num_threads(int(num_threads))
+    if interop_threads and not _threads_configured:
+        try:
+            torch.set_num_interop_threads(int(interop_threads))
+        except RuntimeError as e:
+            logger.warning(f"Não foi possível ajustar interop_threads: {e}")
+    _threads_configured = True
+
+
+def prepare_model(model, device: str = "cpu"):
+    """Move para o device, coloca em eval e desliga gradientes (uma vez, no carregamento)."""
+    model = model.to(device).eval()
+    for param in model.parameters():
+        param.requires_grad_(False)
+    return model
+
+
+def quantize_dynamic(model):
+    """int8 dinâmico nas camadas Linear (só CPU). Convoluções ficam em float."""
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.optimization = "int8"
+    return model
+
+
+# --------------------------------------------------------------------------- #
+# VITS exportado                                                              #
+# --------------------------------------------------------------------------- #
+class _VitsGraph(torch.nn.Module):
+    """Adapta o VitsModel para saídas em tupla (exigidas por trace/ONNX)."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        output = self.model(input_ids=input_ids, attention_mask=attention_mask)
+        return output.waveform, output.sequence_lengths
+
+
+class _ExportedVits:
+    """Interface comum dos runners exportados (igual à parte usada do VitsModel)."""
+
+    optimization = ""
+
+    def __init__(self, model):
+        self.config = model.config
+        self.device = torch.device("cpu")
+        if getattr(model, "optimization", ""):
+            self.optimization = f"{self.optimization}-{model.optimization}"
+
+    def _run(self, input_ids, attention_mask):
+        raise NotImplementedError
+
+    def __call__(self, input_ids, attention_mask=None, **kwargs):
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
+        waveform, lengths = self._run(input_ids, attention_mask)
+        return SimpleNamespace(waveform=waveform, sequence_lengths=lengths)
+
+    def to(self, device):
+        return self
+
+
+class TorchScriptVits(_ExportedVits):
+    optimization = "torchscript"
+
+    def __init__(self, model, path: str):
+        super().__init__(model)
+        self.module = torch.jit.load(path, map_location="cpu").eval()
+
+    def _run(self, input_ids, attention_mask):
+        with torch.inference_mode():
+            return self.module(input_ids, attention_mask)
+
+
+class OnnxVits(_ExportedVits):
+    optimization = "onnx"
+
+    def __init__(self, model, path: str, num_threads: int | None = None):
+        import onnxruntime as ort
+
+        super().__init__(model)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = int(num_threads)
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def _run(self, input_ids, attention_mask):
+        waveform, lengths = self.session.run(
+            None,
+            {
+                "input_ids": input_ids.cpu().numpy().astype(np.int64),
+                "attention_mask": attention_mask.cpu().numpy().astype(np.int64),
+            },
+        )
+        return torch.from_numpy(waveform), torch.from_numpy(lengths)
+
+
+def _export_path(model, export_dir: str, suffix: str) -> str:
+    name = getattr(model.config, "_name_or_path", "vits").replace("/", "--")
+    return os.path.join(export_dir, f"{name}.{suffix}")
+
+
+def export_vits_torchscript(model, tokenizer, path: str) -> str:
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        inputs = tokenizer(_EXPORT_TEXT, return_tensors="pt")
+        with torch.inference_mode():
+            traced = torch.jit.trace(
+                _VitsGraph(model), (inputs["input_ids"], inputs["attention_mask"]), check_trace=False
+            )
+        traced.save(path)
+        logger.info(f"VITS exportado para TorchScript em {path}")
+    return path
+
+
+def export_vits_onnx(model, tokenizer, path: str) -> str:
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        inputs = tokenizer(_EXPORT_TEXT, return_tensors="pt")
+        with torch.inference_mode():
+            torch.onnx.export(
+                _VitsGraph(model),
+                (inputs["input_ids"], inputs["attention_mask"]),
+                path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["waveform", "sequence_lengths"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "tokens"},
+                    "attention_mask": {0: "batch", 1: "tokens"},
+                    "waveform": {0: "batch", 1: "samples"},
+                    "sequence_lengths": {0: "batch"},
+                },
+                opset_version=17,
+            )
+        logger.info(f"VITS exportado para ONNX em {path}")
+    return path
+
+
+def _validate(runner: _ExportedVits, model, tokenizer) -> None:
+    """
+    O trace congela o que for Python (ex.: comprimento da saída); compara a
+    duração gerada para um texto mais longo com a do modelo eager, tanto em
+    `sequence_lengths` quanto no tamanho real do waveform.
+    """
+    inputs = tokenizer(_CHECK_TEXT, return_tensors="pt")
+    with torch.inference_mode():
+        eager = model(**inputs)
+    expected = int(eager.sequence_lengths[0])
+    expected_samples = int(eager.waveform.shape[-1])
+
+    output = runner(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+    got = int(output.sequence_lengths[0])
+    got_samples = int(output.waveform.shape[-1])
+
+    # A duração é estocástica (noise_scale_duration); 25% de folga cobre a variação
+    if abs(got - expected) > 0.25 * expected:
+        raise RuntimeError(f"grafo exportado gerou {got} amostras, esperado ~{expected}")
+    # Um grafo com o comprimento congelado reporta a duração certa mas corta o áudio
+    if got_samples < got:
+        raise RuntimeError(f"grafo exportado gerou waveform de {got_samples} amostras para sequence_lengths={got}")
+    if abs(got_samples - expected_samples) > 0.25 * expected_samples:
+        raise RuntimeError(f"grafo exportado gerou waveform de {got_samples} amostras, esperado ~{expected_samples}")
+
+
+def optimize_vits(model, tokenizer, cfg: Dict, device: str = "cpu"):
+    """Devolve o modelo (ou runner exportado) pronto para `synthesize_waveform`."""
+    configure_threads(cfg["num_threads"], cfg["interop_threads"])
+    model = prepare_model(model, device)
+    if cfg["quantize"] and device == "cpu":
+        model = quantize_dynamic(model)
+
+    mode = cfg["mode"]
+    if mode == "eager":
+        return model
+    if device != "cpu":
+        logger.warning(f"tts.optimize.mode={mode} só é suportado em CPU; usando eager")
+        return model
+
+    suffix = ("int8." if cfg["quantize"] else "") + ("pt" if mode == "torchscript" else "onnx")
+    path = _export_path(model, cfg["export_dir"], suffix)
+    try:
+        if mode == "torchscript":
+            runner = TorchScriptVits(model, export_vits_torchscript(model, tokenizer, path))
+        else:
+            runner = OnnxVits(model, export_vits_onnx(model, tokenizer, path), cfg["num_threads"])
+        _validate(runner, model, tokenizer)
+    except Exception as e:
+        logger.warning(f"Exportação do VITS ({mode}) falhou, usando eager: {e}")
+        return model
+    return runner
+
+
+def optimize_parler(model, cfg: Dict, device: str = "cpu"):
+    """Parler-TTS: só preparo e quantização (a geração autoregressiva não é exportada)."""
+    configure_threads(cfg["num_threads"], cfg["interop_threads"])
+    if cfg["mode"] != "eager":
+        logger.warning(f"tts.optimize.mode={cfg['mode']} não se aplica ao Parler-TTS; usando eager")
+    model = prepare_model(model, device)
+    if cfg["quantize"] and device == "cpu":
+        model = quantize_dynamic(model)
+    return model
@@ -0,0 +1,57 @@
+"""
+Modelo de TTS local e seus auxiliares, carregados uma vez por processo.
+
+As rotas de TTS e as do assistente (reply_and_speak) usam o mesmo modelo,
+batcher, sintetizador de streaming e cache, em vez de cada módulo carregar
+sua cópia.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from utils.executors import get_executor
+from utils.load_config import load_config
+from services.tts.tts import load_tts_pipeline
+from services.tts.batcher import TTSBatcher, load_tts_batching_config
+from services.tts.cache import TTSCache, load_tts_cache_config
+from services.tts.streaming import StreamingSynthesizer, load_streaming_config
+
+
+@dataclass
+class TTSRuntime:
+    tts_tuple: Any
+    language: str
+    output_dir: str
+    audio_format: str
+    bitrate_kbps: int | None
+    batcher: TTSBatcher | None
+    synthesizer: StreamingSynthesizer
+    cache: TTSCache | None
+
+
+_runtime: TTSRuntime | None = None
+_runtime_lock = threading.Lock()
+
+
+def get_tts_runtime() -> TTSRuntime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            tts_tuple, language, output_dir, audio_format = load_tts_pipeline()
+            # Junta textos de requisições concorrentes num único forward (VITS)
+            batcher = TTSBatcher.from_config(tts_tuple, load_tts_batching_config())
+            _runtime = TTSRuntime(
+                tts_tuple=tts_tuple,
+                language=language,
+                output_dir=output_dir,
+                audio_format=audio_format,
+                bitrate_kbps=load_config()["tts"].get("bitrate_kbps"),
+                batcher=batcher,
+                # Frases do streaming passam pelo executor do VITS (fila limitada)
+                synthesizer=StreamingSynthesizer(
+                    tts_tuple, load_streaming_config(), batcher=batcher, executor=get_executor("vits")
+                ),
+                cache=TTSCache.from_config(load_tts_cache_config()),
+            )
+        return _runtime
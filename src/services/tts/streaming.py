@@ -0,0 +1,256 @@
+"""
+Síntese de voz em streaming, frase a frase.
+
+O texto é dividido em frases; elas são sintetizadas em ordem num pool de
+threads com algumas frases de antecedência (lookahead), e cada áudio é
+entregue assim que fica pronto. O tempo até o primeiro áudio passa a depender
+só da primeira frase.
+
+O texto também pode chegar aos poucos (ex.: stream do LLM): `SentenceChunker`
+corta as frases conforme elas se completam e `StreamingSynthesizer.astream`
+as sintetiza enquanto o resto do texto ainda está sendo gerado. Com um
+`InferenceExecutor`, cada frase do caminho async passa pelo executor do VITS
+(concorrência e fila limitadas); fila cheia levanta `ExecutorOverloaded`.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, List
+
+import numpy as np
+
+from utils.executors import ExecutorOverloaded
+from utils.load_config import load_config
+from services.tts.tts import synthesize_waveform
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAMING = {
+    "lookahead": 2,        # frases sintetizadas à frente da que está sendo enviada
+    "workers": 2,          # threads de síntese compartilhadas entre requisições
+    "max_chars": 220,      # frases maiores são quebradas em vírgulas/espaços
+    "min_chars": 25,       # frases menores são juntadas à seguinte
+}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…;])\s+")
+_SOFT_BREAK = re.compile(r"(?<=[,:])\s+")
+
+
+@dataclass
+class AudioSegment:
+    index: int
+    text: str
+    waveform: np.ndarray
+    sample_rate: int
+    synth_s: float
+
+
+def load_streaming_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_STREAMING, **(cfg["tts"].get("streaming") or {})}
+
+
+def _hard_split(sentence: str, max_chars: int) -> List[str]:
+    """Quebra frases longas em vírgulas e, se preciso, em espaços."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    parts, current = [], ""
+    for piece in _SOFT_BREAK.split(sentence):
+        for word in piece.split(" ") if len(piece) > max_chars else [piece]:
+            candidate = f"{current} {word}".strip()
+            if current and len(candidate) > max_chars:
+                parts.append(current)
+                current = word
+            else:
+                current = candidate
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_sentences(text: str, max_chars: int = 220, min_chars: int = 25) -> List[str]:
+    """Divide `text` em frases de tamanho adequado para síntese."""
+    sentences = []
+    for raw in _SENTENCE_END.split(text.strip()):
+        raw = " ".join(raw.split())
+        if raw:
+            sentences.extend(_hard_split(raw, max_chars))
+
+    merged: List[str] = []
+    for sentence in sentences:
+        if merged and len(merged[-1]) < min_chars:
+            merged[-1] = f"{merged[-1]} {sentence}"
+        else:
+            merged.append(sentence)
+    return merged
+
+
+class SentenceChunker:
+    """
+    Corta texto incremental em frases: `feed` devolve as frases completadas pelo
+    trecho recebido e `flush` o que sobrar no fim. Mesmas regras de
+    `split_sentences` (frases curtas esperam a próxima, longas são quebradas).
+    """
+
+    def __init__(self, max_chars: int = 220, min_chars: int = 25):
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        self._buffer += delta
+        sentences = []
+        while True:
+            boundary = next(
+                (m for m in _SENTENCE_END.finditer(self._buffer) if m.start() >= self.min_chars), None
+            )
+            if boundary is None:
+                break
+            sentence = " ".join(self._buffer[: boundary.start()].split())
+            self._buffer = self._buffer[boundary.end():]
+            sentences.extend(_hard_split(sentence, self.max_chars))
+
+        # Sem pontuação por muito tempo: libera as partes já completas
+        if len(self._buffer) > 2 * self.max_chars:
+            parts = _hard_split(" ".join(self._buffer.split()), self.max_chars)
+            sentences.extend(parts[:-1])
+            self._buffer = parts[-1]
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest, self._buffer = self._buffer, ""
+        return split_sentences(rest, self.max_chars, self.min_chars) if rest.strip() else []
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class StreamingSynthesizer:
+    def __init__(self, tts_tuple, cfg: Dict | None = None, batcher=None, executor=None):
+        """
+        Com `batcher`, as frases adiantadas pelo lookahead são sintetizadas no mesmo lote.
+        Com `executor` (InferenceExecutor), `astream` sintetiza cada frase nele.
+        """
+        self.tts_tuple = tts_tuple
+        self.batcher = batcher
+        self.executor = executor
+        self.cfg = {**DEFAULT_STREAMING, **(cfg or {})}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(self.cfg["workers"])), thread_name_prefix="tts-stream"
+        )
+
+    def _synthesize(self, index: int, sentence: str) -> AudioSegment:
+        start = time.perf_counter()
+        if self.batcher is not None:
+            waveform, sample_rate = self.batcher.synthesize(sentence)
+        else:
+            waveform, sample_rate = synthesize_waveform(sentence, self.tts_tuple)
+        return AudioSegment(index, sentence, waveform, sample_rate, time.perf_counter() - start)
+
+    def stream(self, text: str) -> Iterator[AudioSegment]:
+        """Gera os segmentos de áudio em ordem, sintetizando `lookahead` frases à frente."""
+        sentences = split_sentences(text, self.cfg["max_chars"], self.cfg["min_chars"])
+        lookahead = max(0, int(self.cfg["lookahead"]))
+        start = time.perf_counter()
+
+        pending = deque()
+        next_index = 0
+        try:
+            while next_index < len(sentences) or pending:
+                while next_index < len(sentences) and len(pending) <= lookahead:
+                    pending.append(
+                        self._executor.submit(self._synthesize, next_index, sentences[next_index])
+                    )
+                    next_index += 1
+                segment = pending.popleft().result()
+                if segment.index == 0:
+                    logger.info(f"TTS streaming: primeiro áudio em {time.perf_counter() - start:.2f}s")
+                yield segment
+        finally:
+            # cliente desconectou: não sintetiza o que ninguém vai ouvir
+            for fut in pending:
+                fut.cancel()
+
+    def _submit(self, index: int, sentence: str) -> asyncio.Future:
+        if self.executor is not None:
+            return asyncio.ensure_future(self.executor.run(self._synthesize, index, sentence))
+        return asyncio.wrap_future(self._executor.submit(self._synthesize, index, sentence))
+
+    async def astream(self, sentences: AsyncIterator[str]) -> AsyncIterator[AudioSegment]:
+        """
+        Como `stream`, mas as frases chegam de um iterador assíncrono: cada uma
+        vai para a síntese assim que chega e os áudios saem na ordem das frases.
+        """
+        lookahead = max(0, int(self.cfg["lookahead"]))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=lookahead + 1)
+        pending: List[asyncio.Future] = []
+        start = time.perf_counter()
+
+        async def _produce():
+            try:
+                index = 0
+                async for sentence in sentences:
+                    fut = self._submit(index, sentence)
+                    pending.append(fut)
+                    await queue.put((index, sentence, fut))
+                    index += 1
+                await queue.put(None)
+            except Exception as e:
+                await queue.put(_Failed(e))
+
+        producer = asyncio.create_task(_produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, _Failed):
+                    raise item.error
+                index, sentence, fut = item
+                try:
+                    segment = await fut
+                except ExecutorOverloaded:
+                    if index == 0:
+                        raise
+                    # frase adiantada recusada pelo executor: tenta de novo agora,
+                    # que é a próxima a ser enviada (recusa de novo = sobrecarga real)
+                    segment = await self.executor.run(self._synthesize, index, sentence)
+                if segment.index == 0:
+                    logger.info(f"TTS streaming: primeiro áudio em {time.perf_counter() - start:.2f}s")
+                yield segment
+        finally:
+            producer.cancel()
+            for fut in pending:
+                if fut.done() and not fut.cancelled():
+                    fut.exception()  # frases adiantadas que falharam (ex.: fila cheia) não geram aviso
+                fut.cancel()
+
+    async def astream_text(self, deltas: AsyncIterator[str]) -> AsyncIterator[AudioSegment]:
+        """Sintetiza texto que chega em trechos (ex.: stream do LLM), frase a frase."""
+        chunker = SentenceChunker(self.cfg["max_chars"], self.cfg["min_chars"])
+
+        async def _sentences():
+            async for delta in deltas:
+                for sentence in chunker.feed(delta):
+                    yield sentence
+            for sentence in chunker.flush():
+                yield sentence
+
+        async for segment in self.astream(_sentences()):
+            yield segment
+
+    async def astream_sentences(self, text: str) -> AsyncIterator[AudioSegment]:
+        """Como `stream`, no event loop: o texto inteiro já é conhecido."""
+        async def _sentences():
+            for sentence in split_sentences(text, self.cfg["max_chars"], self.cfg["min_chars"]):
+                yield sentence
+
+        async for segment in self.astream(_sentences()):
+            yield segment
@@ -1,27 +1,41 @@
 import os
 import uuid
 from io import BytesIO
+import logging
 import mimetypes
 import os
 import uuid
 from io import BytesIO
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 import numpy as np
 import torch
 import soundfile as sf
 from utils.load_config import load_config
-from infra.storage.utils import _upload_to_gcs
+from infra.storage.utils import _upload_bytes_to_gcs
+from utils.audio_io import content_type, encode_audio
 from infra.storage import gcs_client
+from services.tts.cache import TTSCache
+from services.tts.optimize import load_optimize_config, optimize_parler, optimize_vits
+from services.tts.elevenlabs import (
+    DEFAULT_MODEL_ID,
+    DEFAULT_VOICE_ID,
+    get_elevenlabs_client,
+    output_extension,
+)
 
-ELEVEN_ENDPOINT_TMPL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-DEFAULT_MODEL_ID = "eleven_multilingual_v2"
-DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
 
-def load_tts_pipeline(config_path=None):
+logger = logging.getLogger(__name__)
+
+def load_tts_pipeline(config_path=None, overrides: Dict | None = None):
+    """
+    Carrega o modelo de TTS configurado, já preparado para inferência (ver
+    services.tts.optimize). `overrides` sobrescreve chaves da seção `tts`
+    (usado no benchmark).
+    """
     config = load_config(config_path) if config_path else load_config()
-    tts_config = config["tts"]
+    tts_config = {**config["tts"], **(overrides or {})}
     tts_type = tts_config.get("tts_type", "pipeline")
     provider = tts_config.get("provider", "huggingface")
     model_checkpoint = tts_config["model_checkpoint"]
@@ -34,6 +48,7 @@ def load_tts_pipeline(config_path=None):
         from transformers import VitsModel, AutoTokenizer
         model = VitsModel.from_pretrained(model_checkpoint)
         tokenizer = AutoTokenizer.from_pretrained(model_checkpoint)
+        model = optimize_vits(model, tokenizer, load_optimize_config(tts_config), device)
         return ("vits", (model, tokenizer)), language, output_dir, audio_format
 
     elif tts_type == "pipeline":
@@ -50,61 +65,190 @@ def load_tts_pipeline(config_path=None):
         from transformers import AutoTokenizer
         model = ParlerTTSForConditionalGeneration.from_pretrained(model_checkpoint)
         tokenizer = AutoTokenizer.from_pretrained(model_checkpoint)
+        # movido para o device uma vez aqui, não a cada requisição
+        parler_device = "cuda" if torch.cuda.is_available() else "cpu"
+        model = optimize_parler(model, load_optimize_config(tts_config), parler_device)
         return ("parler-tts", (model, tokenizer)), language, output_dir, audio_format
 
     else:
         raise NotImplementedError(f"TTS type '{tts_type}' não implementado.")
 
-def tts_from_text(
-    text,
-    tts_tuple,
-    language="pt",
-    output_dir="./audios_tmp",   
-    file_name: str | None = None,
-    audio_format="wav"
-) -> str:
-    os.makedirs(output_dir, exist_ok=True)
-    if file_name is None:
-        file_name = str(uuid.uuid4())        
-
-    tmp_audio_path = os.path.join(output_dir, f"{file_name}.{audio_format}")
+def synthesize_waveform(text, tts_tuple, batcher=None):
+    """
+    Sintetiza `text` e devolve (waveform float32 mono, sampling_rate) sem tocar no disco.
+    Com `batcher` (TTSBatcher), o texto entra no lote compartilhado entre requisições.
+    """
+    if batcher is not None:
+        return batcher.synthesize_text(text)
 
     tts_type, tts_obj = tts_tuple
 
     if tts_type == "vits":
         model, tokenizer = tts_obj
-        inputs = tokenizer(text, return_tensors="pt")
-        with torch.no_grad():
-            output = model(**inputs).waveform
-        waveform = output.squeeze().cpu().numpy()
-        sampling_rate = model.config.sampling_rate
-        sf.write(tmp_audio_path, waveform, sampling_rate)
+        inputs = tokenizer(text, return_tensors="pt").to(model.device)
+        with torch.inference_mode():
+            output = model(**inputs)
+        # Mesmo corte do TTSBatcher: só as amostras previstas pelo modelo
+        waveform = output.waveform[0, : int(output.sequence_lengths[0])].cpu().numpy()
+        return waveform, model.config.sampling_rate
 
     elif tts_type == "pipeline":
         tts_pipe = tts_obj
         result = tts_pipe(text)
-        if isinstance(result, dict) and "audio" in result:
-            with open(tmp_audio_path, "wb") as f:
-                f.write(result["audio"])
+        return np.squeeze(result["audio"]).astype(np.float32), result["sampling_rate"]
 
     elif tts_type == "parler-tts":
         model, tokenizer = tts_obj
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        model = model.to(device)
-        inputs = tokenizer(text, return_tensors="pt").to(device)
-        with torch.no_grad():
+        inputs = tokenizer(text, return_tensors="pt").to(model.device)
+        with torch.inference_mode():
             output = model.generate(
                 input_ids=inputs["input_ids"],
                 attention_mask=inputs["attention_mask"]
             )
             audio_arr = output.cpu().numpy().squeeze()
-        sampling_rate = model.config.sampling_rate
-        sf.write(tmp_audio_path, audio_arr, sampling_rate)
+        return audio_arr, model.config.sampling_rate
 
     else:
         raise RuntimeError("Formato de saída TTS não reconhecido.")
 
-    return _upload_to_gcs(tmp_audio_path, dest_prefix="tts_outputs")
+def _model_version(tts_tuple) -> str:
+    """Checkpoint do modelo carregado (entra na chave do cache)."""
+    tts_type, tts_obj = tts_tuple
+    model = tts_obj.model if tts_type == "pipeline" else tts_obj[0]
+    version = getattr(model.config, "_name_or_path", "")
+    # grafos exportados/quantizados geram áudio levemente diferente
+    optimization = getattr(model, "optimization", "")
+    return f"{version}+{optimization}" if optimization else version
+
+def _cache_key(text: str, tts_tuple, audio_format: str = "wav", bitrate_kbps: int | None = None) -> str:
+    return TTSCache.key(
+        text,
+        tts_tuple[0],
+        model_version=_model_version(tts_tuple),
+        encoding=f"{audio_format}@{bitrate_kbps}k" if bitrate_kbps else audio_format,
+    )
+
+def synthesize_bytes(text, tts_tuple, audio_format="wav", batcher=None, bitrate_kbps: int | None = None) -> bytes:
+    """Sintetiza e codifica `text` direto em memória."""
+    waveform, sampling_rate = synthesize_waveform(text, tts_tuple, batcher=batcher)
+    return encode_audio(waveform, sampling_rate, audio_format, bitrate_kbps)
+
+def persist_tts_audio(
+    audio_bytes: bytes,
+    text: str,
+    tts_tuple,
+    audio_format: str = "wav",
+    cache: TTSCache | None = None,
+    bitrate_kbps: int | None = None,
+) -> str:
+    """
+    Envia o áudio (já em memória) ao GCS e registra no cache. Com cache, o nome
+    do objeto é a chave: mesmo conteúdo, mesmo objeto.
+    """
+    key = _cache_key(text, tts_tuple, audio_format, bitrate_kbps) if cache is not None else None
+    gs_uri = _upload_bytes_to_gcs(
+        audio_bytes,
+        f"tts_outputs/{key or uuid.uuid4()}.{audio_format}",
+        content_type=content_type(audio_format),
+        overwrite=key is not None,
+    )
+    if cache is not None:
+        cache.set(key, gs_uri, engine=tts_tuple[0], text=text)
+    return gs_uri
+
+def tts_render(
+    text,
+    tts_tuple,
+    audio_format="wav",
+    cache: TTSCache | None = None,
+    batcher=None,
+    bitrate_kbps: int | None = None,
+) -> Tuple[bytes, str | None]:
+    """
+    Devolve (bytes do áudio, gs:// já persistido ou None). Frases em cache são
+    lidas do objeto existente em vez de sintetizadas de novo.
+    """
+    if cache is not None:
+        gs_uri = cache.get(_cache_key(text, tts_tuple, audio_format, bitrate_kbps))
+        if gs_uri is not None:
+            return gcs_client.download_bytes(gs_uri), gs_uri
+    return synthesize_bytes(text, tts_tuple, audio_format, batcher, bitrate_kbps), None
+
+def tts_from_text(
+    text,
+    tts_tuple,
+    language="pt",
+    output_dir="./audios_tmp",   
+    file_name: str | None = None,
+    audio_format="wav",
+    cache: TTSCache | None = None,
+    batcher=None,
+    bitrate_kbps: int | None = None,
+) -> str:
+    """
+    Sintetiza `text` e devolve o gs:// do áudio. O áudio é codificado e enviado
+    a partir da memória (`output_dir` é mantido por compatibilidade). Com
+    `cache`, frases já sintetizadas pelo mesmo modelo devolvem o objeto existente.
+    """
+    if cache is None:
+        audio_bytes = synthesize_bytes(text, tts_tuple, audio_format, batcher, bitrate_kbps)
+        return _upload_bytes_to_gcs(
+            audio_bytes,
+            f"tts_outputs/{file_name or uuid.uuid4()}.{audio_format}",
+            content_type=content_type(audio_format),
+        )
+
+    key = _cache_key(text, tts_tuple, audio_format, bitrate_kbps)
+    gs_uri, hit = cache.get_or_create(
+        key,
+        lambda: persist_tts_audio(
+            synthesize_bytes(text, tts_tuple, audio_format, batcher, bitrate_kbps),
+            text,
+            tts_tuple,
+            audio_format,
+            cache,
+            bitrate_kbps,
+        ),
+        engine=tts_tuple[0],
+        text=text,
+    )
+    if hit:
+        logger.info(f"TTS servido do cache ({key[:12]})")
+    return gs_uri
+
+def eleven_cache_key(
+    text: str,
+    voice_id: str,
+    model_id: str,
+    voice_settings: Dict[str, Any] | None,
+) -> str:
+    return TTSCache.key(
+        text, "elevenlabs", voice_id, voice_settings, model_id,
+        encoding=get_elevenlabs_client().cfg["output_format"],
+    )
+
+def persist_eleven_audio(
+    audio_bytes: bytes,
+    text: str,
+    voice_id: str = DEFAULT_VOICE_ID,
+    model_id: str = DEFAULT_MODEL_ID,
+    voice_settings: Dict[str, Any] | None = None,
+    dest_prefix: str = "tts_outputs",
+    cache: TTSCache | None = None,
+) -> str:
+    """Envia o áudio da ElevenLabs (já em memória) ao GCS e registra no cache."""
+    client = get_elevenlabs_client()
+    key = eleven_cache_key(text, voice_id, model_id, voice_settings) if cache is not None else None
+    ext = output_extension(client.cfg["output_format"])
+    gs_uri = _upload_bytes_to_gcs(
+        audio_bytes,
+        f"{dest_prefix}/{key or uuid.uuid4()}.{ext}",
+        content_type=client.content_type,
+        overwrite=key is not None,
+    )
+    if cache is not None:
+        cache.set(key, gs_uri, engine="elevenlabs", text=text)
+    return gs_uri
 
 def tts_eleven(
     text: str,
@@ -112,43 +256,27 @@ def tts_eleven(
     model_id: str = DEFAULT_MODEL_ID,
     voice_settings: Dict[str, Any] | None = None,
     dest_prefix: str = "tts_outputs",
+    cache: TTSCache | None = None,
 ) -> str:
     """
     Transforma texto em áudio via ElevenLabs e devolve caminho gs://...
+    Com `cache`, frases repetidas (mesma voz/configuração/modelo) não chamam a API.
     """
-    api_key = os.getenv("XI_API_KEY")
-    if not api_key:
-        raise RuntimeError("XI_API_KEY não definido.")
-
-    payload = {
-        "text": text,
-        "model_id": model_id,
-        "voice_settings": voice_settings
-        or {
-            "stability": 0.4,
-            "similarity_boost": 0.8,
-        },
-    }
-
-    resp = requests.post(
-        ELEVEN_ENDPOINT_TMPL.format(voice_id=voice_id),
-        headers={
-            "xi-api-key": api_key,
-            "Content-Type": "application/json",
-        },
-        json=payload,
-        timeout=60,
-    )
-    if resp.status_code != 200:
-        raise RuntimeError(
-            f"ElevenLabs API erro {resp.status_code}: {resp.text[:200]}"
+    voice_id = voice_id or DEFAULT_VOICE_ID
+
+    def _synthesize_and_upload() -> str:
+        audio_bytes = get_elevenlabs_client().synthesize(
+            text, voice_id=voice_id, model_id=model_id, voice_settings=voice_settings
+        )
+        return persist_eleven_audio(
+            audio_bytes, text, voice_id, model_id, voice_settings, dest_prefix, cache
         )
 
-    # --- envia bytes direto para o GCS ------------------------------------ #
-    file_id = f"{uuid.uuid4()}.mp3"
-    dest_path = f"{dest_prefix}/{file_id}"
+    if cache is None:
+        return _synthesize_and_upload()
 
-    gs_uri = gcs_client.upload_file(
-        BytesIO(resp.content), dest_path, content_type="audio/mpeg"
-    )
-    return gs_uri
\ No newline at end of file
+    key = eleven_cache_key(text, voice_id, model_id, voice_settings)
+    gs_uri, hit = cache.get_or_create(key, _synthesize_and_upload, engine="elevenlabs", text=text)
+    if hit:
+        logger.info(f"ElevenLabs servido do cache ({key[:12]})")
+    return gs_uri
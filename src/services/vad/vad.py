@@ -0,0 +1,173 @@
+"""
+Detecção de atividade de voz (VAD) por energia.
+
+Remove o silêncio do início e do fim das gravações e, opcionalmente, as pausas
+longas entre falas, devolvendo os trechos mantidos e metadados de tempo.
+Usado antes do STT e da extração de embedding do locutor.
+"""
+
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.load_config import load_config
+from utils.audio_io import TARGET_SAMPLE_RATE
+
+DEFAULT_VAD = {
+    "enabled": False,
+    "frame_ms": 30,
+    "threshold_db": -45.0,    # piso absoluto de energia para fala (dBFS)
+    "margin_db": 12.0,        # fala = ruído de fundo estimado + margem
+    "min_speech_ms": 120,     # descarta estalos mais curtos que isso
+    "min_silence_ms": 400,    # pausas menores não separam segmentos
+    "padding_ms": 150,        # margem mantida antes/depois de cada fala
+    "split_on_pauses": False, # False = só apara início e fim
+}
+
+
+@dataclass
+class SpeechSegment:
+    start_s: float
+    end_s: float
+
+
+@dataclass
+class VADResult:
+    audio: np.ndarray
+    segments: List[SpeechSegment]
+    speech_detected: bool
+    input_s: float
+    kept_s: float
+    elapsed_ms: float
+    sample_rate: int = TARGET_SAMPLE_RATE
+    segment_audio: List[np.ndarray] = field(default_factory=list, repr=False)
+
+    def metadata(self) -> Dict:
+        return {
+            "speech_detected": self.speech_detected,
+            "input_s": self.input_s,
+            "kept_s": self.kept_s,
+            "elapsed_ms": self.elapsed_ms,
+            "segments": [asdict(s) for s in self.segments],
+        }
+
+
+def load_vad_config(route: str | None = None, config_path: str | None = None) -> Dict:
+    """
+    Monta a configuração do VAD: defaults < seção `vad` < `vad.routes.<route>`.
+    """
+    cfg = load_config(config_path) if config_path else load_config()
+    vad_cfg = dict(cfg.get("vad") or {})
+    routes = vad_cfg.pop("routes", None) or {}
+    merged = {**DEFAULT_VAD, **vad_cfg}
+    if route is not None:
+        merged.update(routes.get(route) or {})
+    return merged
+
+
+def _frame_db(audio: np.ndarray, frame: int) -> np.ndarray:
+    n_frames = int(np.ceil(len(audio) / frame))
+    padded = np.zeros(n_frames * frame, dtype=np.float32)
+    padded[: len(audio)] = audio
+    frames = padded.reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1) + 1e-12)
+    return 20.0 * np.log10(rms)
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    cfg: Dict | None = None,
+) -> List[Tuple[int, int]]:
+    """
+    Devolve os trechos de fala [(início, fim)] em amostras, já com padding.
+    """
+    cfg = {**DEFAULT_VAD, **(cfg or {})}
+    if not len(audio):
+        return []
+
+    frame = max(1, int(cfg["frame_ms"] * sample_rate / 1000))
+    db = _frame_db(audio, frame)
+    noise_floor = float(np.percentile(db, 10))
+    threshold = max(float(cfg["threshold_db"]), noise_floor + float(cfg["margin_db"]))
+    is_speech = db > threshold
+
+    # Agrupa frames consecutivos de fala
+    runs: List[List[int]] = []
+    for i, speech in enumerate(is_speech):
+        if not speech:
+            continue
+        if runs and i - runs[-1][1] <= 1:
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1])
+
+    # Junta falas separadas por pausas curtas
+    min_gap = cfg["min_silence_ms"] / cfg["frame_ms"]
+    merged: List[List[int]] = []
+    for run in runs:
+        if merged and run[0] - merged[-1][1] < min_gap:
+            merged[-1][1] = run[1]
+        else:
+            merged.append(run)
+
+    min_len = cfg["min_speech_ms"] / cfg["frame_ms"]
+    pad = int(cfg["padding_ms"] * sample_rate / 1000)
+    spans = []
+    for start, end in merged:
+        if end - start < min_len:
+            continue
+        s = max(0, start * frame - pad)
+        e = min(len(audio), end * frame + pad)
+        if spans and s <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], e)
+        else:
+            spans.append((s, e))
+    return spans
+
+
+def apply_vad(
+    audio: np.ndarray,
+    cfg: Dict | None = None,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+) -> VADResult:
+    """
+    Aplica o VAD e devolve o áudio mantido com os metadados.
+
+    Sem fala detectada (ou com o VAD desabilitado) o áudio é devolvido inteiro,
+    para não entregar um buffer vazio ao modelo.
+    """
+    cfg = {**DEFAULT_VAD, **(cfg or {})}
+    start = time.perf_counter()
+    input_s = round(len(audio) / sample_rate, 3)
+
+    spans = detect_speech(audio, sample_rate, cfg) if cfg["enabled"] else []
+    if not spans:
+        return VADResult(
+            audio=audio,
+            segments=[SpeechSegment(0.0, input_s)],
+            speech_detected=False,
+            input_s=input_s,
+            kept_s=input_s,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+            sample_rate=sample_rate,
+            segment_audio=[audio],
+        )
+
+    if not cfg["split_on_pauses"]:
+        spans = [(spans[0][0], spans[-1][1])]
+
+    pieces = [audio[s:e] for s, e in spans]
+    kept = np.concatenate(pieces) if len(pieces) > 1 else pieces[0]
+    return VADResult(
+        audio=kept,
+        segments=[SpeechSegment(round(s / sample_rate, 3), round(e / sample_rate, 3)) for s, e in spans],
+        speech_detected=True,
+        input_s=input_s,
+        kept_s=round(len(kept) / sample_rate, 3),
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+        sample_rate=sample_rate,
+        segment_audio=pieces,
+    )
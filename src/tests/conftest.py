@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Os módulos importam a partir de src/ (e infra/ a partir da raiz do repositório)
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [_SRC, os.path.dirname(_SRC)]
@@ -0,0 +1,61 @@
+import sys
+import types
+
+import numpy as np
+
+from services.stt.stt import _stt_long_form
+from utils.audio_io import TARGET_SAMPLE_RATE
+
+LONG_FORM = {
+    "enabled": True,
+    "min_duration_s": 30,
+    "chunk_length_s": 30,
+    "overlap_s": 2,
+    "silence_search_s": 3,
+    "silence_db": -40,
+    "batch_size": 8,
+    "max_workers": 4,
+}
+
+
+class _FakeBatchedPipeline:
+    """Reproduz a exigência do faster-whisper: sem VAD, precisa de clip_timestamps."""
+
+    calls = []
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, batch_size=8, vad_filter=False, clip_timestamps=None, **kwargs):
+        if not vad_filter and not clip_timestamps:
+            raise RuntimeError("No clip timestamps found. Set 'vad_filter' to True or provide 'clip_timestamps'")
+        type(self).calls.append(clip_timestamps)
+        clips = clip_timestamps or [{"start": 0.0, "end": len(audio) / TARGET_SAMPLE_RATE}]
+        segments = [types.SimpleNamespace(text=f" bloco{i} ") for i, _ in enumerate(clips)]
+        return iter(segments), None
+
+
+def test_faster_whisper_long_form_without_vad(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(BatchedInferencePipeline=_FakeBatchedPipeline))
+    _FakeBatchedPipeline.calls.clear()
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, 45 * TARGET_SAMPLE_RATE).astype(np.float32)
+
+    text = _stt_long_form(audio, "faster-whisper", object(), {"language": "pt", "vad_filter": False}, LONG_FORM)
+
+    clips = _FakeBatchedPipeline.calls[0]
+    assert text == "bloco0 bloco1"
+    assert clips[0]["start"] == 0.0
+    assert clips[-1]["end"] == len(audio) / TARGET_SAMPLE_RATE
+    assert all(c["end"] - c["start"] <= 30.0 for c in clips)
+    # janelas contíguas: nada transcrito duas vezes
+    assert all(a["end"] == b["start"] for a, b in zip(clips, clips[1:]))
+
+
+def test_faster_whisper_long_form_with_vad_keeps_pipeline_vad(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(BatchedInferencePipeline=_FakeBatchedPipeline))
+    _FakeBatchedPipeline.calls.clear()
+    audio = np.zeros(35 * TARGET_SAMPLE_RATE, dtype=np.float32)
+
+    _stt_long_form(audio, "faster-whisper", object(), {"vad_filter": True}, LONG_FORM)
+
+    assert _FakeBatchedPipeline.calls == [None]
@@ -0,0 +1,152 @@
+"""
+Áudio de uma requisição, lido e decodificado uma única vez.
+
+`AudioContext.from_source` aceita caminho local, gs://, bytes ou um buffer
+float32 e guarda os bytes originais; o buffer 16 kHz mono float32 é
+decodificado na primeira vez que alguém pede `.audio` e reaproveitado pelas
+demais etapas (VAD, STT, embedding do locutor), inclusive de threads
+diferentes. Nada é escrito em disco.
+
+Contextos criados a partir de caminhos/URIs ficam num cache em memória com
+TTL curto (`audio.context`): chamadas seguidas para o mesmo áudio (ex.:
+/speaker e /stt do mesmo gs://) não baixam nem decodificam de novo. A chave
+inclui a versão do conteúdo: data de modificação para arquivos locais e a
+generation do objeto no GCS (uploads com overwrite geram outra entrada).
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict
+
+import numpy as np
+
+from infra.storage import gcs_client
+from utils.audio_io import TARGET_SAMPLE_RATE, decode_audio, encode_wav, read_audio_bytes
+from utils.cache import SingleFlight, TTLCache
+from utils.load_config import load_config
+
+DEFAULT_AUDIO_CONTEXT = {
+    "cache_enabled": True,
+    "ttl_s": 30,        # o mesmo URI costuma ser pedido por etapas seguidas do turno
+    "maxsize": 32,      # contextos guardam bytes + áudio decodificado
+}
+
+
+def load_audio_context_config(config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {**DEFAULT_AUDIO_CONTEXT, **((cfg.get("audio") or {}).get("context") or {})}
+
+
+class AudioContext:
+    def __init__(
+        self,
+        data: bytes | None = None,
+        source: str | None = None,
+        filename: str | None = None,
+        audio: np.ndarray | None = None,
+    ):
+        if data is None and audio is None:
+            raise ValueError("AudioContext precisa de bytes ou de um buffer de áudio")
+        self.source = source
+        self.filename = filename or (os.path.basename(source) if source else "audio.wav")
+        self._data = data
+        self._audio = audio
+        self._digest: str | None = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Criação                                                            #
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def from_source(cls, source: "str | bytes | np.ndarray | AudioContext", filename: str | None = None) -> "AudioContext":
+        if isinstance(source, AudioContext):
+            return source
+        if isinstance(source, np.ndarray):
+            return cls(audio=np.asarray(source, dtype=np.float32), filename=filename)
+        if isinstance(source, (bytes, bytearray)):
+            return cls(data=bytes(source), filename=filename)
+        return _from_uri(source)
+
+    # ------------------------------------------------------------------ #
+    # Conteúdo                                                           #
+    # ------------------------------------------------------------------ #
+    @property
+    def data(self) -> bytes:
+        """Bytes do arquivo original (ou WAV, se o contexto veio de um buffer)."""
+        with self._lock:
+            if self._data is None:
+                self._data = encode_wav(self._audio)
+            return self._data
+
+    @property
+    def audio(self) -> np.ndarray:
+        """float32 16 kHz mono, decodificado na primeira chamada."""
+        with self._lock:
+            if self._audio is None:
+                self._audio = decode_audio(self._data)
+            return self._audio
+
+    @property
+    def decoded(self) -> bool:
+        return self._audio is not None
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.data).hexdigest()
+        return self._digest
+
+    @property
+    def duration_s(self) -> float:
+        return len(self.audio) / TARGET_SAMPLE_RATE
+
+
+_cfg: Dict | None = None
+_cache: TTLCache | None = None
+_flight = SingleFlight()
+_init_lock = threading.Lock()
+
+
+def _context_cache() -> TTLCache | None:
+    global _cfg, _cache
+    with _init_lock:
+        if _cfg is None:
+            _cfg = load_audio_context_config()
+            if _cfg["cache_enabled"]:
+                _cache = TTLCache(maxsize=_cfg["maxsize"], ttl_s=_cfg["ttl_s"])
+        return _cache
+
+
+def _from_uri(source: str) -> AudioContext:
+    cache = _context_cache()
+    if cache is None:
+        return AudioContext(read_audio_bytes(source), source=source)
+
+    # Uma consulta de metadados (ou stat) é bem mais barata que baixar e decodificar
+    if source.startswith("gs://"):
+        generation = gcs_client.object_generation(source)
+        key = (source, generation)
+    else:
+        generation = None
+        key = (os.path.abspath(source), os.path.getmtime(source))
+    ctx = cache.get(key)
+    if ctx is not None:
+        return ctx
+
+    def _load():
+        # baixa exatamente a generation da chave, mesmo que o objeto mude no meio
+        loaded = AudioContext(read_audio_bytes(source, generation), source=source)
+        cache.set(key, loaded)
+        return loaded
+
+    # pedidos simultâneos do mesmo URI esperam um único download
+    ctx, _ = _flight.do(key, _load)
+    return ctx
+
+
+def audio_context_stats() -> Dict:
+    cache = _context_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
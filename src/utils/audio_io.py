@@ -0,0 +1,161 @@
+"""
+Utilitários de áudio compartilhados pelos serviços.
+
+Decodifica caminhos locais ou bytes para um buffer float32 mono na taxa
+desejada e codifica buffers de volta em memória (WAV, FLAC, Ogg Vorbis,
+Opus e MP3).
+"""
+
+import io
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from infra.storage import gcs_client
+
+TARGET_SAMPLE_RATE = 16000
+
+AUDIO_CONTENT_TYPES = {
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "ogg": "audio/ogg",
+    "opus": "audio/ogg",     # Opus em contêiner Ogg
+    "mp3": "audio/mpeg",
+}
+
+DEFAULT_BITRATE_KBPS = {"opus": 32, "mp3": 64}
+
+# Taxas aceitas pelo encoder Opus
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def decode_audio(source: str | bytes, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodifica `source` (caminho local ou bytes) para float32 mono em `sample_rate` Hz.
+    """
+    import librosa
+
+    if isinstance(source, (bytes, bytearray)):
+        try:
+            audio, _ = librosa.load(io.BytesIO(source), sr=sample_rate, mono=True)
+        except Exception:
+            # mp3/opus passam pelo audioread, que só aceita caminho em disco
+            with tempfile.NamedTemporaryFile(suffix=".audio", delete=False) as tmp:
+                tmp.write(source)
+                tmp_path = tmp.name
+            try:
+                audio, _ = librosa.load(tmp_path, sr=sample_rate, mono=True)
+            finally:
+                os.unlink(tmp_path)
+    else:
+        audio, _ = librosa.load(source, sr=sample_rate, mono=True)
+    return np.asarray(audio, dtype=np.float32)
+
+
+def read_audio_bytes(audio_path: str, generation: int | None = None) -> bytes:
+    """Bytes brutos de `audio_path` (local ou gs://..., opcionalmente numa `generation`)."""
+    if audio_path.startswith("gs://"):
+        return gcs_client.download_bytes(audio_path, generation=generation)
+    with open(audio_path, "rb") as f:
+        return f.read()
+
+
+def load_audio(audio_path: str, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Baixa (se gs://...) e decodifica `audio_path` para float32 mono."""
+    if audio_path.startswith("gs://"):
+        return decode_audio(gcs_client.download_bytes(audio_path), sample_rate)
+    return decode_audio(audio_path, sample_rate)
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> bytes:
+    """Codifica um buffer float32 como WAV PCM 16 bits em memória."""
+    buf = io.BytesIO()
+    sf.write(buf, audio, sample_rate, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+def _ffmpeg_encode(audio: np.ndarray, sample_rate: int, codec_args: list) -> bytes:
+    """Codifica via ffmpeg em pipe (float32 no stdin, arquivo no stdout), sem disco."""
+    proc = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "f32le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            *codec_args, "pipe:1",
+        ],
+        input=np.ascontiguousarray(audio, dtype="<f4").tobytes(),
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg falhou: {proc.stderr.decode(errors='ignore')[:200]}")
+    return proc.stdout
+
+
+def encode_audio(
+    audio: np.ndarray,
+    sample_rate: int,
+    audio_format: str = "wav",
+    bitrate_kbps: int | None = None,
+) -> bytes:
+    """
+    Codifica um buffer float32 em memória no formato pedido.
+
+    opus e mp3 usam o ffmpeg em pipe com o bitrate pedido (padrões em
+    DEFAULT_BITRATE_KBPS); sem ffmpeg no PATH, caem no libsndfile, que
+    ignora o bitrate.
+    """
+    if audio_format == "wav":
+        return encode_wav(audio, sample_rate)
+    if audio_format not in AUDIO_CONTENT_TYPES:
+        raise ValueError(f"Formato de áudio '{audio_format}' não suportado.")
+
+    if audio_format in DEFAULT_BITRATE_KBPS:
+        bitrate = int(bitrate_kbps or DEFAULT_BITRATE_KBPS[audio_format])
+        if shutil.which("ffmpeg"):
+            if audio_format == "opus":
+                codec_args = ["-c:a", "libopus", "-b:a", f"{bitrate}k", "-application", "voip", "-f", "ogg"]
+            else:
+                codec_args = ["-c:a", "libmp3lame", "-b:a", f"{bitrate}k", "-f", "mp3"]
+            return _ffmpeg_encode(audio, sample_rate, codec_args)
+
+    buf = io.BytesIO()
+    if audio_format == "opus":
+        if sample_rate not in _OPUS_SAMPLE_RATES:
+            import librosa
+            audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=48000)
+            sample_rate = 48000
+        sf.write(buf, audio, sample_rate, format="OGG", subtype="OPUS")
+    else:
+        sf.write(buf, audio, sample_rate, format=audio_format.upper())
+    return buf.getvalue()
+
+
+def content_type(audio_format: str) -> str:
+    return AUDIO_CONTENT_TYPES.get(audio_format, "application/octet-stream")
+
+
+def float_to_pcm16(audio: np.ndarray) -> bytes:
+    """float32 em [-1, 1] -> PCM 16 bits little-endian."""
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1) -> bytes:
+    """
+    Cabeçalho WAV PCM 16 bits para streaming: os tamanhos ficam em 0xFFFFFFFF
+    (desconhecidos), convenção aceita pelos players para fluxos contínuos.
+    """
+    byte_rate = sample_rate * channels * 2
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, channels * 2, 16)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def duration_seconds(audio: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> float:
+    """Duração em segundos de um buffer mono."""
+    return len(audio) / float(sample_rate)
@@ -0,0 +1,86 @@
+"""
+Micro-batching entre requisições concorrentes.
+
+Cada chamada a `submit` entra numa fila; uma thread dedicada junta os itens que
+chegarem dentro de `max_wait_ms` (até `max_batch_size`) e processa todos numa
+única chamada de `process_batch`.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        name: str = "batcher",
+    ):
+        """
+        Args:
+            process_batch: Recebe a lista de itens e devolve um resultado por item, na mesma ordem.
+            max_batch_size: Máximo de itens por lote.
+            max_wait_ms: Tempo máximo que o primeiro item do lote espera por companhia.
+            name: Nome da thread (aparece nos logs).
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[tuple[Any, Future]]" = queue.Queue()
+        self._batch_ids = itertools.count(1)
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def submit_many(self, items: Sequence[Any]) -> List[Future]:
+        return [self.submit(item) for item in items]
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def next_batch_id(self) -> int:
+        return next(self._batch_ids)
+
+    def _collect(self) -> List[tuple[Any, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            pending = [(item, fut) for item, fut in batch if fut.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            try:
+                results = self.process_batch([item for item, _ in pending])
+                for (_, fut), result in zip(pending, results):
+                    fut.set_result(result)
+            except Exception as e:
+                logger.error(f"[{self.name}] Falha ao processar lote de {len(pending)}: {e}")
+                for _, fut in pending:
+                    fut.set_exception(e)
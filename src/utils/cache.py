@@ -0,0 +1,148 @@
+"""
+Caches em memória compartilhados pelos serviços.
+
+- TTLCache: LRU com expiração por entrada, thread-safe.
+- SingleFlight: coalesce chamadas concorrentes com a mesma chave numa execução só.
+- AsyncSingleFlight: o mesmo para corrotinas no event loop.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl_s: float | None = None):
+        """
+        Args:
+            maxsize: Máximo de entradas; as menos usadas saem primeiro.
+            ttl_s: Validade padrão das entradas em segundos (None = sem expiração).
+        """
+        self.maxsize = max(1, int(maxsize))
+        self.ttl_s = ttl_s
+        self._data: "OrderedDict[Hashable, Tuple[Any, float | None]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl_s: float | None = _MISSING) -> None:
+        ttl = self.ttl_s if ttl_s is _MISSING else ttl_s
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def items(self):
+        """Snapshot das entradas ainda válidas."""
+        now = time.monotonic()
+        with self._lock:
+            return [(k, v) for k, (v, exp) in self._data.items() if exp is None or exp > now]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class SingleFlight:
+    """
+    Garante uma execução por chave: quem chega enquanto a primeira chamada está
+    em andamento espera o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Executa (ou espera) `fn` para `key`; devolve (resultado, shared)."""
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                fut.set_running_or_notify_cancel()
+                self._inflight[key] = fut
+
+        if not leader:
+            return fut.result(), True
+
+        try:
+            fut.set_result(fn())
+        except BaseException as e:
+            fut.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return fut.result(), False
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+
+class AsyncSingleFlight:
+    """Versão asyncio do SingleFlight (usar sempre do mesmo event loop)."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        fut = self._inflight.get(key)
+        if fut is not None:
+            return await asyncio.shield(fut), True
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await fn()
+            fut.set_result(result)
+            return result, False
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            # evita "exception was never retrieved" quando ninguém mais esperava
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def inflight(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,187 @@
+"""
+Executores dedicados de inferência, um por modelo, com controle de admissão.
+
+Cada modelo pesado (TitaNet, Whisper, VITS) tem o próprio pool de threads com
+concorrência configurável, em vez de disputar o threadpool padrão do Starlette
+com I/O de GCS, Qdrant e BigQuery. A fila de espera é limitada:
+
+- fila cheia: a chamada é recusada na hora (`ExecutorOverloaded`, HTTP 429);
+- espera maior que `queue_timeout_s` sem começar: a tarefa sai da fila
+  (`ExecutorOverloaded`, HTTP 503).
+
+Assim a sobrecarga vira recusa rápida em vez de latência crescente para todos.
+Profundidade da fila e tempo de espera ficam em `stats()` (/executors/stats).
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from utils.load_config import load_config
+
+DEFAULT_EXECUTOR = {
+    "max_workers": 2,          # inferências simultâneas no modelo
+    "max_queue": 16,           # tarefas aguardando além das em execução
+    "queue_timeout_s": 10.0,   # espera máxima na fila (null = sem limite)
+    "retry_after_s": 1,        # header Retry-After das recusas
+}
+
+# Padrões por modelo; com micro-batching, max_workers >= max_batch_size
+# para que as requisições concorrentes consigam formar o lote
+DEFAULT_EXECUTORS = {
+    "titanet": {"max_workers": 2, "max_queue": 16, "queue_timeout_s": 5.0},
+    "whisper": {"max_workers": 8, "max_queue": 32, "queue_timeout_s": 10.0},
+    "vits": {"max_workers": 8, "max_queue": 32, "queue_timeout_s": 10.0},
+}
+
+
+def load_executor_config(name: str, config_path: str | None = None) -> Dict:
+    cfg = load_config(config_path) if config_path else load_config()
+    return {
+        **DEFAULT_EXECUTOR,
+        **DEFAULT_EXECUTORS.get(name, {}),
+        **((cfg.get("executors") or {}).get(name) or {}),
+    }
+
+
+class ExecutorOverloaded(RuntimeError):
+    """Recusa por sobrecarga; `status_code` é 429 (fila cheia) ou 503 (espera esgotada)."""
+
+    def __init__(self, name: str, status_code: int, detail: str, retry_after_s: float = 1):
+        super().__init__(f"Executor '{name}' sobrecarregado: {detail}")
+        self.name = name
+        self.status_code = status_code
+        self.retry_after_s = retry_after_s
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        name: str,
+        max_workers: int = 2,
+        max_queue: int = 16,
+        queue_timeout_s: float | None = 10.0,
+        retry_after_s: float = 1,
+    ):
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout_s = float(queue_timeout_s) if queue_timeout_s else None
+        self.retry_after_s = retry_after_s
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"infer-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0          # na fila + em execução
+        self._running = 0
+        self._waits = deque(maxlen=1024)
+        self.completed = 0
+        self.rejected = 0          # fila cheia (429)
+        self.timed_out = 0         # espera esgotada (503)
+
+    @classmethod
+    def from_config(cls, name: str, cfg: Dict | None = None) -> "InferenceExecutor":
+        cfg = {**DEFAULT_EXECUTOR, **DEFAULT_EXECUTORS.get(name, {}), **(cfg or {})}
+        return cls(
+            name,
+            max_workers=cfg["max_workers"],
+            max_queue=cfg["max_queue"],
+            queue_timeout_s=cfg["queue_timeout_s"],
+            retry_after_s=cfg["retry_after_s"],
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self._pending - self._running
+
+    def _release(self, fut) -> None:
+        with self._lock:
+            self._pending -= 1
+            if not fut.cancelled():
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Executa `fn(*args, **kwargs)` no pool do modelo ou recusa por sobrecarga."""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorOverloaded(self.name, 429, "fila cheia", self.retry_after_s)
+            self._pending += 1
+
+        enqueued = time.perf_counter()
+
+        def _work():
+            with self._lock:
+                self._running += 1
+                self._waits.append(time.perf_counter() - enqueued)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        try:
+            cfut = self._pool.submit(_work)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        cfut.add_done_callback(self._release)
+        fut = asyncio.wrap_future(cfut)
+
+        if self.queue_timeout_s is not None:
+            try:
+                done, _ = await asyncio.wait({fut}, timeout=self.queue_timeout_s)
+            except asyncio.CancelledError:
+                # requisição abandonada: libera a vaga se ainda não começou
+                cfut.cancel()
+                raise
+            # cancel() só funciona enquanto a tarefa não começou a rodar
+            if not done and cfut.cancel():
+                with self._lock:
+                    self.timed_out += 1
+                raise ExecutorOverloaded(
+                    self.name, 503, f"espera na fila passou de {self.queue_timeout_s}s", self.retry_after_s
+                )
+        return await fut
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = np.asarray(self._waits, dtype=np.float64)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "wait_ms_avg": round(float(waits.mean()) * 1000, 2) if len(waits) else 0.0,
+                "wait_ms_p95": round(float(np.percentile(waits, 95)) * 1000, 2) if len(waits) else 0.0,
+                "wait_ms_max": round(float(waits.max()) * 1000, 2) if len(waits) else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: Dict[str, InferenceExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str) -> InferenceExecutor:
+    """Executor do modelo `name` (titanet, whisper, vits), criado uma vez por processo."""
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = InferenceExecutor.from_config(name, load_executor_config(name))
+        return _executors[name]
+
+
+def executors_stats() -> Dict[str, Dict[str, Any]]:
+    with _executors_lock:
+        executors = dict(_executors)
+    return {name: executor.stats() for name, executor in executors.items()}
@@ -0,0 +1,193 @@
+"""
+Helpers assíncronos para chamadas a APIs externas: retries com jitter,
+deadlines, requisições "hedged" (dispara uma alternativa se a primeira demorar)
+e circuit breaker (para de chamar um serviço que está falhando).
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt: int, base_s: float, max_s: float) -> float:
+    """Backoff exponencial com "full jitter": uniforme em [0, min(max, base * 2^attempt)]."""
+    return random.uniform(0, min(max_s, base_s * (2 ** attempt)))
+
+
+async def retry_async(
+    fn: Callable[[], Awaitable[Any]],
+    max_retries: int = 2,
+    base_delay_s: float = 0.25,
+    max_delay_s: float = 2.0,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    deadline_s: float | None = None,
+    name: str = "call",
+) -> Any:
+    """
+    Executa `fn` com até `max_retries` novas tentativas para as exceções em
+    `retry_on`. Com `deadline_s`, o tempo total (tentativas + esperas) é limitado
+    e estourar o prazo levanta asyncio.TimeoutError.
+    """
+    async def _attempts():
+        for attempt in range(max_retries + 1):
+            try:
+                return await fn()
+            except retry_on as e:
+                if attempt == max_retries:
+                    raise
+                delay = backoff_delay(attempt, base_delay_s, max_delay_s)
+                logger.warning(f"[{name}] tentativa {attempt + 1} falhou ({e!r}); nova tentativa em {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    if deadline_s is None:
+        return await _attempts()
+    return await asyncio.wait_for(_attempts(), timeout=deadline_s)
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[Any]],
+    hedge: Callable[[], Awaitable[Any]],
+    hedge_after_s: float,
+    name: str = "call",
+    on_discard: Callable[[Any], Awaitable[None]] | None = None,
+) -> Tuple[Any, str]:
+    """
+    Inicia `primary`; se não responder em `hedge_after_s`, inicia também `hedge`
+    e devolve o primeiro sucesso. Se um dos dois falhar, espera o outro.
+
+    `on_discard` recebe o resultado do perdedor quando ele também termina com
+    sucesso (no mesmo instante ou antes do cancelamento), para liberar
+    recursos como streams abertos.
+
+    Returns:
+        (resultado, "primary" | "hedge")
+    """
+    start = time.perf_counter()
+    primary_task = asyncio.ensure_future(primary())
+    done, _ = await asyncio.wait({primary_task}, timeout=hedge_after_s)
+    if primary_task in done and primary_task.exception() is None:
+        return primary_task.result(), "primary"
+
+    logger.info(f"[{name}] sem resposta em {hedge_after_s:.2f}s; disparando hedge")
+    hedge_task = asyncio.ensure_future(hedge())
+    tasks = {hedge_task} if primary_task in done else {primary_task, hedge_task}
+    labels = {primary_task: "primary", hedge_task: "hedge"}
+
+    def _discard(task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is None:
+            _spawn(on_discard(task.result()))
+
+    errors = []
+    winner = None
+    try:
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    logger.info(
+                        f"[{name}] {labels[task]} respondeu em {time.perf_counter() - start:.2f}s"
+                    )
+                    return task.result(), labels[task]
+                errors.append(task.exception())
+        if primary_task.done() and primary_task.exception() is not None and primary_task.exception() not in errors:
+            errors.insert(0, primary_task.exception())
+        raise errors[0]
+    finally:
+        for task in (primary_task, hedge_task):
+            if task is winner:
+                continue
+            if not task.done():
+                task.cancel()
+            if on_discard is not None:
+                task.add_done_callback(_discard)
+
+
+# Tarefas de limpeza em segundo plano (referência forte até terminarem)
+_background: set = set()
+
+
+def _spawn(coro) -> None:
+    task = asyncio.ensure_future(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+class CircuitOpenError(RuntimeError):
+    """Levantada sem chamar o serviço enquanto o circuito está aberto."""
+
+
+class CircuitBreaker:
+    """
+    Abre após `failure_threshold` falhas seguidas; aberto, recusa chamadas por
+    `reset_timeout_s` e depois deixa passar uma chamada de teste (half-open):
+    sucesso fecha o circuito, falha o abre de novo.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0, name: str = "call"):
+        self.failure_threshold = int(failure_threshold)
+        self.reset_timeout_s = float(reset_timeout_s)
+        self.name = name
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout_s:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Diz se a chamada pode seguir (reserva a chamada de teste no half-open)."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"[{self.name}] circuito fechado")
+            self._failures, self._opened_at, self._probing = 0, None, False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning(f"[{self.name}] circuito aberto após {self._failures} falhas")
+                self._opened_at, self._probing = time.monotonic(), False
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.allow():
+            raise CircuitOpenError(f"[{self.name}] circuito aberto")
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # cancelamento (ex.: perdeu o hedge) não conta como falha
+            with self._lock:
+                self._probing = False
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self._failures}
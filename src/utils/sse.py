@@ -0,0 +1,18 @@
+"""
+Formatação de Server-Sent Events (text/event-stream).
+"""
+
+import json
+from typing import Any
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",   # desliga o buffer de proxies (nginx)
+}
+
+
+def sse_event(data: Any, event: str | None = None) -> str:
+    """Um evento SSE; `data` é serializado como JSON."""
+    payload = json.dumps(data, ensure_ascii=False)
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {payload}\n\n"